@@ -5,15 +5,71 @@ Monitors database query performance, edge function execution times,
 and user experience metrics that affect voting/bidding performance.
 
 Usage: python3 monitor-user-experience.py [--verbose] [--interval=30] [--alert-threshold=5000]
+                                         [--cadence connections=1 --cadence database=600] [--pool-size=3]
+                                         [--serve :9187] [--event AB3001 | --live]
+                                         [--plan-ratio 3 --plan-cache plans.json]
+                                         [--record night.ux.gz | --replay night.ux.gz --from 20:30 --speed 10]
+                                         [--targets targets.json [--target production --target replica]]
+                                         [--tui --interval 1]
+                                         [--edge-logs 'logs/edge-*.jsonl' --edge-window 60]
+
+Each collector samples on its own cadence (see COLLECTOR_DEFAULTS); --interval
+controls how often the report is printed from the latest samples (or the
+--tui dashboard is refreshed).
 """
 
 import psycopg2
+import psycopg2.extensions
 import json
+import os
+import re
+import hashlib
+import difflib
+import gzip
+import bisect
 import time
+import random
 import argparse
 import sys
+import threading
+import asyncio
+import heapq
+import curses
+import importlib.util
+from contextlib import contextmanager, redirect_stdout
 from datetime import datetime, timedelta
-from collections import defaultdict
+from decimal import Decimal
+from collections import defaultdict, OrderedDict, deque
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+SHARED_SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts')
+
+def import_shared_module(name):
+    """Import a module from the repository's top-level scripts/ directory by file path.
+
+    The path is resolved from this file, so the monitor runs from any working
+    directory without adding scripts/ to sys.path. Each module is loaded once.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SHARED_SCRIPTS_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+# Alert rules and targets are shared with scripts/monitor_artist_profile_links.py
+monitor_alerts = import_shared_module('monitor_alerts')
+monitor_targets = import_shared_module('monitor_targets')
+monitor_edge_logs = import_shared_module('monitor_edge_logs')
+AlertEngine, AlertRule, load_alert_config = monitor_alerts.AlertEngine, monitor_alerts.AlertRule, monitor_alerts.load_alert_config
+load_targets, select_targets = monitor_targets.load_targets, monitor_targets.select_targets
+EdgeLogCollector = monitor_edge_logs.EdgeLogCollector
 
 # Database configuration
 DB_CONFIG = {
@@ -34,22 +90,362 @@ class Colors:
     NC = '\033[0m'  # No Color
     BOLD = '\033[1m'
 
-def get_db_connection():
-    """Create database connection with timeout"""
+# Keepalives let a long-lived monitoring connection notice a dead peer
+# instead of hanging until the next query times out
+KEEPALIVE_OPTIONS = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3
+}
+
+class MonitorCursor(psycopg2.extensions.cursor):
+    """Cursor that charges statements, rows and (text-size) bytes read to its connection"""
+    def execute(self, query, vars=None):
+        self.connection.statements += 1
+        return super().execute(query, vars)
+
+    def _charge(self, rows):
+        self.connection.rows_read += len(rows)
+        self.connection.bytes_read += sum(len(str(value)) for row in rows for value in row if value is not None)
+        return rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._charge([row])
+        return row
+
+    def fetchmany(self, size=None):
+        return self._charge(super().fetchmany(size) if size is not None else super().fetchmany())
+
+    def fetchall(self):
+        return self._charge(super().fetchall())
+
+class MonitorConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements it has already PREPAREd
+    and counts what the monitor reads through it"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        # Session statement_timeout last SET on this connection, in ms
+        self.statement_timeout = None
+        self.cursor_factory = MonitorCursor
+        self.reset_usage()
+
+    def reset_usage(self):
+        self.statements = 0
+        self.rows_read = 0
+        self.bytes_read = 0
+
+def get_db_connection(connect=None):
+    """Create database connection with timeout.
+
+    connect holds psycopg2.connect() arguments for a target (see
+    scripts/monitor_targets.py); the built-in DB_CONFIG is used without one.
+    """
     try:
         conn = psycopg2.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            database=DB_CONFIG['database'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            connect_timeout=10
+            **(connect or DB_CONFIG),
+            connect_timeout=10,
+            application_name='ux-monitor',
+            connection_factory=MonitorConnection,
+            **KEEPALIVE_OPTIONS
         )
+        # Autocommit so a persistent connection never sits idle in transaction
+        conn.autocommit = True
         return conn
     except Exception as e:
         print(f"{Colors.RED}Error connecting to database: {e}{Colors.NC}")
         return None
 
+def connection_is_alive(conn):
+    """Cheap liveness check that needs no round trip"""
+    return (not conn.closed and
+            conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN)
+
+class MonitorPool:
+    """Small pool of long-lived connections with reconnect and exponential backoff.
+
+    Connections are reused across intervals, so a collection cycle costs only
+    its query time instead of a TCP+TLS+auth handshake. Connections that fail
+    the liveness check or raise a connection error are discarded and replaced.
+    While the database is unreachable, reconnect attempts are spaced out with
+    exponential backoff; callers inside the backoff window fail fast instead
+    of piling up on the server.
+    """
+    def __init__(self, maxconn=4, max_backoff=60, connect=None):
+        self.maxconn = maxconn
+        self.max_backoff = max_backoff
+        self.connect = connect
+        self._idle = []
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._backoff = 0
+        self._next_attempt = 0
+
+    def _connect_with_backoff(self):
+        # The backoff state is shared by the scheduler's worker threads; only
+        # the connect itself runs outside the lock
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_attempt:
+                raise psycopg2.OperationalError(f"reconnect backoff, next attempt in {self._next_attempt - now:.1f}s")
+        conn = get_db_connection(self.connect)
+        with self._lock:
+            if conn:
+                self._backoff = 0
+                return conn
+            # Jitter keeps several monitors from reconnecting in lockstep
+            self._backoff = min(self._backoff * 2 or 1, self.max_backoff)
+            self._next_attempt = time.monotonic() + self._backoff + random.uniform(0, self._backoff / 2)
+            raise psycopg2.OperationalError(f"could not connect, retrying in {self._backoff}s")
+
+    def getconn(self):
+        with self._lock:
+            while not self._idle and self._in_use >= self.maxconn:
+                self._lock.wait()
+            conn = self._idle.pop() if self._idle else None
+            self._in_use += 1
+        try:
+            if conn is not None and not connection_is_alive(conn):
+                conn.close()
+                conn = None
+            return conn or self._connect_with_backoff()
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+    def putconn(self, conn, discard=False):
+        with self._lock:
+            self._in_use -= 1
+            if discard or not connection_is_alive(conn):
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is discarded if the block raises a connection error"""
+        conn = self.getconn()
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self.putconn(conn, discard=True)
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        else:
+            self.putconn(conn)
+
+    def add(self, conn):
+        """Hand an already-open connection to the pool"""
+        with self._lock:
+            self._idle.append(conn)
+            self._lock.notify()
+
+    def closeall(self):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+
+def execute_prepared(cursor, name, sql):
+    """Run a collector query as a server-side prepared statement.
+
+    The statement is PREPAREd once per connection and EXECUTEd afterwards, so
+    repeated collections skip parse/plan overhead.
+    """
+    conn = cursor.connection
+    if name not in conn.prepared:
+        cursor.execute(f"PREPARE {name} AS {sql.strip().rstrip(';')}")
+        conn.prepared.add(name)
+    cursor.execute(f"EXECUTE {name}")
+
+# Set while replaying a recording so windows and trends follow recorded time
+REPLAY_TIME = None
+
+def current_time():
+    """Wall-clock seconds, or the recorded time of the snapshot being replayed"""
+    return REPLAY_TIME if REPLAY_TIME is not None else time.time()
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+class RingBuffer:
+    """Fixed-capacity time series backed by two flat float arrays.
+
+    Samples are stored as raw doubles (no per-sample Python objects), so a
+    buffer holding 2 hours at 1s resolution costs ~115KB and never grows.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, value):
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self.head - 1) % self.capacity]
+
+    def window(self, seconds, now=None):
+        """Values from the last `seconds`, oldest first"""
+        now = now if now is not None else current_time()
+        cutoff = now - seconds
+        result = []
+        # Walk backwards from the newest sample until the window is exhausted
+        for offset in range(1, self.count + 1):
+            index = (self.head - offset) % self.capacity
+            if self.times[index] < cutoff:
+                break
+            result.append(self.values[index])
+        result.reverse()
+        return result
+
+    def stats(self, seconds, now=None):
+        """Rolling min/max/mean/p95 over the last `seconds`, or None if empty"""
+        values = self.window(seconds, now)
+        if not values:
+            return None
+        ordered = sorted(values)
+        return {
+            'count': len(values),
+            'min': ordered[0],
+            'max': ordered[-1],
+            'mean': sum(values) / len(values),
+            'p95': ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+        }
+
+    def sparkline(self, seconds, width=20, now=None):
+        """Render the window as a fixed-width sparkline (bucket maxima)"""
+        values = self.window(seconds, now)
+        if not values:
+            return ''
+        if len(values) > width:
+            step = len(values) / width
+            values = [max(values[int(i * step):max(int((i + 1) * step), int(i * step) + 1)]) for i in range(width)]
+        low, high = min(values), max(values)
+        span = high - low
+        return ''.join(SPARK_CHARS[int((value - low) / span * (len(SPARK_CHARS) - 1)) if span else 0] for value in values)
+
+class MetricHistory:
+    """Registry of per-metric ring buffers with a bounded number of series.
+
+    Per-query series come and go; once max_series is reached the least
+    recently updated series is evicted, so memory stays bounded however long
+    the monitor runs. Listeners (e.g. AlertEngine.observe) see every value.
+    """
+    def __init__(self, capacity=7200, max_series=200):
+        self.capacity = capacity
+        self.max_series = max_series
+        self.series = OrderedDict()
+        self.listeners = []
+
+    def record(self, name, value, timestamp=None):
+        if value is None:
+            return
+        buffer = self.series.get(name)
+        if buffer is None:
+            if len(self.series) >= self.max_series:
+                self.series.popitem(last=False)
+            buffer = self.series[name] = RingBuffer(self.capacity)
+        else:
+            self.series.move_to_end(name)
+        timestamp = timestamp if timestamp is not None else current_time()
+        buffer.append(timestamp, float(value))
+        for listener in self.listeners:
+            listener(name, float(value), timestamp)
+
+    def get(self, name):
+        return self.series.get(name)
+
+def record_history(history, name, result, timestamp=None):
+    """Extract the trended values from one collector result into the history"""
+    if name == 'connections':
+        history.record('connections.total', sum(conn[1] for conn in result['connections']), timestamp)
+        history.record('connections.active',
+                       next((conn[1] for conn in result['connections'] if conn[0] == 'active'), 0), timestamp)
+        history.record('locks.waiting', sum(lock[1] for lock in result['locks']), timestamp)
+    elif name == 'ux':
+        history.record('votes.last_hour', result['voting'][0] or 0, timestamp)
+        history.record('votes.avg_processing', result['voting'][1], timestamp)
+        history.record('bids.last_hour', result['bidding'][0] or 0, timestamp)
+    elif name == 'locks':
+        history.record('locks.blocked', result['waiting'], timestamp)
+        history.record('locks.max_wait', result['max_wait'], timestamp)
+    elif name == 'ash':
+        history.record('ash.active', result['active'], timestamp)
+    elif name == 'replication':
+        history.record('replication.replay_lag', result['replay_lag'], timestamp)
+        for replica in result['replicas']:
+            history.record(f"replication.{replica['replica']}.replay_lag", replica['replay_lag'] or 0, timestamp)
+            history.record(f"replication.{replica['replica']}.lag_bytes", replica['lag_bytes'], timestamp)
+    elif name == 'monitor':
+        history.record('monitor.load', result['load'], timestamp)
+        history.record('monitor.pressure', result['pressure'], timestamp)
+    elif name == 'database':
+        history.record('database.cache_hit_ratio', result['database'][1], timestamp)
+    elif name == 'live':
+        for event in result['events']:
+            history.record(f"live.{event['eid']}.votes", event['votes'], timestamp)
+            history.record(f"live.{event['eid']}.bids", event['bids'], timestamp)
+            for round_number, counts in event['rounds'].items():
+                history.record(f"live.{event['eid']}.round.{round_number}.votes", counts['votes'], timestamp)
+                history.record(f"live.{event['eid']}.round.{round_number}.bids", counts['bids'], timestamp)
+    elif name == 'latency':
+        for source, latency in result['latency'].items():
+            if latency and latency['p95'] not in (None, float('inf')):
+                history.record(f"latency.{source}.p95", latency['p95'], timestamp)
+    elif name == 'queries' and result['interval']:
+        for query in result['slow_queries']:
+            history.record(f"query.{query['queryid']}.mean", query['interval_mean_time'], timestamp)
+        for category in result['categories']:
+            history.record(f"category.{category['category']}.mean", category.get('interval_mean_time'), timestamp)
+    elif name == 'functions' and result['interval']:
+        for func in result['function_stats']:
+            history.record(f"function.{func['funcid']}.mean", func['interval_mean_time'], timestamp)
+    elif name == 'tables':
+        for table in result['table_stats']:
+            history.record(f"table.{table[1]}.dead_tuples", table[10], timestamp)
+            history.record(f"table.{table[1]}.seq_scan", table[2], timestamp)
+    elif name == 'edge':
+        for function in result['functions']:
+            if function['scope'] != 'window':
+                continue
+            history.record(f"edge.{function['function']}.rate", function['rate'], timestamp)
+            history.record(f"edge.{function['function']}.error_rate", function['error_rate'] * 100, timestamp)
+            history.record(f"edge.{function['function']}.p95", function['p95'], timestamp)
+    elif name == 'table_health':
+        for table in result['tables']:
+            history.record(f"table.{table['relname']}.dead_rate", table['dead_rate'], timestamp)
+            history.record(f"table.{table['relname']}.seq_scan_rate", table['seq_scan_rate'], timestamp)
+
+def record_monitor_load(history, governor, timestamp=None):
+    """Trend the monitor's own database load and the pressure it reacts to"""
+    history.record('monitor.load', governor.load, timestamp)
+    history.record('monitor.pressure', governor.pressure, timestamp)
+
+def format_trend(history, name, window=600, width=20, fmt=lambda value: f"{value:.1f}"):
+    """Sparkline plus rolling p95/max for a series, or '' if it has no history yet"""
+    if history is None:
+        return ''
+    buffer = history.get(name)
+    stats = buffer.stats(window) if buffer else None
+    if not stats or stats['count'] < 2:
+        return ''
+    return f" {Colors.CYAN}{buffer.sparkline(window, width)}{Colors.NC} p95 {fmt(stats['p95'])} max {fmt(stats['max'])}"
+
 def format_duration(ms):
     """Format milliseconds to human readable format"""
     if ms < 1000:
@@ -59,6 +455,15 @@ def format_duration(ms):
     else:
         return f"{ms/60000:.1f}m"
 
+def format_age(seconds):
+    """Format an age in seconds as minutes, hours or days"""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    elif seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    else:
+        return f"{seconds / 86400:.1f}d"
+
 def format_bytes(bytes_val):
     """Format bytes to human readable format"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -67,64 +472,462 @@ def format_bytes(bytes_val):
         bytes_val /= 1024.0
     return f"{bytes_val:.1f}TB"
 
-def get_query_performance_stats(conn):
-    """Get slow query statistics from pg_stat_statements"""
+class StatsDeltaTracker:
+    """Turn cumulative pg_stat_* counters into per-interval values.
+
+    Keeps the previous sample in memory keyed by the stat's identity
+    (queryid / funcid). An entry whose counters went backwards was reset or
+    evicted and re-added, so its current values are the interval delta; a
+    changed reset marker (stats_reset) applies the same rule to every entry.
+    Entries that disappear are simply dropped with the old sample.
+    """
+    def __init__(self, key_fields, counter_fields):
+        self.key_fields = key_fields
+        self.counter_fields = counter_fields
+        self.previous = None
+        self.previous_at = None
+        self.previous_reset = None
+
+    def update(self, rows, sampled_at, reset_marker=None):
+        """Record a sample and return {key: {counter: delta, ..., 'elapsed': seconds}}, or None on the first sample"""
+        current = {tuple(row[field] for field in self.key_fields): row for row in rows}
+        previous, previous_at = self.previous, self.previous_at
+        full_reset = previous is not None and reset_marker != self.previous_reset
+
+        self.previous = current
+        self.previous_at = sampled_at
+        self.previous_reset = reset_marker
+
+        if previous is None:
+            return None
+
+        elapsed = max(sampled_at - previous_at, 1e-6)
+        deltas = {}
+        for key, row in current.items():
+            old = None if full_reset else previous.get(key)
+            if old is not None and all(row[field] >= old[field] for field in self.counter_fields):
+                delta = {field: row[field] - old[field] for field in self.counter_fields}
+            else:
+                # New, re-added after eviction, or reset: everything counted happened since
+                delta = {field: row[field] for field in self.counter_fields}
+            delta['elapsed'] = elapsed
+            deltas[key] = delta
+
+        return deltas
+
+# Explicit function -> category mappings win over the regex rules below
+QUERY_CATEGORY_FUNCTIONS = {
+    'cast_vote_secure': 'vote path',
+    'queue_vote_notification': 'vote path',
+    'get_event_weighted_votes': 'vote path',
+    'manual_refresh_vote_weights': 'vote path',
+    'process_bid_secure': 'bid path',
+    'queue_bid_notification': 'bid path',
+    'queue_outbid_notification': 'bid path',
+    'queue_bid_confirmation': 'bid path',
+    'manage_auction_timer': 'auction',
+    'check_and_close_expired_auctions': 'auction',
+    'close_auction_manually': 'auction',
+    'send_auction_closing_notifications': 'auction',
+    'get_auction_summary': 'auction',
+    'get_admin_auction_details': 'auction',
+}
+
+# (pattern, category) in priority order; the first match wins
+QUERY_CATEGORY_RULES = [
+    (re.compile(r'\b(pg_stat_\w+|pg_locks|pg_catalog|pg_class|pg_database_size)\b', re.I), 'monitoring'),
+    (re.compile(r'\bvotes?\b|vote_weights', re.I), 'vote path'),
+    (re.compile(r'\bbids\b', re.I), 'bid path'),
+    (re.compile(r'auction', re.I), 'auction'),
+    (re.compile(r'payment|stripe', re.I), 'payments'),
+    (re.compile(r'\b(art|art_media|events|rounds|round_contestants)\b', re.I), 'art & events'),
+    (re.compile(r'\bartist_\w+', re.I), 'artists'),
+    (re.compile(r'\brealtime\.|wal2json|pg_logical', re.I), 'realtime'),
+    (re.compile(r'\bauth\.', re.I), 'auth'),
+]
+
+# Categories left out of the slowest-statements list (still aggregated)
+UNRANKED_CATEGORIES = {'monitoring', 'realtime', 'other'}
+
+FUNCTION_CALL_PATTERN = re.compile(r'\b(' + '|'.join(QUERY_CATEGORY_FUNCTIONS) + r')\s*\(', re.I)
+
+def classify_query(text):
+    """Map statement text to a category using the function mappings, then the rules"""
+    match = FUNCTION_CALL_PATTERN.search(text or '')
+    if match:
+        return QUERY_CATEGORY_FUNCTIONS[match.group(1).lower()]
+    for pattern, category in QUERY_CATEGORY_RULES:
+        if pattern.search(text or ''):
+            return category
+    return 'other'
+
+class QueryClassifier:
+    """LRU cache of queryid -> (category, preview).
+
+    Statement text is only fetched for queryids the cache has not seen, so a
+    steady-state poll reads numeric pg_stat_statements columns only.
+    """
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def unseen(self, queryids):
+        return [queryid for queryid in queryids if queryid not in self.entries]
+
+    def learn(self, queryid, text):
+        self.entries[queryid] = (classify_query(text), (text or '')[:100])
+        self.entries.move_to_end(queryid)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def lookup(self, queryid):
+        entry = self.entries.get(queryid)
+        if entry is None:
+            return ('other', '')
+        self.entries.move_to_end(queryid)
+        return entry
+
+def top_rows(rows, keys, limit):
+    """Union of the top `limit` rows by each key, so any of those orderings can be shown exactly"""
+    chosen = {}
+    for key in keys:
+        for row in heapq.nlargest(limit, rows, key=lambda row: row[key]):
+            chosen[id(row)] = row
+    return list(chosen.values())
+
+def get_query_performance_stats(conn, tracker=None, classifier=None, plan_detector=None, dashboard_rows=0):
+    """Get slow query statistics from pg_stat_statements, grouped by category.
+
+    Only numeric columns are read on each poll (pg_stat_statements(false)
+    skips the query text file); text is fetched once per unseen queryid and
+    classified through the QueryClassifier. With a StatsDeltaTracker the rows
+    carry per-interval calls/sec, mean and total time and buffer hit ratio,
+    and are ranked by interval mean time; a PlanRegressionDetector then
+    checks them for mean-time jumps and plan changes. dashboard_rows keeps
+    that many of the busiest statements by each sortable --tui column.
+    """
     cursor = conn.cursor()
+    classifier = classifier if classifier is not None else QueryClassifier()
     
-    # Get slowest queries affecting user experience
-    slow_queries = """
+    # Cumulative counters for every statement; ranking happens client-side
+    statement_counters = """
     SELECT 
-        substring(query, 1, 100) as query_preview,
+        userid,
+        dbid,
+        queryid,
         calls,
         total_exec_time,
-        mean_exec_time,
         max_exec_time,
-        rows/calls as avg_rows,
-        100.0 * shared_blks_hit / nullif(shared_blks_hit + shared_blks_read, 0) as hit_ratio
-    FROM pg_stat_statements 
-    WHERE query ILIKE ANY(ARRAY['%vote%', '%bid%', '%art%', '%get_%', '%cast_%'])
-    AND calls > 10
-    ORDER BY mean_exec_time DESC 
-    LIMIT 10;
+        rows,
+        shared_blks_hit,
+        shared_blks_read,
+        (SELECT stats_reset FROM pg_stat_statements_info) as stats_reset
+    FROM pg_stat_statements(false)
+    WHERE calls > 0;
     """
     
-    cursor.execute(slow_queries)
-    results = cursor.fetchall()
+    execute_prepared(cursor, 'ux_statement_counters', statement_counters)
+    columns = [desc[0] for desc in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    sampled_at = time.monotonic()
+    
+    unseen = classifier.unseen({row['queryid'] for row in rows})
+    if unseen:
+        cursor.execute("""
+            SELECT DISTINCT ON (queryid) queryid, substring(query, 1, 2000)
+            FROM pg_stat_statements
+            WHERE queryid = ANY(%s)
+        """, (unseen,))
+        for queryid, text in cursor.fetchall():
+            classifier.learn(queryid, text)
+    
+    for row in rows:
+        row['category'], row['query_preview'] = classifier.lookup(row['queryid'])
+        row['mean_exec_time'] = row['total_exec_time'] / row['calls']
+        row['avg_rows'] = row['rows'] / row['calls']
+        blocks = row['shared_blks_hit'] + row['shared_blks_read']
+        row['hit_ratio'] = 100.0 * row['shared_blks_hit'] / blocks if blocks else None
+    
+    deltas = tracker.update(rows, sampled_at, rows[0]['stats_reset'] if rows else None) if tracker else None
+    
+    categories = defaultdict(lambda: {'queries': 0, 'calls': 0, 'total_time': 0.0,
+                                      'interval_calls': 0, 'interval_total_time': 0.0, 'elapsed': None})
+    for row in rows:
+        category = categories[row['category']]
+        category['queries'] += 1
+        category['calls'] += row['calls']
+        category['total_time'] += row['total_exec_time']
+    
+    if deltas is None:
+        results = sorted((row for row in rows if row['calls'] > 10 and row['category'] not in UNRANKED_CATEGORIES),
+                         key=lambda row: row['mean_exec_time'], reverse=True)[:10]
+        active = []
+    else:
+        results = []
+        for row in rows:
+            delta = deltas[(row['userid'], row['dbid'], row['queryid'])]
+            category = categories[row['category']]
+            category['elapsed'] = delta['elapsed']
+            if delta['calls'] <= 0:
+                continue
+            category['interval_calls'] += delta['calls']
+            category['interval_total_time'] += delta['total_exec_time']
+            blocks = delta['shared_blks_hit'] + delta['shared_blks_read']
+            row.update({
+                'interval_calls': delta['calls'],
+                'calls_per_sec': delta['calls'] / delta['elapsed'],
+                'interval_mean_time': delta['total_exec_time'] / delta['calls'],
+                'interval_total_time': delta['total_exec_time'],
+                'interval_hit_ratio': 100.0 * delta['shared_blks_hit'] / blocks if blocks else None
+            })
+            if row['category'] not in UNRANKED_CATEGORIES:
+                results.append(row)
+        active = top_rows(results, ('calls_per_sec', 'interval_mean_time', 'interval_total_time'), dashboard_rows)
+        results = sorted(results, key=lambda row: row['interval_mean_time'], reverse=True)[:10]
+    
+    for name, category in categories.items():
+        category['category'] = name
+        category['mean_time'] = category['total_time'] / category['calls']
+        if deltas is not None and category['interval_calls']:
+            category['calls_per_sec'] = category['interval_calls'] / category['elapsed']
+            category['interval_mean_time'] = category['interval_total_time'] / category['interval_calls']
+    
+    regressions = []
+    if plan_detector is not None and deltas is not None:
+        regressions = plan_detector.inspect(conn, [row for row in rows if 'interval_mean_time' in row])
     
     return {
         'slow_queries': results,
+        'active_queries': active,
+        'plan_regressions': regressions,
+        'categories': sorted(categories.values(), key=lambda c: c['interval_total_time'] if deltas is not None else c['total_time'], reverse=True),
+        'interval': deltas is not None,
         'timestamp': datetime.now()
     }
 
-def get_function_performance_stats(conn):
-    """Get edge function and stored procedure performance"""
+# Plan node keys that define a plan's shape; costs and row estimates are ignored
+PLAN_SHAPE_KEYS = ('Node Type', 'Parent Relationship', 'Join Type', 'Strategy', 'Scan Direction',
+                   'Relation Name', 'Index Name', 'CTE Name', 'Function Name', 'Subplan Name')
+
+EXPLAINABLE_STATEMENT = re.compile(r'^\s*(\(|select|with|insert|update|delete|values)\b', re.I)
+
+def plan_shape(node, depth=0):
+    """Flatten an EXPLAIN (FORMAT JSON) plan tree into one indented line per node"""
+    details = ' '.join(f"{node[key]}" for key in PLAN_SHAPE_KEYS[1:] if node.get(key))
+    lines = [f"{'  ' * depth}{node['Node Type']}{' ' + details if details else ''}"]
+    for child in node.get('Plans', []):
+        lines.extend(plan_shape(child, depth + 1))
+    return lines
+
+def capture_generic_plan(cursor, text):
+    """EXPLAIN the generic plan of a normalized pg_stat_statements statement.
+
+    The statement is PREPAREd with its $n parameters left untyped and
+    executed under plan_cache_mode = force_generic_plan with NULL arguments,
+    so the plan never depends on sample values. Plain EXPLAIN only: nothing
+    is ever executed against production.
+    """
+    params = max((int(n) for n in re.findall(r'\$(\d+)', text)), default=0)
+    args = f"({', '.join(['NULL'] * params)})" if params else ''
+    prepared = False
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+        cursor.execute(f"PREPARE ux_explain_capture AS {text}")
+        prepared = True
+        cursor.execute(f"EXPLAIN (FORMAT JSON, COSTS true) EXECUTE ux_explain_capture{args}")
+        plan = cursor.fetchone()[0]
+    finally:
+        # Prepared statements survive ROLLBACK, so drop it outside the transaction
+        cursor.execute("ROLLBACK")
+        if prepared:
+            cursor.execute("DEALLOCATE ux_explain_capture")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+class PlanRegressionDetector:
+    """Capture generic plans for statements whose interval mean time jumps.
+
+    A statement is flagged when its interval mean exceeds `ratio` times its
+    baseline (an EWMA of earlier healthy intervals). Its current generic plan
+    is then captured and compared with the last known good plan for the same
+    queryid; good plans are captured for a few healthy ranked statements per
+    poll. Plans are kept per queryid and plan hash, optionally persisted to
+    a JSON cache file.
+    """
+    def __init__(self, ratio=3.0, min_mean_ms=50, min_calls=5, cooldown_seconds=600,
+                 good_captures_per_poll=2, cache_file=None, alpha=0.2):
+        self.ratio = ratio
+        self.min_mean_ms = min_mean_ms
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.good_captures_per_poll = good_captures_per_poll
+        self.cache_file = cache_file
+        self.alpha = alpha
+        self.baselines = {}
+        self.last_capture = {}
+        self.plans = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file) as f:
+                self.plans = {int(queryid): entry for queryid, entry in json.load(f).items()}
+
+    def save(self):
+        if not self.cache_file:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.plans, f, default=str)
+        os.replace(tmp_file, self.cache_file)
+
+    def _capture(self, cursor, row, good):
+        # queryids are only unique per database and user; text recorded in
+        # another database would be explained against the wrong schema
+        queryid = row['queryid']
+        cursor.execute("""
+            SELECT query
+            FROM pg_stat_statements
+            WHERE queryid = %s
+            AND userid = %s
+            AND dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+            LIMIT 1
+        """, (queryid, row['userid']))
+        text = cursor.fetchone()
+        if not text or not EXPLAINABLE_STATEMENT.match(text[0]):
+            return None
+        plan = capture_generic_plan(cursor, text[0])
+        shape = plan_shape(plan)
+        plan_hash = hashlib.sha1('\n'.join(shape).encode()).hexdigest()[:12]
+        entry = self.plans.setdefault(queryid, {'good': None, 'plans': {}})
+        stored = entry['plans'].setdefault(plan_hash, {'shape': shape, 'total_cost': plan.get('Total Cost'),
+                                                       'first_seen': datetime.now().isoformat()})
+        stored['last_seen'] = datetime.now().isoformat()
+        if good and entry['good'] is None:
+            entry['good'] = plan_hash
+        self.last_capture[queryid] = time.monotonic()
+        return plan_hash
+
+    def inspect(self, conn, rows):
+        """Check interval rows for regressions, returning one report per flagged statement"""
+        cursor = conn.cursor()
+        now = time.monotonic()
+        regressions = []
+        good_budget = self.good_captures_per_poll
+        changed = False
+        
+        for row in rows:
+            if row.get('interval_calls', 0) < self.min_calls:
+                continue
+            queryid, mean = row['queryid'], row['interval_mean_time']
+            baseline = self.baselines.get(queryid)
+            cooling = now - self.last_capture.get(queryid, float('-inf')) < self.cooldown_seconds
+            
+            if baseline and mean >= self.min_mean_ms and mean > baseline * self.ratio:
+                if cooling:
+                    continue
+                try:
+                    plan_hash = self._capture(cursor, row, good=False)
+                except psycopg2.Error as e:
+                    self.last_capture[queryid] = now
+                    regressions.append({'queryid': queryid, 'row': row, 'baseline': baseline, 'error': str(e).strip()})
+                    continue
+                if plan_hash is None:
+                    continue
+                changed = True
+                entry = self.plans[queryid]
+                good_hash = entry['good']
+                diff = []
+                if good_hash and good_hash != plan_hash:
+                    diff = [line for line in difflib.unified_diff(
+                        entry['plans'][good_hash]['shape'], entry['plans'][plan_hash]['shape'], lineterm='', n=1)
+                        if not line.startswith(('---', '+++'))]
+                regressions.append({'queryid': queryid, 'row': row, 'baseline': baseline,
+                                    'plan_hash': plan_hash, 'good_hash': good_hash,
+                                    'plan_changed': bool(good_hash) and good_hash != plan_hash, 'diff': diff})
+                # A regressed interval does not feed the baseline
+                continue
+            
+            self.baselines[queryid] = mean if baseline is None else baseline + self.alpha * (mean - baseline)
+            known_good = self.plans.get(queryid, {}).get('good')
+            if (not known_good and good_budget > 0 and not cooling
+                    and row.get('category') not in UNRANKED_CATEGORIES):
+                good_budget -= 1
+                try:
+                    changed = self._capture(cursor, row, good=True) is not None or changed
+                except psycopg2.Error:
+                    self.last_capture[queryid] = now
+        
+        if changed:
+            self.save()
+        return regressions
+
+def get_function_performance_stats(conn, tracker=None, dashboard_rows=0):
+    """Get edge function and stored procedure performance.
+
+    With a StatsDeltaTracker the rows carry per-interval calls/sec and mean
+    total/self time, and are ranked by interval mean time; dashboard_rows
+    keeps that many of the busiest functions by each sortable --tui column.
+    """
     cursor = conn.cursor()
     
     # Check for function call statistics
     function_stats = """
     SELECT 
+        funcid,
         schemaname,
         funcname,
         calls,
         total_time,
         self_time,
-        CASE WHEN calls > 0 THEN total_time / calls ELSE 0 END as mean_time,
-        CASE WHEN calls > 0 THEN self_time / calls ELSE 0 END as mean_self_time
+        (SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()) as stats_reset
     FROM pg_stat_user_functions 
     WHERE schemaname = 'public'
-    AND calls > 0
-    ORDER BY (CASE WHEN calls > 0 THEN total_time / calls ELSE 0 END) DESC 
-    LIMIT 15;
+    AND calls > 0;
     """
     
-    cursor.execute(function_stats)
-    results = cursor.fetchall()
+    execute_prepared(cursor, 'ux_function_stats', function_stats)
+    columns = [desc[0] for desc in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    sampled_at = time.monotonic()
+    
+    for row in rows:
+        row['mean_time'] = row['total_time'] / row['calls']
+        row['mean_self_time'] = row['self_time'] / row['calls']
+    
+    deltas = tracker.update(rows, sampled_at, rows[0]['stats_reset'] if rows else None) if tracker else None
+    
+    if deltas is None:
+        results = sorted(rows, key=lambda row: row['mean_time'], reverse=True)[:15]
+        active = []
+    else:
+        results = []
+        for row in rows:
+            delta = deltas[(row['funcid'],)]
+            if delta['calls'] <= 0:
+                continue
+            row.update({
+                'interval_calls': delta['calls'],
+                'calls_per_sec': delta['calls'] / delta['elapsed'],
+                'interval_mean_time': delta['total_time'] / delta['calls'],
+                'interval_mean_self_time': delta['self_time'] / delta['calls'],
+                'interval_total_time': delta['total_time']
+            })
+            results.append(row)
+        active = top_rows(results, ('calls_per_sec', 'interval_mean_time', 'interval_total_time'), dashboard_rows)
+        results = sorted(results, key=lambda row: row['interval_mean_time'], reverse=True)[:15]
     
     return {
         'function_stats': results,
+        'active_functions': active,
+        'interval': deltas is not None,
         'timestamp': datetime.now()
     }
 
+# Column order of get_table_performance_stats rows
+TABLE_STAT_COLUMNS = ('schemaname', 'relname', 'seq_scan', 'seq_tup_read', 'idx_scan', 'idx_tup_fetch',
+                      'n_tup_ins', 'n_tup_upd', 'n_tup_del', 'n_live_tup', 'n_dead_tup',
+                      'last_vacuum', 'last_autovacuum', 'vacuum_count', 'autovacuum_count')
+
 def get_table_performance_stats(conn):
     """Get table-level performance metrics"""
     cursor = conn.cursor()
@@ -152,7 +955,7 @@ def get_table_performance_stats(conn):
     ORDER BY seq_scan DESC;
     """
     
-    cursor.execute(table_stats)
+    execute_prepared(cursor, 'ux_table_stats', table_stats)
     results = cursor.fetchall()
     
     return {
@@ -160,6 +963,259 @@ def get_table_performance_stats(conn):
         'timestamp': datetime.now()
     }
 
+def parse_reloptions(reloptions):
+    """pg_class.reloptions ['key=value', ...] as a dict"""
+    return dict(option.split('=', 1) for option in reloptions or [])
+
+def counter_rate(samples, field, since, until=None):
+    """Per-minute increase of samples[field] between two times, or None with under a minute of data"""
+    window = [sample for sample in samples if sample[0] >= since and (until is None or sample[0] <= until)]
+    if len(window) < 2 or window[-1][0] - window[0][0] < 60:
+        return None
+    return (window[-1][field] - window[0][field]) / (window[-1][0] - window[0][0]) * 60
+
+class TableHealthAdvisor:
+    """Track vacuum pressure, seq-scan trends and index usage for the critical tables.
+
+    Keeps an hour of samples per table: dead/inserted tuple growth since the
+    last vacuum (restarted whenever the table is vacuumed) and the seq_scan
+    counter (restarted on a stats reset). From these it projects when
+    autovacuum will next trigger under the table's reloptions or the server
+    GUCs, estimates bloat growth, and flags seq scans climbing well above
+    their baseline. Indexes with no scans, or whose key columns are a
+    leading prefix of another btree index with the same opclasses,
+    expressions and predicate, are reported with the table.
+    """
+    def __init__(self, window_seconds=3600, recent_seconds=300, climb_ratio=2.0, min_seq_rate=1.0,
+                 min_unused_age=timedelta(days=7)):
+        self.window_seconds = window_seconds
+        self.recent_seconds = recent_seconds
+        self.climb_ratio = climb_ratio
+        self.min_seq_rate = min_seq_rate
+        self.min_unused_age = min_unused_age
+        self.growth = defaultdict(deque)
+        self.scans = defaultdict(deque)
+
+    def collect(self, conn):
+        cursor = conn.cursor()
+        
+        settings_query = """
+        SELECT name, setting
+        FROM pg_settings
+        WHERE name IN ('autovacuum', 'autovacuum_naptime', 'autovacuum_vacuum_threshold', 'autovacuum_vacuum_scale_factor',
+                       'autovacuum_vacuum_insert_threshold', 'autovacuum_vacuum_insert_scale_factor');
+        """
+        execute_prepared(cursor, 'ux_autovacuum_settings', settings_query)
+        settings = dict(cursor.fetchall())
+        
+        table_health = """
+        SELECT 
+            s.relname,
+            c.reltuples,
+            c.reloptions,
+            pg_table_size(s.relid) as table_bytes,
+            s.n_live_tup,
+            s.n_dead_tup,
+            s.n_ins_since_vacuum,
+            s.n_tup_upd,
+            s.n_tup_hot_upd,
+            s.seq_scan,
+            s.seq_tup_read,
+            s.vacuum_count + s.autovacuum_count as vacuums,
+            EXTRACT(EPOCH FROM (now() - GREATEST(s.last_vacuum, s.last_autovacuum))) as vacuum_age
+        FROM pg_stat_user_tables s
+        JOIN pg_class c ON c.oid = s.relid
+        WHERE s.relname IN ('votes', 'bids', 'art', 'round_contestants', 'events', 'people');
+        """
+        execute_prepared(cursor, 'ux_table_health', table_health)
+        columns = [desc[0] for desc in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        index_health = """
+        SELECT 
+            s.relname,
+            s.indexrelname,
+            s.idx_scan,
+            pg_relation_size(s.indexrelid) as index_bytes,
+            i.indisunique OR i.indisprimary as is_unique,
+            array_to_string((i.indkey::int2[])[0:i.indnkeyatts - 1], ' ') as key_columns,
+            array_to_string((i.indclass::oid[])[0:i.indnkeyatts - 1], ' ') as key_opclasses,
+            array_to_string((i.indcollation::oid[])[0:i.indnkeyatts - 1], ' ') as key_collations,
+            array_to_string((i.indoption::int2[])[0:i.indnkeyatts - 1], ' ') as key_options,
+            array_to_string((i.indkey::int2[])[i.indnkeyatts:i.indnatts - 1], ' ') as include_columns,
+            pg_get_expr(i.indexprs, i.indrelid) as expressions,
+            pg_get_expr(i.indpred, i.indrelid) as predicate,
+            am.amname as method,
+            (SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()) as stats_reset
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        JOIN pg_class ic ON ic.oid = s.indexrelid
+        JOIN pg_am am ON am.oid = ic.relam
+        WHERE s.relname IN ('votes', 'bids', 'art', 'round_contestants', 'events', 'people');
+        """
+        execute_prepared(cursor, 'ux_index_health', index_health)
+        columns = [desc[0] for desc in cursor.description]
+        indexes = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        now = time.monotonic()
+        tables = [self.assess(row, settings, now) for row in rows]
+        findings = self.index_findings(indexes)
+        for table in tables:
+            table['suggestions'].extend(finding['suggestion'] for finding in findings if finding['table'] == table['relname'])
+        
+        return {
+            'tables': sorted(tables, key=lambda table: len(table['suggestions']), reverse=True),
+            'indexes': findings,
+            'settings': settings,
+            'timestamp': datetime.now()
+        }
+
+    def assess(self, row, settings, now):
+        """Project the next autovacuum and collect suggestions for one table"""
+        relname = row['relname']
+        options = parse_reloptions(row['reloptions'])
+        setting = lambda name: float(options.get(name, settings[name]))
+        enabled = settings['autovacuum'] == 'on' and options.get('autovacuum_enabled', 'true').lower() not in ('false', 'off', '0')
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        reltuples = max(row['reltuples'], 0)
+        scale_factor = setting('autovacuum_vacuum_scale_factor')
+        vacuum_trigger = setting('autovacuum_vacuum_threshold') + scale_factor * reltuples
+        insert_threshold = setting('autovacuum_vacuum_insert_threshold')
+        insert_trigger = (insert_threshold + setting('autovacuum_vacuum_insert_scale_factor') * reltuples
+                          if insert_threshold >= 0 else None)
+        
+        growth, scans = self.growth[relname], self.scans[relname]
+        if growth and growth[-1][3] != row['vacuums']:
+            growth.clear()
+        if scans and row['seq_scan'] < scans[-1][1]:
+            scans.clear()
+        growth.append((now, row['n_dead_tup'], row['n_ins_since_vacuum'] or 0, row['vacuums']))
+        scans.append((now, row['seq_scan']))
+        for samples in (growth, scans):
+            while samples[0][0] < now - self.window_seconds:
+                samples.popleft()
+        
+        dead_rate = counter_rate(growth, 1, now - self.window_seconds)
+        insert_rate = counter_rate(growth, 2, now - self.window_seconds)
+        tuples = row['n_live_tup'] + row['n_dead_tup']
+        bloat_rate = dead_rate * row['table_bytes'] / tuples if dead_rate is not None and tuples else None
+        
+        due = row['n_dead_tup'] >= vacuum_trigger or (insert_trigger is not None and (row['n_ins_since_vacuum'] or 0) >= insert_trigger)
+        etas = []
+        if dead_rate and dead_rate > 0:
+            etas.append((vacuum_trigger - row['n_dead_tup']) / dead_rate * 60)
+        if insert_trigger is not None and insert_rate and insert_rate > 0:
+            etas.append((insert_trigger - (row['n_ins_since_vacuum'] or 0)) / insert_rate * 60)
+        eta = 0 if due else (min(etas) if etas else None)
+        
+        seq_rate = counter_rate(scans, 1, now - self.recent_seconds)
+        seq_baseline = counter_rate(scans, 1, now - self.window_seconds, now - self.recent_seconds)
+        climbing = (seq_rate is not None and seq_baseline is not None
+                    and seq_rate >= max(self.min_seq_rate, seq_baseline * self.climb_ratio))
+        avg_seq_rows = row['seq_tup_read'] / row['seq_scan'] if row['seq_scan'] else 0
+        dead_pct = 100.0 * row['n_dead_tup'] / row['n_live_tup'] if row['n_live_tup'] else 0.0
+        
+        suggestions = []
+        naptime = float(settings['autovacuum_naptime'])
+        if not enabled:
+            suggestions.append(f"Autovacuum is off for {relname}; ALTER TABLE {relname} RESET (autovacuum_enabled) "
+                               f"or schedule manual VACUUMs")
+        elif due and (row['vacuum_age'] is None or row['vacuum_age'] > 10 * naptime):
+            vacuumed = f"not vacuumed for {format_age(row['vacuum_age'])}" if row['vacuum_age'] is not None else "never vacuumed"
+            suggestions.append(f"Past its autovacuum trigger ({row['n_dead_tup']:,} dead >= {vacuum_trigger:,.0f}) but "
+                               f"{vacuumed}; look for long-running transactions or all autovacuum workers busy")
+        if enabled and dead_pct > 10 and scale_factor >= 0.05 and (eta is None or eta > 3600):
+            suggested = 1000 + 0.02 * reltuples
+            suggestions.append(f"ALTER TABLE {relname} SET (autovacuum_vacuum_scale_factor = 0.02, "
+                               f"autovacuum_vacuum_threshold = 1000): vacuum at ~{suggested:,.0f} dead tuples "
+                               f"instead of {vacuum_trigger:,.0f}")
+        hot_ratio = row['n_tup_hot_upd'] / row['n_tup_upd'] if row['n_tup_upd'] else None
+        fillfactor = int(options.get('fillfactor', 100))
+        if dead_rate and dead_rate > 0 and hot_ratio is not None and hot_ratio < 0.5 and fillfactor == 100:
+            suggestions.append(f"Only {hot_ratio:.0%} of updates are HOT while dead tuples grow {dead_rate:,.0f}/min; "
+                               f"ALTER TABLE {relname} SET (fillfactor = 90) leaves room for in-page updates")
+        if climbing:
+            suggestions.append(f"Sequential scans climbing: {seq_rate:.1f}/min vs {seq_baseline:.1f}/min baseline, "
+                               f"~{avg_seq_rows:,.0f} rows each; find the statement filtering {relname} in "
+                               f"pg_stat_statements and index its filter columns")
+        
+        return {
+            'relname': relname,
+            'live': row['n_live_tup'],
+            'dead': row['n_dead_tup'],
+            'dead_pct': dead_pct,
+            'table_bytes': row['table_bytes'],
+            'autovacuum_enabled': enabled,
+            'vacuum_trigger': vacuum_trigger,
+            'insert_trigger': insert_trigger,
+            'dead_rate': dead_rate,
+            'insert_rate': insert_rate,
+            'bloat_rate': bloat_rate,
+            'due': due,
+            'eta': eta,
+            'vacuum_age': float(row['vacuum_age']) if row['vacuum_age'] is not None else None,
+            'seq_scan_rate': seq_rate,
+            'seq_scan_baseline': seq_baseline,
+            'seq_scan_climbing': climbing,
+            'avg_seq_rows': avg_seq_rows,
+            'suggestions': suggestions
+        }
+
+    def index_findings(self, indexes):
+        """Unused indexes, and btree indexes whose key columns lead another index with the same definition.
+
+        Keys are compared column by column together with their operator
+        class, collation and sort options; INCLUDE columns are not keys, but
+        must also be present in the covering index. Expressions and
+        predicates must match exactly. Unused indexes are only reported once
+        the database's statistics cover min_unused_age, so a recent stats
+        reset never produces DROP advice.
+        """
+        findings = []
+        for index in indexes:
+            if index['is_unique']:
+                continue
+            stats_reset = index['stats_reset']
+            if not index['idx_scan']:
+                if stats_reset is not None and datetime.now(stats_reset.tzinfo) - stats_reset < self.min_unused_age:
+                    continue
+                since = f"since {stats_reset:%Y-%m-%d}" if stats_reset else "since statistics were reset"
+                findings.append({
+                    'table': index['relname'], 'index': index['indexrelname'], 'issue': 'unused',
+                    'index_bytes': index['index_bytes'], 'covered_by': None,
+                    'suggestion': f"Index {index['indexrelname']} ({format_bytes(index['index_bytes'])}) has no scans {since}; "
+                                  f"if replicas don't use it either, DROP INDEX CONCURRENTLY {index['indexrelname']}"
+                })
+                continue
+            if index['method'] != 'btree':
+                continue
+            keys = index_key_columns(index)
+            for other in indexes:
+                other_keys = index_key_columns(other)
+                if (other is index or other['relname'] != index['relname'] or other['method'] != 'btree'
+                        or other['expressions'] != index['expressions'] or other['predicate'] != index['predicate']
+                        or other_keys[:len(keys)] != keys
+                        or not set(index['include_columns'].split()) <= {column for column, *_ in other_keys}
+                        | set(other['include_columns'].split())):
+                    continue
+                # Identical keys: keep the unique one, otherwise the first by name
+                if len(other_keys) == len(keys) and not other['is_unique'] and other['indexrelname'] > index['indexrelname']:
+                    continue
+                findings.append({
+                    'table': index['relname'], 'index': index['indexrelname'], 'issue': 'redundant',
+                    'index_bytes': index['index_bytes'], 'covered_by': other['indexrelname'],
+                    'suggestion': f"Index {index['indexrelname']} ({format_bytes(index['index_bytes'])}) is covered by "
+                                  f"{other['indexrelname']}; DROP INDEX CONCURRENTLY {index['indexrelname']} "
+                                  f"after checking the definitions match"
+                })
+                break
+        return findings
+
+def index_key_columns(index):
+    """(column, opclass, collation, options) per key column of an index_health row"""
+    return list(zip(index['key_columns'].split(), index['key_opclasses'].split(),
+                    index['key_collations'].split(), index['key_options'].split()))
+
 def get_connection_and_lock_stats(conn):
     """Get database connection and locking statistics"""
     cursor = conn.cursor()
@@ -176,7 +1232,7 @@ def get_connection_and_lock_stats(conn):
     ORDER BY connection_count DESC;
     """
     
-    cursor.execute(connection_stats)
+    execute_prepared(cursor, 'ux_connection_stats', connection_stats)
     connection_results = cursor.fetchall()
     
     # Lock waits
@@ -189,30 +1245,209 @@ def get_connection_and_lock_stats(conn):
     GROUP BY mode;
     """
     
-    cursor.execute(lock_stats)
+    execute_prepared(cursor, 'ux_lock_stats', lock_stats)
     lock_results = cursor.fetchall()
     
+    return {
+        'connections': connection_results,
+        'locks': lock_results,
+        'timestamp': datetime.now()
+    }
+
+# Columns shown when a tuple lock resolves to a row in one of the hot tables
+LOCK_ROW_COLUMNS = {
+    'bids': "id::text, 'art ' || art_id::text || ' amount ' || amount::text",
+    'art': "id::text, art_code",
+    'votes': "id::text, 'art ' || art_id::text || ' round ' || round::text",
+}
+
+def get_lock_tree(conn):
+    """Build the blocker -> waiter tree for backends waiting on heavyweight locks.
+
+    pg_blocking_pids() is only evaluated for backends whose wait_event_type is
+    'Lock', so an uncontended sample is a single scan of pg_stat_activity.
+    Tuple locks (held while waiting on the row's xid, or awaited by later
+    waiters) are resolved back to bids/art/votes rows by ctid.
+    """
+    cursor = conn.cursor()
+    
+    lock_tree = """
+    WITH waiters AS (
+        SELECT
+            a.pid,
+            pg_blocking_pids(a.pid) as blocked_by,
+            a.application_name,
+            a.wait_event,
+            EXTRACT(EPOCH FROM (now() - COALESCE(wl.waitstart, a.state_change))) as wait_seconds,
+            wl.locktype,
+            wl.mode,
+            wl.relation::regclass::text as relation,
+            tl.relation::regclass::text as tuple_relation,
+            '(' || tl.page || ',' || tl.tuple || ')' as tuple_ctid,
+            LEFT(a.query, 120) as query
+        FROM pg_stat_activity a
+        LEFT JOIN LATERAL (
+            SELECT * FROM pg_locks l WHERE l.pid = a.pid AND NOT l.granted LIMIT 1
+        ) wl ON true
+        LEFT JOIN LATERAL (
+            SELECT * FROM pg_locks l WHERE l.pid = a.pid AND l.locktype = 'tuple' LIMIT 1
+        ) tl ON true
+        WHERE a.wait_event_type = 'Lock'
+    )
+    SELECT pid, blocked_by, application_name, wait_event, wait_seconds,
+           locktype, mode, relation, tuple_relation, tuple_ctid, query
+    FROM waiters
+    UNION ALL
+    SELECT a.pid, '{}'::int[], a.application_name, COALESCE(a.wait_event, a.state),
+           EXTRACT(EPOCH FROM (now() - a.xact_start)), NULL, NULL, NULL, NULL, NULL,
+           LEFT(a.query, 120)
+    FROM pg_stat_activity a
+    WHERE a.pid IN (SELECT unnest(blocked_by) FROM waiters)
+    AND a.pid NOT IN (SELECT pid FROM waiters);
+    """
+    
+    execute_prepared(cursor, 'ux_lock_tree', lock_tree)
+    backends = {}
+    for pid, blocked_by, app, wait_event, wait_seconds, locktype, mode, relation, tuple_relation, tuple_ctid, query in cursor.fetchall():
+        backends[pid] = {
+            'pid': pid, 'blocked_by': blocked_by or [], 'application': app, 'wait_event': wait_event,
+            'seconds': float(wait_seconds or 0), 'locktype': locktype, 'mode': mode, 'relation': relation,
+            'tuple': (tuple_relation, tuple_ctid) if tuple_ctid else None, 'query': query,
+            'waiters': []
+        }
+    
+    waiting = [b for b in backends.values() if b['blocked_by']]
+    for waiter in waiting:
+        for blocker in waiter['blocked_by']:
+            if blocker in backends:
+                backends[blocker]['waiters'].append(waiter['pid'])
+    
+    # Roots hold locks without waiting themselves; a cycle (deadlock about to
+    # be broken by the detector) has no root, so its members are listed instead
+    roots = [b['pid'] for b in backends.values() if not b['blocked_by']]
+    if waiting and not roots:
+        roots = [waiting[0]['pid']]
+    
+    def subtree_size(pid, seen):
+        total = 0
+        for child in backends[pid]['waiters']:
+            if child not in seen:
+                seen.add(child)
+                total += 1 + subtree_size(child, seen)
+        return total
+    for pid in roots:
+        backends[pid]['total_waiters'] = subtree_size(pid, {pid})
+    roots.sort(key=lambda pid: backends[pid]['total_waiters'], reverse=True)
+    
+    # Hot rows: tuples with several backends queued behind them
+    hot_rows = defaultdict(list)
+    for waiter in waiting:
+        if waiter['tuple']:
+            hot_rows[waiter['tuple']].append(waiter['seconds'])
+    
+    rows = {}
+    by_table = defaultdict(list)
+    for relation, ctid in hot_rows:
+        by_table[relation].append(ctid)
+    for relation, ctids in by_table.items():
+        table = relation.split('.')[-1]
+        if table not in LOCK_ROW_COLUMNS:
+            continue
+        cursor.execute(f"SELECT ctid::text, {LOCK_ROW_COLUMNS[table]} FROM {relation} WHERE ctid = ANY(%s::tid[])", (ctids,))
+        for ctid, row_id, description in cursor.fetchall():
+            rows[(relation, ctid)] = (row_id, description)
+    
+    hot = [{
+        'relation': relation, 'ctid': ctid, 'waiters': len(seconds), 'max_wait': max(seconds),
+        'row_id': rows.get((relation, ctid), (None, None))[0],
+        'description': rows.get((relation, ctid), (None, None))[1]
+    } for (relation, ctid), seconds in hot_rows.items()]
+    hot.sort(key=lambda row: (row['waiters'], row['max_wait']), reverse=True)
+    
+    return {
+        'backends': backends,
+        'roots': roots,
+        'hot_rows': hot,
+        'waiting': len(waiting),
+        'max_wait': max((b['seconds'] for b in waiting), default=0),
+        'timestamp': datetime.now()
+    }
+
+def get_database_stats(conn):
+    """Get database size and cache hit ratio (pg_database_size is expensive, sample rarely)"""
+    cursor = conn.cursor()
+    
     # Database size and cache hit ratio
     db_stats = """
     SELECT 
         pg_size_pretty(pg_database_size('postgres')) as database_size,
         (SELECT sum(blks_hit)*100/sum(blks_hit+blks_read) 
          FROM pg_stat_database 
-         WHERE datname = 'postgres') as cache_hit_ratio;
+         WHERE datname = 'postgres') as cache_hit_ratio,
+        pg_database_size('postgres') as database_size_bytes;
     """
     
-    cursor.execute(db_stats)
+    execute_prepared(cursor, 'ux_db_stats', db_stats)
     db_results = cursor.fetchone()
     
     return {
-        'connections': connection_results,
-        'locks': lock_results,
         'database': db_results,
         'timestamp': datetime.now()
     }
 
-def get_user_experience_metrics(conn):
-    """Get specific user experience metrics for voting/bidding"""
+def get_replication_stats(conn):
+    """Replication lag from both ends: pg_stat_replication on a primary, replay position on a replica.
+
+    Replica lag is now() - pg_last_xact_replay_timestamp(), which also grows
+    while the primary is idle; replay_bytes (received but not yet replayed
+    WAL) tells a stalled replica from a quiet primary.
+    """
+    cursor = conn.cursor()
+    
+    replica_stats = """
+    SELECT
+        pg_is_in_recovery() as is_replica,
+        CASE WHEN pg_is_in_recovery()
+             THEN EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())) END as replay_lag_seconds,
+        CASE WHEN pg_is_in_recovery()
+             THEN pg_wal_lsn_diff(pg_last_wal_receive_lsn(), pg_last_wal_replay_lsn()) END as replay_bytes;
+    """
+    
+    execute_prepared(cursor, 'ux_replica_stats', replica_stats)
+    is_replica, replay_lag, replay_bytes = cursor.fetchone()
+    
+    replicas = []
+    if not is_replica:
+        replication_stats = """
+        SELECT
+            COALESCE(NULLIF(application_name, ''), client_addr::text, pid::text) as replica,
+            state,
+            sync_state,
+            EXTRACT(EPOCH FROM write_lag) as write_lag,
+            EXTRACT(EPOCH FROM flush_lag) as flush_lag,
+            EXTRACT(EPOCH FROM replay_lag) as replay_lag,
+            pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn) as lag_bytes
+        FROM pg_stat_replication
+        ORDER BY 1;
+        """
+        execute_prepared(cursor, 'ux_replication_stats', replication_stats)
+        replicas = [dict(zip(('replica', 'state', 'sync_state', 'write_lag', 'flush_lag', 'replay_lag', 'lag_bytes'), row))
+                    for row in cursor.fetchall()]
+    
+    return {
+        'is_replica': is_replica,
+        'replay_lag': float(replay_lag) if replay_lag is not None else None,
+        'replay_bytes': float(replay_bytes) if replay_bytes is not None else None,
+        'replicas': replicas,
+        'timestamp': datetime.now()
+    }
+
+def get_user_experience_metrics(conn, live_tracker=None):
+    """Get specific user experience metrics for voting/bidding.
+
+    With a LiveEventTracker the event/round/artwork counts come from its cache
+    instead of the global events -> rounds -> art join.
+    """
     cursor = conn.cursor()
     
     # Recent voting activity and response times
@@ -225,7 +1460,7 @@ def get_user_experience_metrics(conn):
     WHERE created_at > NOW() - INTERVAL '1 hour';
     """
     
-    cursor.execute(voting_metrics)
+    execute_prepared(cursor, 'ux_voting_metrics', voting_metrics)
     vote_results = cursor.fetchone()
     
     # Recent bidding activity
@@ -238,7 +1473,7 @@ def get_user_experience_metrics(conn):
     WHERE created_at > NOW() - INTERVAL '1 hour';
     """
     
-    cursor.execute(bidding_metrics)
+    execute_prepared(cursor, 'ux_bidding_metrics', bidding_metrics)
     bid_results = cursor.fetchone()
     
     # Active events and rounds
@@ -254,8 +1489,11 @@ def get_user_experience_metrics(conn):
     WHERE e.enabled = true AND e.show_in_app = true;
     """
     
-    cursor.execute(event_metrics)
-    event_results = cursor.fetchone()
+    if live_tracker is not None and live_tracker.refreshed_at:
+        event_results = (len(live_tracker.events), live_tracker.round_count, len(live_tracker.art))
+    else:
+        execute_prepared(cursor, 'ux_event_metrics', event_metrics)
+        event_results = cursor.fetchone()
     
     return {
         'voting': vote_results,
@@ -264,6 +1502,1707 @@ def get_user_experience_metrics(conn):
         'timestamp': datetime.now()
     }
 
+# Upper bucket edges in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+class LatencyHistogram:
+    """Fixed-edge latency histogram; histograms with the same edges merge by adding counts and sums"""
+    def __init__(self, edges=LATENCY_BUCKETS_MS):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.sum = 0.0
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        return self
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th quantile (inf for the overflow bucket)"""
+        total = self.total
+        if not total:
+            return None
+        target = q * total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.edges[i] if i < len(self.edges) else float('inf')
+        return float('inf')
+
+class LatencyTracker:
+    """Incremental server-side latency histogram for one table.
+
+    Each collection buckets only rows created since the last watermark using
+    width_bucket, so the database touches new rows only. The upper bound lags
+    now() by settle_seconds so rows from transactions still in flight are
+    counted on a later pass instead of being skipped. Interval histograms are
+    kept for window_seconds and merged for the rolling p50/p95/p99.
+    """
+    def __init__(self, name, table, latency_sql, window_seconds=3600, settle_seconds=10, requires_setting=None):
+        self.name = name
+        self.table = table
+        self.latency_sql = latency_sql
+        self.window_seconds = window_seconds
+        self.settle_seconds = settle_seconds
+        self.requires_setting = requires_setting
+        self.enabled = None
+        self.watermark = None
+        self.intervals = deque()
+        self.cumulative = LatencyHistogram()
+
+    def collect(self, cursor):
+        if self.enabled is None:
+            if self.requires_setting:
+                cursor.execute("SELECT current_setting(%s) = 'on'", (self.requires_setting,))
+                self.enabled = cursor.fetchone()[0]
+            else:
+                self.enabled = True
+        if not self.enabled:
+            return None
+
+        cursor.execute(f"""
+            WITH bounds AS (
+                SELECT COALESCE(%(watermark)s::timestamptz, now() - %(window)s * interval '1 second') as lo,
+                       now() - %(settle)s * interval '1 second' as hi
+            )
+            SELECT (SELECT hi FROM bounds) as hi,
+                   width_bucket(latency_ms, %(edges)s::float8[]) as bucket,
+                   COUNT(*) as samples,
+                   SUM(latency_ms) as total_ms
+            FROM (
+                SELECT {self.latency_sql} as latency_ms
+                FROM {self.table}, bounds
+                WHERE created_at > bounds.lo AND created_at <= bounds.hi
+            ) latencies
+            WHERE latency_ms IS NOT NULL
+            GROUP BY bucket
+            UNION ALL
+            SELECT (SELECT hi FROM bounds), NULL, 0, 0
+        """, {'watermark': self.watermark, 'window': self.window_seconds,
+              'settle': self.settle_seconds, 'edges': [float(edge) for edge in LATENCY_BUCKETS_MS]})
+
+        interval = LatencyHistogram()
+        for hi, bucket, samples, total_ms in cursor.fetchall():
+            self.watermark = hi
+            if bucket is not None:
+                interval.counts[bucket] += samples
+                interval.sum += float(total_ms)
+
+        now = time.time()
+        self.intervals.append((now, interval))
+        self.cumulative.merge(interval)
+        while self.intervals and self.intervals[0][0] < now - self.window_seconds:
+            self.intervals.popleft()
+
+        window = LatencyHistogram()
+        for _, histogram in self.intervals:
+            window.merge(histogram)
+
+        return {
+            'interval': interval,
+            'window': window,
+            'cumulative': self.cumulative,
+            'p50': window.percentile(0.50),
+            'p95': window.percentile(0.95),
+            'p99': window.percentile(0.99)
+        }
+
+def build_latency_trackers(window_seconds=3600):
+    """Vote latency from updated_at - created_at; bid latency from commit time.
+
+    Bids only record created_at (transaction start via NOW()), so their
+    processing latency is commit timestamp minus created_at, which needs
+    track_commit_timestamp = on; without it the bid histogram is skipped.
+    """
+    return [
+        LatencyTracker('votes', 'votes',
+                       "EXTRACT(EPOCH FROM (updated_at - created_at)) * 1000",
+                       window_seconds),
+        LatencyTracker('bids', 'bids',
+                       "EXTRACT(EPOCH FROM (pg_xact_commit_timestamp(xmin) - created_at)) * 1000",
+                       window_seconds, requires_setting='track_commit_timestamp')
+    ]
+
+def get_latency_histograms(conn, trackers):
+    """Advance every latency tracker and return their histograms"""
+    cursor = conn.cursor()
+    return {
+        'latency': {tracker.name: tracker.collect(cursor) for tracker in trackers},
+        'timestamp': datetime.now()
+    }
+
+class LiveEventTracker:
+    """Per-event, per-round and per-artwork vote/bid sampling for live shows.
+
+    Active events (or a single --event EID) are resolved once and their art
+    ids cached, refreshed every refresh_seconds. Each sample then reads only
+    votes/bids created in the half-open window (last upper bound, now() -
+    settle] for the cached art ids, using the created_at indexes, instead of
+    joining events -> rounds -> round_contestants -> art on every poll.
+    """
+    def __init__(self, eid=None, refresh_seconds=300, settle_seconds=1):
+        self.eid = eid
+        self.refresh_seconds = refresh_seconds
+        self.settle_seconds = settle_seconds
+        self.events = {}
+        self.art = {}
+        self.round_count = 0
+        self.refreshed_at = 0
+        self.watermark = None
+        self.totals = defaultdict(lambda: {'votes': 0, 'bids': 0})
+
+    def refresh(self, cursor):
+        if self.eid:
+            cursor.execute("SELECT id, eid, name FROM events WHERE eid = %s", (self.eid,))
+        else:
+            cursor.execute("""
+                SELECT id, eid, name
+                FROM events
+                WHERE enabled = true
+                AND event_start_datetime <= now() + interval '2 hours'
+                AND COALESCE(event_end_datetime, event_start_datetime + interval '6 hours') >= now() - interval '1 hour'
+            """)
+        self.events = {event_id: {'eid': eid, 'name': name} for event_id, eid, name in cursor.fetchall()}
+
+        event_ids = list(self.events)
+        cursor.execute("SELECT COUNT(*) FROM rounds WHERE event_id = ANY(%s::uuid[])", (event_ids,))
+        self.round_count = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT id, event_id, round, art_code
+            FROM art
+            WHERE event_id = ANY(%s::uuid[])
+        """, (event_ids,))
+        self.art = {art_id: {'event_id': event_id, 'round': round_number, 'art_code': art_code}
+                    for art_id, event_id, round_number, art_code in cursor.fetchall()}
+        self.refreshed_at = time.monotonic()
+
+    def collect(self, conn):
+        cursor = conn.cursor()
+        if time.monotonic() - self.refreshed_at > self.refresh_seconds:
+            self.refresh(cursor)
+
+        art_ids = list(self.art)
+        cursor.execute("""
+            WITH bounds AS (
+                SELECT COALESCE(%(watermark)s::timestamptz, now() - %(settle)s * interval '2 seconds') as lo,
+                       now() - %(settle)s * interval '1 second' as hi
+            )
+            SELECT 'votes' as kind, art_id, COUNT(*) as samples, NULL::numeric as max_amount, (SELECT hi FROM bounds) as hi
+            FROM votes, bounds
+            WHERE created_at > bounds.lo AND created_at <= bounds.hi
+            AND art_id = ANY(%(art_ids)s::uuid[])
+            GROUP BY art_id
+            UNION ALL
+            SELECT 'bids', art_id, COUNT(*), MAX(amount), (SELECT hi FROM bounds)
+            FROM bids, bounds
+            WHERE created_at > bounds.lo AND created_at <= bounds.hi
+            AND art_id = ANY(%(art_ids)s::uuid[])
+            GROUP BY art_id
+            UNION ALL
+            SELECT 'bounds', NULL, 0, NULL, hi FROM bounds
+        """, {'watermark': self.watermark, 'settle': self.settle_seconds, 'art_ids': art_ids})
+
+        events = {event_id: {'eid': event['eid'], 'name': event['name'], 'votes': 0, 'bids': 0,
+                             'rounds': defaultdict(lambda: {'votes': 0, 'bids': 0}),
+                             'art': defaultdict(lambda: {'votes': 0, 'bids': 0, 'max_bid': None})}
+                  for event_id, event in self.events.items()}
+
+        for kind, art_id, samples, max_amount, hi in cursor.fetchall():
+            self.watermark = hi
+            if kind == 'bounds' or art_id not in self.art:
+                continue
+            art = self.art[art_id]
+            event = events[art['event_id']]
+            event[kind] += samples
+            event['rounds'][art['round']][kind] += samples
+            event['art'][art['art_code']][kind] += samples
+            if max_amount is not None:
+                event['art'][art['art_code']]['max_bid'] = max_amount
+            self.totals[(event['eid'], art['round'], art['art_code'])][kind] += samples
+
+        return {
+            'events': list(events.values()),
+            'totals': self.totals,
+            'active_events': len(self.events),
+            'active_rounds': self.round_count,
+            'artworks': len(self.art),
+            'timestamp': datetime.now()
+        }
+
+class ActiveSessionHistory:
+    """Sampled active-session history in the spirit of Oracle ASH.
+
+    Each sample records one row per active backend: wait event, query id,
+    backend type and application. Strings are interned to integer codes so a
+    row costs 28 bytes in flat arrays, and the buffer overwrites the oldest
+    rows once full. Codes are reference counted by the rows holding them and
+    reused once the last such row is overwritten, so churning application
+    names cannot grow the intern table past the labels still in the buffer.
+    Breakdowns are computed on demand over any recent window; dividing by the
+    number of ticks gives average active sessions. The sampler thread and
+    readers (report, exporter) share the buffer under a lock.
+    """
+    def __init__(self, capacity=200000, tick_capacity=36000):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.query_ids = array('q', bytes(8 * capacity))
+        self.waits = array('I', bytes(4 * capacity))
+        self.backend_types = array('I', bytes(4 * capacity))
+        self.applications = array('I', bytes(4 * capacity))
+        self.head = 0
+        self.count = 0
+        self.ticks = RingBuffer(tick_capacity)
+        self.labels = []
+        self.refs = []
+        self.codes = {}
+        self.free_codes = []
+        self._lock = threading.Lock()
+
+    def intern(self, label):
+        code = self.codes.get(label)
+        if code is None:
+            if self.free_codes:
+                code = self.free_codes.pop()
+                self.labels[code] = label
+            else:
+                code = len(self.labels)
+                self.labels.append(label)
+                self.refs.append(0)
+            self.codes[label] = code
+        self.refs[code] += 1
+        return code
+
+    def release(self, code):
+        self.refs[code] -= 1
+        if not self.refs[code]:
+            del self.codes[self.labels[code]]
+            self.labels[code] = None
+            self.free_codes.append(code)
+
+    def sample(self, conn):
+        cursor = conn.cursor()
+        
+        ash_sample = """
+        SELECT
+            COALESCE(wait_event_type || ':' || wait_event, 'CPU') as wait,
+            COALESCE(query_id, 0) as query_id,
+            backend_type,
+            COALESCE(NULLIF(application_name, ''), backend_type) as application
+        FROM pg_stat_activity
+        WHERE state = 'active'
+        AND pid <> pg_backend_pid();
+        """
+        
+        execute_prepared(cursor, 'ux_ash_sample', ash_sample)
+        rows = cursor.fetchall()
+        self.add(time.time(), rows)
+        
+        return {'ash': self, 'rows': rows, 'active': len(rows), 'timestamp': datetime.now()}
+
+    def add(self, now, rows):
+        """Append one tick of (wait, query_id, backend_type, application) rows"""
+        with self._lock:
+            for wait, query_id, backend_type, application in rows:
+                index = self.head
+                if self.count == self.capacity:
+                    # Overwriting the oldest row drops its references
+                    self.release(self.waits[index])
+                    self.release(self.backend_types[index])
+                    self.release(self.applications[index])
+                self.times[index] = now
+                self.waits[index] = self.intern(wait)
+                self.query_ids[index] = query_id
+                self.backend_types[index] = self.intern(backend_type or 'unknown')
+                self.applications[index] = self.intern(application or 'unknown')
+                self.head = (self.head + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+            self.ticks.append(now, len(rows))
+
+    def top(self, dimension, seconds=60, limit=5, now=None):
+        """Top-N (label, samples, average active sessions) over the last `seconds`.
+
+        dimension is one of 'wait', 'class', 'query', 'backend' or 'application';
+        limit=None returns every label.
+        """
+        now = now if now is not None else current_time()
+        column = {'wait': self.waits, 'class': self.waits, 'query': self.query_ids,
+                  'backend': self.backend_types, 'application': self.applications}[dimension]
+        
+        with self._lock:
+            cutoff = now - seconds
+            if self.count == self.capacity:
+                # Rows older than the oldest retained one were overwritten; shrink
+                # the window so ticks and rows cover the same span
+                cutoff = max(cutoff, self.times[self.head])
+            ticks = len(self.ticks.window(now - cutoff, now))
+            if not ticks:
+                return []
+            
+            counts = defaultdict(int)
+            for offset in range(1, self.count + 1):
+                index = (self.head - offset) % self.capacity
+                if self.times[index] < cutoff:
+                    break
+                counts[column[index]] += 1
+            
+            if dimension == 'query':
+                labeled = counts
+            else:
+                labeled = defaultdict(int)
+                for code, samples in counts.items():
+                    label = self.labels[code]
+                    labeled[label.split(':')[0] if dimension == 'class' else label] += samples
+        
+        ranked = sorted(labeled.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(label, samples, samples / ticks) for label, samples in ranked]
+
+class Collector:
+    """A named metrics collector with its own cadence, timeout and priority.
+
+    Lower priority numbers win pool slots first when collectors contend.
+    Collectors that don't query the database (database=False) are called
+    without a connection and don't count towards the load budget.
+    """
+    def __init__(self, name, func, interval, timeout, priority, database=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.priority = priority
+        self.database = database
+
+class PrioritySlots:
+    """Bounded set of connection slots handed out in priority order.
+
+    A waiter cancelled after release() already handed it a slot passes the
+    slot on, so cancellation can never leak one.
+    """
+    def __init__(self, slots):
+        self.free = slots
+        self._waiters = []
+        self._sequence = 0
+
+    async def acquire(self, priority):
+        if self.free > 0 and not self._waiters:
+            self.free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(self._waiters, (priority, self._sequence, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.free += 1
+
+class CollectorCost:
+    """Self-instrumentation for one collector: wall time, statements, rows and bytes"""
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.runs = 0
+        self.failures = 0
+        self.wall_seconds = 0.0
+        self.avg_wall = None
+        self.last_wall = None
+        self.statements = 0
+        self.rows = 0
+        self.bytes = 0
+        self.last_rows = 0
+        self.last_bytes = 0
+
+    def add(self, wall, statements=0, rows=0, bytes_read=0, failed=False):
+        self.runs += 1
+        self.failures += failed
+        self.wall_seconds += wall
+        self.last_wall = wall
+        self.avg_wall = wall if self.avg_wall is None else self.avg_wall + self.alpha * (wall - self.avg_wall)
+        self.statements += statements
+        self.rows += rows
+        self.bytes += bytes_read
+        self.last_rows = rows
+        self.last_bytes = bytes_read
+
+class LoadGovernor:
+    """Global budget for the database time the monitor itself may use.
+
+    The monitor's load is the sum over collectors of average wall time /
+    interval (backend-seconds per second). Normally it may use `budget`; when
+    the database is under pressure (active connections or lock waits past
+    their limits) the budget shrinks in proportion. While over budget, the
+    intervals of the least important collectors are stretched, up to
+    max_stretch times, starting from the highest priority number. Priority 0
+    collectors are never stretched: they are how pressure is detected.
+    """
+    def __init__(self, budget=0.05, max_active=50, max_lock_waits=5, max_stretch=10):
+        self.budget = budget
+        self.max_active = max_active
+        self.max_lock_waits = max_lock_waits
+        self.max_stretch = max_stretch
+        self.stretch = {}
+        self.pressure = 0.0
+        self.load = 0.0
+        self.allowed = budget
+
+    def measure_pressure(self, snapshot):
+        active = waits = 0
+        connections = snapshot.get('connections')
+        if connections:
+            active = next((conn[1] for conn in connections['connections'] if conn[0] == 'active'), 0)
+            waits = sum(lock[1] for lock in connections['locks'])
+        locks = snapshot.get('locks')
+        if locks:
+            waits = max(waits, locks['waiting'])
+        return max(active / self.max_active, waits / self.max_lock_waits)
+
+    def plan(self, collectors, costs, snapshot):
+        """Recompute per-collector interval stretch from the latest costs and pressure"""
+        self.pressure = self.measure_pressure(snapshot)
+        self.allowed = self.budget / max(self.pressure, 1.0)
+        
+        loads = {c.name: (costs[c.name].avg_wall or 0) / c.interval for c in collectors if c.name in costs and c.database}
+        self.stretch = {c.name: 1.0 for c in collectors}
+        self.load = sum(loads.values())
+        for collector in sorted(collectors, key=lambda c: c.priority, reverse=True):
+            if self.load <= self.allowed or collector.priority == 0:
+                break
+            load = loads.get(collector.name, 0)
+            if not load:
+                continue
+            # Stretch just enough to fit, capped; remaining excess moves to the next collector
+            needed = load / max(load - (self.load - self.allowed), load / self.max_stretch)
+            self.stretch[collector.name] = min(needed, self.max_stretch)
+            self.load -= load - load / self.stretch[collector.name]
+
+    def interval(self, collector):
+        return collector.interval * self.stretch.get(collector.name, 1.0)
+
+class CollectorScheduler:
+    """Run collectors concurrently, each on its own cadence, over a small pool.
+
+    Every collector runs in its own task, so it can never overlap with itself:
+    the next run starts only after the previous one finished and its interval
+    elapsed. Blocking psycopg2 work runs in the scheduler's own worker threads
+    (one per slot), so a stalled target can only tie up its own threads; the
+    server enforces each collector's timeout through statement_timeout, with
+    an asyncio backstop in case the network stalls.
+    """
+    def __init__(self, pool, collectors, slots, history=None, recorder=None, governor=None, target=None):
+        self.pool = pool
+        self.target = target
+        self.executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=f"ux-{target or 'db'}")
+        self.tasks = []
+        self.history = history
+        self.recorder = recorder
+        self.governor = governor
+        self.costs = {collector.name: CollectorCost() for collector in collectors}
+        self.collectors = collectors
+        self.slots = PrioritySlots(slots)
+        self.snapshot = {}
+        self.errors = {}
+        self.last_success = {}
+        self.version = 0
+
+    def _collect(self, collector):
+        started = time.perf_counter()
+        conn = None
+        try:
+            if not collector.database:
+                result = collector.func()
+                self.costs[collector.name].add(time.perf_counter() - started)
+                return result
+            with self.pool.connection() as conn:
+                # The timeout is a session setting on the pooled connection, so it
+                # is only re-issued when this collector's differs from the last one
+                timeout_ms = int(collector.timeout * 1000)
+                if conn.statement_timeout != timeout_ms:
+                    conn.cursor().execute("SET statement_timeout = %s", (timeout_ms,))
+                    conn.statement_timeout = timeout_ms
+                conn.reset_usage()
+                result = collector.func(conn)
+            self.costs[collector.name].add(time.perf_counter() - started, conn.statements, conn.rows_read, conn.bytes_read)
+            return result
+        except Exception:
+            usage = (conn.statements, conn.rows_read, conn.bytes_read) if conn is not None else (0, 0, 0)
+            self.costs[collector.name].add(time.perf_counter() - started, *usage, failed=True)
+            raise
+
+    async def run_once(self, collector):
+        """Run one collection, storing its result (or error) in the snapshot"""
+        await self.slots.acquire(collector.priority)
+        try:
+            task = asyncio.get_running_loop().run_in_executor(self.executor, self._collect, collector)
+        except BaseException:
+            self.slots.release()
+            raise
+        # The slot is freed when the worker thread really finishes, even after a backstop timeout
+        task.add_done_callback(lambda _: self.slots.release())
+        try:
+            self.snapshot[collector.name] = await asyncio.wait_for(asyncio.shield(task), collector.timeout + 5)
+            self.errors.pop(collector.name, None)
+            self.last_success[collector.name] = time.time()
+            self.version += 1
+            if self.history is not None:
+                record_history(self.history, collector.name, self.snapshot[collector.name])
+        except asyncio.TimeoutError:
+            self.errors[collector.name] = f"timed out after {collector.timeout}s"
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            self.errors[collector.name] = f"connection error: {e}"
+        except Exception as e:
+            self.errors[collector.name] = str(e).strip()
+        if self.recorder is not None:
+            self.recorder.append(collector.name, self.snapshot.get(collector.name), self.errors.get(collector.name),
+                                 target=self.target)
+
+    async def _loop(self, collector):
+        while True:
+            started = time.monotonic()
+            await self.run_once(collector)
+            interval = collector.interval
+            if self.governor is not None:
+                self.governor.plan(self.collectors, self.costs, self.snapshot)
+                interval = self.governor.interval(collector)
+                if self.history is not None and collector.priority == 0:
+                    record_monitor_load(self.history, self.governor)
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+    def monitor_stats(self):
+        """Per-collector cost and governor state, in the shape of a collector result"""
+        governor = self.governor
+        return {
+            'collectors': {
+                collector.name: {
+                    'runs': self.costs[collector.name].runs,
+                    'failures': self.costs[collector.name].failures,
+                    'wall_seconds': self.costs[collector.name].wall_seconds,
+                    'avg_wall': self.costs[collector.name].avg_wall,
+                    'statements': self.costs[collector.name].statements,
+                    'rows': self.costs[collector.name].rows,
+                    'bytes': self.costs[collector.name].bytes,
+                    'last_rows': self.costs[collector.name].last_rows,
+                    'last_bytes': self.costs[collector.name].last_bytes,
+                    'timeout': collector.timeout,
+                    'interval': collector.interval,
+                    'effective_interval': governor.interval(collector) if governor else collector.interval
+                } for collector in self.collectors
+            },
+            'load': governor.load if governor else None,
+            'allowed': governor.allowed if governor else None,
+            'pressure': governor.pressure if governor else None,
+            'timestamp': datetime.now()
+        }
+
+    def publish_monitor_stats(self):
+        self.snapshot['monitor'] = self.monitor_stats()
+        if self.recorder is not None:
+            self.recorder.append('monitor', self.snapshot['monitor'], target=self.target)
+
+    async def collect_all(self):
+        """Run every collector once, concurrently"""
+        await asyncio.gather(*(self.run_once(collector) for collector in self.collectors))
+        self.publish_monitor_stats()
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self._loop(collector)) for collector in self.collectors]
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        # Do not wait for threads stuck on an unreachable target
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+async def run_targets(monitors, render, render_interval, once=False, wait=None):
+    """Run every target's scheduler concurrently and render them together.
+
+    wait(seconds) replaces the sleep between renders (the dashboard handles
+    keys there) and ends the run by returning False.
+    """
+    schedulers = [monitor.scheduler for monitor in monitors]
+    if once:
+        await asyncio.gather(*(scheduler.collect_all() for scheduler in schedulers))
+        render()
+        return
+
+    for scheduler in schedulers:
+        scheduler.start()
+    try:
+        while True:
+            if await (wait or asyncio.sleep)(render_interval) is False:
+                return
+            for scheduler in schedulers:
+                scheduler.publish_monitor_stats()
+            render()
+    finally:
+        for scheduler in schedulers:
+            scheduler.stop()
+
+# Collectors that read local files rather than the database
+LOCAL_COLLECTORS = {'edge'}
+
+# name: (default interval seconds, timeout seconds, priority)
+COLLECTOR_DEFAULTS = {
+    'live': (1, 0.8, 0),
+    'connections': (2, 1.5, 0),
+    'locks': (1, 0.8, 0),
+    'ash': (0.1, 0.5, 0),
+    'replication': (5, 2, 1),
+    'ux': (5, 3, 1),
+    'latency': (5, 3, 1),
+    'queries': (10, 5, 2),
+    'functions': (10, 5, 2),
+    'tables': (60, 5, 3),
+    'table_health': (60, 10, 3),
+    'edge': (5, 5, 1),
+    'database': (300, 10, 4)
+}
+
+def parse_cadences(values, option='--cadence'):
+    """Parse repeated name=seconds overrides (--cadence, --timeout)"""
+    cadences = {}
+    for value in values or []:
+        name, _, seconds = value.partition('=')
+        if name not in COLLECTOR_DEFAULTS or not seconds:
+            raise argparse.ArgumentTypeError(f"Invalid {option} {value!r}; expected one of "
+                                             f"{', '.join(COLLECTOR_DEFAULTS)} as name=seconds")
+        cadences[name] = float(seconds)
+    return cadences
+
+def build_collectors(query_tracker, function_tracker, latency_trackers, cadences=None, live_tracker=None, ash=None,
+                     query_classifier=None, plan_detector=None, timeouts=None, dashboard_rows=0, table_advisor=None,
+                     edge_logs=None):
+    """Create the collector set with default cadences and timeouts, applying overrides.
+
+    The 'live', 'ash', 'table_health' and 'edge' collectors only run when their tracker is supplied.
+    """
+    funcs = {
+        'live': live_tracker.collect if live_tracker else None,
+        'connections': get_connection_and_lock_stats,
+        'locks': get_lock_tree,
+        'ash': ash.sample if ash else None,
+        'replication': get_replication_stats,
+        'ux': lambda conn: get_user_experience_metrics(conn, live_tracker),
+        'latency': lambda conn: get_latency_histograms(conn, latency_trackers),
+        'queries': lambda conn: get_query_performance_stats(conn, query_tracker, query_classifier, plan_detector,
+                                                            dashboard_rows),
+        'functions': lambda conn: get_function_performance_stats(conn, function_tracker, dashboard_rows),
+        'tables': get_table_performance_stats,
+        'table_health': table_advisor.collect if table_advisor else None,
+        'edge': edge_logs.collect if edge_logs else None,
+        'database': get_database_stats
+    }
+    cadences = cadences or {}
+    timeouts = timeouts or {}
+    return [Collector(name, funcs[name], cadences.get(name, interval), timeouts.get(name, timeout), priority,
+                      database=name not in LOCAL_COLLECTORS)
+            for name, (interval, timeout, priority) in COLLECTOR_DEFAULTS.items() if funcs[name]]
+
+def prometheus_escape(value):
+    """Escape a label value for the Prometheus text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class PrometheusWriter:
+    """Accumulate samples grouped by metric family with HELP/TYPE headers"""
+    def __init__(self):
+        self.families = {}
+        self.base_labels = {}
+
+    def add(self, name, metric_type, help_text, value, labels=None, suffix=''):
+        """Add a sample; histogram series share one family via suffix ('_bucket', '_sum', '_count')"""
+        if value is None:
+            return
+        family = self.families.setdefault(name, (metric_type, help_text, []))
+        labels = {**self.base_labels, **(labels or {})}
+        label_str = ','.join(f'{key}="{prometheus_escape(val)}"' for key, val in labels.items())
+        sample = f"{name}{suffix}"
+        family[2].append(f"{sample}{{{label_str}}} {float(value)}" if label_str else f"{sample} {float(value)}")
+
+    def render(self):
+        lines = []
+        for name, (metric_type, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+def build_prometheus_metrics(snapshot, errors, last_success, writer=None):
+    """Translate the latest collector snapshot into Prometheus text format.
+
+    With a shared writer (one per scrape across targets) the samples are
+    added to it and nothing is rendered.
+    """
+    w = writer if writer is not None else PrometheusWriter()
+
+    replication = snapshot.get('replication')
+    if replication:
+        w.add('ux_replication_is_replica', 'gauge', '1 if the target is a hot standby', int(replication['is_replica']))
+        w.add('ux_replication_replay_lag_seconds', 'gauge', 'Time since the last replayed transaction (replica side)', replication['replay_lag'])
+        w.add('ux_replication_replay_pending_bytes', 'gauge', 'WAL received but not yet replayed (replica side)', replication['replay_bytes'])
+        for replica in replication['replicas']:
+            labels = {'replica': replica['replica']}
+            w.add('ux_replication_lag_seconds', 'gauge', 'Replay lag reported by pg_stat_replication', replica['replay_lag'] or 0, labels)
+            w.add('ux_replication_lag_bytes', 'gauge', 'WAL bytes between the primary and the replica\'s replay position', replica['lag_bytes'], labels)
+
+    queries = snapshot.get('queries')
+    if queries:
+        for q in queries['slow_queries']:
+            labels = {'queryid': q['queryid'], 'category': q['category']}
+            w.add('ux_query_calls_total', 'counter', 'pg_stat_statements calls', q['calls'], labels)
+            w.add('ux_query_exec_time_ms_total', 'counter', 'pg_stat_statements total execution time', q['total_exec_time'], labels)
+            w.add('ux_query_mean_time_ms', 'gauge', 'Cumulative mean execution time', q['mean_exec_time'], labels)
+            w.add('ux_query_max_time_ms', 'gauge', 'Maximum execution time', q['max_exec_time'], labels)
+            w.add('ux_query_hit_ratio_percent', 'gauge', 'Cumulative shared buffer hit ratio', q['hit_ratio'], labels)
+            if queries['interval']:
+                w.add('ux_query_calls_per_second', 'gauge', 'Calls per second over the last interval', q['calls_per_sec'], labels)
+                w.add('ux_query_interval_mean_time_ms', 'gauge', 'Mean execution time over the last interval', q['interval_mean_time'], labels)
+                w.add('ux_query_interval_hit_ratio_percent', 'gauge', 'Shared buffer hit ratio over the last interval', q['interval_hit_ratio'], labels)
+
+        for r in queries['plan_regressions']:
+            labels = {'queryid': r['queryid'], 'category': r['row']['category']}
+            w.add('ux_query_regression_ratio', 'gauge', 'Interval mean time over baseline for statements flagged this poll',
+                  r['row']['interval_mean_time'] / r['baseline'] if r['baseline'] else None, labels)
+            w.add('ux_query_plan_changed', 'gauge', 'Whether a flagged statement runs a different plan than its last good one',
+                  int(bool(r.get('plan_changed'))), labels)
+        for c in queries['categories']:
+            labels = {'category': c['category']}
+            w.add('ux_query_category_statements', 'gauge', 'Distinct statements per category', c['queries'], labels)
+            w.add('ux_query_category_calls_total', 'counter', 'Calls per category', c['calls'], labels)
+            w.add('ux_query_category_exec_time_ms_total', 'counter', 'Total execution time per category', c['total_time'], labels)
+            if 'interval_mean_time' in c:
+                w.add('ux_query_category_calls_per_second', 'gauge', 'Calls per second per category over the last interval', c['calls_per_sec'], labels)
+                w.add('ux_query_category_interval_mean_time_ms', 'gauge', 'Mean execution time per category over the last interval', c['interval_mean_time'], labels)
+
+    functions = snapshot.get('functions')
+    if functions:
+        for f in functions['function_stats']:
+            labels = {'function': f['funcname']}
+            w.add('ux_function_calls_total', 'counter', 'pg_stat_user_functions calls', f['calls'], labels)
+            w.add('ux_function_time_ms_total', 'counter', 'Total function time including callees', f['total_time'], labels)
+            w.add('ux_function_self_time_ms_total', 'counter', 'Total function self time', f['self_time'], labels)
+            if functions['interval']:
+                w.add('ux_function_calls_per_second', 'gauge', 'Calls per second over the last interval', f['calls_per_sec'], labels)
+                w.add('ux_function_interval_mean_time_ms', 'gauge', 'Mean time over the last interval', f['interval_mean_time'], labels)
+
+    tables = snapshot.get('tables')
+    if tables:
+        for table in tables['table_stats']:
+            (schema, relname, seq_scan, seq_tup_read, idx_scan, idx_tup_fetch,
+             n_tup_ins, n_tup_upd, n_tup_del, n_live_tup, n_dead_tup,
+             last_vacuum, last_autovacuum, vacuum_count, autovacuum_count) = table[:15]
+            labels = {'table': relname}
+            w.add('ux_table_seq_scan_total', 'counter', 'Sequential scans', seq_scan, labels)
+            w.add('ux_table_seq_tup_read_total', 'counter', 'Rows read by sequential scans', seq_tup_read, labels)
+            w.add('ux_table_idx_scan_total', 'counter', 'Index scans', idx_scan, labels)
+            w.add('ux_table_rows_inserted_total', 'counter', 'Rows inserted', n_tup_ins, labels)
+            w.add('ux_table_rows_updated_total', 'counter', 'Rows updated', n_tup_upd, labels)
+            w.add('ux_table_rows_deleted_total', 'counter', 'Rows deleted', n_tup_del, labels)
+            w.add('ux_table_live_tuples', 'gauge', 'Estimated live tuples', n_live_tup, labels)
+            w.add('ux_table_dead_tuples', 'gauge', 'Estimated dead tuples', n_dead_tup, labels)
+            w.add('ux_table_autovacuum_total', 'counter', 'Autovacuum runs', autovacuum_count, labels)
+
+    edge = snapshot.get('edge')
+    if edge:
+        w.add('ux_edge_log_lines_total', 'counter', 'Edge function log lines ingested', edge['lines'])
+        w.add('ux_edge_log_malformed_total', 'counter', 'Edge function log lines that were not JSON', edge['malformed'])
+        w.add('ux_edge_log_backlog_bytes', 'gauge', 'Unread edge function log bytes', edge['backlog'])
+        for function in edge['functions']:
+            if function['scope'] != 'window':
+                continue
+            labels = {'function': function['function']}
+            w.add('ux_edge_requests_per_second', 'gauge', f"Edge function requests over the last {edge['window']}s", function['rate'], labels)
+            w.add('ux_edge_error_ratio', 'gauge', 'Share of edge function requests answered with a 5xx', function['error_rate'], labels)
+            # Quantiles cover the window; _sum and _count are cumulative, as for any summary
+            help_text = f"Edge function execution time (quantiles over the last {edge['window']}s)"
+            for field, quantile in (('p50', '0.5'), ('p95', '0.95'), ('p99', '0.99')):
+                w.add('ux_edge_duration_ms', 'summary', help_text, function[field], {**labels, 'quantile': quantile})
+            w.add('ux_edge_duration_ms', 'summary', help_text, function.get('total_duration_ms'), labels, suffix='_sum')
+            w.add('ux_edge_duration_ms', 'summary', help_text, function['total_requests'], labels, suffix='_count')
+
+    table_health = snapshot.get('table_health')
+    if table_health:
+        for table in table_health['tables']:
+            labels = {'table': table['relname']}
+            w.add('ux_table_dead_tuples_per_minute', 'gauge', 'Dead tuple growth since the last vacuum', table['dead_rate'], labels)
+            w.add('ux_table_bloat_bytes_per_minute', 'gauge', 'Estimated bloat growth', table['bloat_rate'], labels)
+            w.add('ux_table_autovacuum_due', 'gauge', '1 if the table is past its autovacuum trigger', int(table['due']), labels)
+            w.add('ux_table_autovacuum_eta_seconds', 'gauge', 'Projected time until autovacuum triggers', table['eta'], labels)
+            w.add('ux_table_seq_scans_per_minute', 'gauge', 'Sequential scans over the last few minutes', table['seq_scan_rate'], labels)
+            w.add('ux_table_suggestions', 'gauge', 'Open advisor suggestions', len(table['suggestions']), labels)
+        for finding in table_health['indexes']:
+            w.add('ux_index_flagged', 'gauge', 'Index flagged as unused or redundant', 1,
+                  {'table': finding['table'], 'index': finding['index'], 'issue': finding['issue']})
+
+    locks = snapshot.get('locks')
+    if locks:
+        w.add('ux_lock_waiters', 'gauge', 'Backends waiting on a heavyweight lock', locks['waiting'])
+        w.add('ux_lock_max_wait_seconds', 'gauge', 'Longest current lock wait', locks['max_wait'])
+        for row in locks['hot_rows'][:5]:
+            labels = {'relation': row['relation'], 'row': row['row_id'] or row['ctid']}
+            w.add('ux_lock_hot_row_waiters', 'gauge', 'Backends queued on one row', row['waiters'], labels)
+
+    ash = snapshot.get('ash')
+    if ash:
+        for wait_class, _, sessions in ash['ash'].top('class', seconds=60, limit=20):
+            w.add('ux_ash_average_active_sessions', 'gauge', 'Average active sessions over the last minute by wait class',
+                  sessions, {'wait_class': wait_class})
+
+    ux = snapshot.get('ux')
+    if ux:
+        w.add('ux_votes_last_hour', 'gauge', 'Votes cast in the last hour', ux['voting'][0] or 0)
+        w.add('ux_vote_processing_avg_seconds', 'gauge', 'Average updated_at - created_at for recent votes', ux['voting'][1])
+        w.add('ux_vote_processing_max_seconds', 'gauge', 'Maximum updated_at - created_at for recent votes', ux['voting'][2])
+        w.add('ux_bids_last_hour', 'gauge', 'Bids placed in the last hour', ux['bidding'][0] or 0)
+        w.add('ux_bid_amount_avg', 'gauge', 'Average bid amount in the last hour', ux['bidding'][1])
+        w.add('ux_bid_amount_max', 'gauge', 'Maximum bid amount in the last hour', ux['bidding'][2])
+        w.add('ux_active_events', 'gauge', 'Enabled events shown in app', ux['events'][0] or 0)
+        w.add('ux_active_rounds', 'gauge', 'Rounds in active events', ux['events'][1] or 0)
+        w.add('ux_artworks_in_play', 'gauge', 'Artworks in active rounds', ux['events'][2] or 0)
+
+    live = snapshot.get('live')
+    if live:
+        for (eid, round_number, art_code), counts in live['totals'].items():
+            labels = {'event': eid, 'round': round_number, 'art': art_code}
+            w.add('ux_live_votes_total', 'counter', 'Votes per artwork since monitor start', counts['votes'], labels)
+            w.add('ux_live_bids_total', 'counter', 'Bids per artwork since monitor start', counts['bids'], labels)
+
+    latency = snapshot.get('latency')
+    if latency:
+        for source, result in latency['latency'].items():
+            if result is None:
+                continue
+            histogram = result['cumulative']
+            name = f"ux_{source[:-1]}_latency_ms"
+            cumulative = 0
+            help_text = f"{source.title()} processing latency since monitor start"
+            for edge, count in zip(histogram.edges, histogram.counts):
+                cumulative += count
+                w.add(name, 'histogram', help_text, cumulative, {'le': edge}, suffix='_bucket')
+            w.add(name, 'histogram', help_text, histogram.total, {'le': '+Inf'}, suffix='_bucket')
+            # Recordings made before sums were tracked have no _sum to report
+            w.add(name, 'histogram', help_text, getattr(histogram, 'sum', None), suffix='_sum')
+            w.add(name, 'histogram', help_text, histogram.total, suffix='_count')
+            for quantile in ('p50', 'p95', 'p99'):
+                if result[quantile] not in (None, float('inf')):
+                    w.add(f"{name}_{quantile}", 'gauge', f"Rolling {quantile} {source} latency (bucket upper edge)", result[quantile])
+
+    connections = snapshot.get('connections')
+    if connections:
+        for state, count, avg_duration in connections['connections']:
+            w.add('ux_connections', 'gauge', 'Backends by state', count, {'state': state or 'unknown'})
+            w.add('ux_connection_avg_query_seconds', 'gauge', 'Average query age by state', avg_duration, {'state': state or 'unknown'})
+        w.add('ux_lock_waits', 'gauge', 'Ungranted locks (all modes)', sum(lock[1] for lock in connections['locks']))
+        for mode, count in connections['locks']:
+            w.add('ux_lock_waits_by_mode', 'gauge', 'Ungranted locks by mode', count, {'mode': mode})
+
+    database = snapshot.get('database')
+    if database:
+        _, cache_hit_ratio, size_bytes = database['database']
+        w.add('ux_database_size_bytes', 'gauge', 'pg_database_size', size_bytes)
+        w.add('ux_cache_hit_ratio_percent', 'gauge', 'Database buffer cache hit ratio', cache_hit_ratio)
+
+    monitor = snapshot.get('monitor')
+    if monitor:
+        for name, cost in monitor['collectors'].items():
+            labels = {'collector': name}
+            w.add('ux_collector_runs_total', 'counter', 'Collector runs', cost['runs'], labels)
+            w.add('ux_collector_failures_total', 'counter', 'Collector runs that failed or timed out', cost['failures'], labels)
+            w.add('ux_collector_wall_seconds_total', 'counter', 'Wall time spent collecting, including waits for the database', cost['wall_seconds'], labels)
+            w.add('ux_collector_statements_total', 'counter', 'Statements executed by the collector', cost['statements'], labels)
+            w.add('ux_collector_rows_total', 'counter', 'Rows read by the collector', cost['rows'], labels)
+            w.add('ux_collector_bytes_total', 'counter', 'Approximate bytes read by the collector (text size)', cost['bytes'], labels)
+            w.add('ux_collector_statement_timeout_seconds', 'gauge', 'statement_timeout applied to the collector', cost['timeout'], labels)
+            w.add('ux_collector_interval_seconds', 'gauge', 'Current interval after load-budget backoff', cost['effective_interval'], labels)
+        w.add('ux_monitor_load', 'gauge', 'Backend-seconds per second the monitor itself uses', monitor['load'])
+        w.add('ux_monitor_load_budget', 'gauge', 'Load the monitor currently allows itself', monitor['allowed'])
+        w.add('ux_monitor_db_pressure', 'gauge', 'Database pressure (1 = active connections or lock waits at their limit)', monitor['pressure'])
+
+    for name, timestamp in last_success.items():
+        w.add('ux_collector_last_success_timestamp_seconds', 'gauge', 'Unix time of the last successful collection',
+              timestamp, {'collector': name})
+    for name in set(last_success) | set(errors):
+        w.add('ux_collector_error', 'gauge', '1 if the last collection of this collector failed',
+              1 if name in errors else 0, {'collector': name})
+
+    return w.render() if writer is None else None
+
+class MetricsExporter:
+    """Serve /metrics from every target's cached snapshot.
+
+    Scrapes never touch the database: the text is rendered from memory and
+    re-rendered only when a collector has produced a new result, so any
+    number of scrapers costs the same as one. Samples carry a target label
+    when a targets file is in use.
+    """
+    def __init__(self, monitors):
+        self.monitors = monitors
+        self._cached_version = None
+        self._cached_body = b""
+
+    def body(self):
+        version = tuple(monitor.scheduler.version for monitor in self.monitors)
+        if self._cached_version != version:
+            w = PrometheusWriter()
+            for monitor in self.monitors:
+                scheduler = monitor.scheduler
+                w.base_labels = {'target': monitor.name} if monitor.name else {}
+                snapshot = dict(scheduler.snapshot, monitor=scheduler.monitor_stats())
+                build_prometheus_metrics(snapshot, scheduler.errors, scheduler.last_success, w)
+            self._cached_body = w.render().encode('utf-8')
+            self._cached_version = version
+        return self._cached_body
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Drain headers; the exporter does not need any of them
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, content_type, body = '200 OK', 'text/plain; version=0.0.4; charset=utf-8', self.body()
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'Not Found\n'
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+def parse_listen_address(value):
+    """Parse --serve values like ':9187' or '127.0.0.1:9187'"""
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"Invalid --serve address {value!r}; expected [HOST]:PORT")
+    return host or '0.0.0.0', int(port)
+
+# Objects that may appear inside collector results and can be rebuilt on replay
+RECORDABLE_CLASSES = {'LatencyHistogram': LatencyHistogram}
+
+def encode_record(value):
+    """Make a collector result JSON-safe, tagging what plain JSON would lose"""
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: encode_record(item) for key, item in value.items()}
+        return {'__items__': [[encode_record(key), encode_record(item)] for key, item in value.items()]}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode_record(item) for item in value]}
+    if isinstance(value, list):
+        return [encode_record(item) for item in value]
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, float) and value in (float('inf'), float('-inf')):
+        return {'__float__': repr(value)}
+    if type(value).__name__ in RECORDABLE_CLASSES:
+        return {'__object__': type(value).__name__, 'state': encode_record(vars(value))}
+    return value
+
+def decode_record(value):
+    if isinstance(value, list):
+        return [decode_record(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '__items__' in value:
+        return {decode_record(key): decode_record(item) for key, item in value['__items__']}
+    if '__tuple__' in value:
+        return tuple(decode_record(item) for item in value['__tuple__'])
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    if '__float__' in value:
+        return float(value['__float__'])
+    if '__object__' in value:
+        obj = RECORDABLE_CLASSES[value['__object__']].__new__(RECORDABLE_CLASSES[value['__object__']])
+        vars(obj).update(decode_record(value['state']))
+        return obj
+    return {key: decode_record(item) for key, item in value.items()}
+
+class SnapshotRecorder:
+    """Append collector results to a gzip-compressed JSON-lines recording.
+
+    Records are buffered and written as one gzip member per chunk, so the
+    file stays append-only and readable by any gzip reader. A sidecar
+    FILE.idx holds one line per chunk (first timestamp, byte offset) for
+    seeking. A crash loses at most the unflushed chunk.
+    """
+    def __init__(self, path, flush_seconds=10, flush_records=500):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.flush_seconds = flush_seconds
+        self.flush_records = flush_records
+        self.buffer = []
+        self.first_timestamp = None
+        self.last_flush = time.monotonic()
+
+    def append(self, name, result, error=None, timestamp=None, target=None):
+        timestamp = timestamp if timestamp is not None else time.time()
+        record = {'t': timestamp, 'c': name}
+        if target is not None:
+            record['g'] = target
+        if error is not None:
+            record['e'] = error
+        else:
+            if name == 'ash':
+                # The sampler object itself is rebuilt from the recorded rows
+                result = {key: item for key, item in result.items() if key != 'ash'}
+            record['r'] = encode_record(result)
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.buffer.append(json.dumps(record, default=str))
+        if len(self.buffer) >= self.flush_records or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        chunk = gzip.compress(('\n'.join(self.buffer) + '\n').encode())
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(chunk)
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps({'t': self.first_timestamp, 'offset': offset, 'records': len(self.buffer)}) + '\n')
+        self.buffer = []
+        self.first_timestamp = None
+
+    close = flush
+
+class SnapshotReader:
+    """Read a SnapshotRecorder file, optionally starting at a timestamp"""
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []
+        index_path = f"{path}.idx"
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.chunks = [json.loads(line) for line in f if line.strip()]
+
+    def first_timestamp(self):
+        for record in self.records():
+            return record[0]
+        return None
+
+    def records(self, start=None):
+        """Yield (timestamp, target, collector, result, error) from the chunk covering `start` onwards"""
+        offset = 0
+        if start is not None and self.chunks:
+            position = bisect.bisect_right([chunk['t'] for chunk in self.chunks], start) - 1
+            offset = self.chunks[max(position, 0)]['offset']
+        with open(self.path, 'rb') as raw:
+            raw.seek(offset)
+            with gzip.GzipFile(fileobj=raw) as f:
+                for line in f:
+                    record = json.loads(line)
+                    if start is not None and record['t'] < start:
+                        continue
+                    yield record['t'], record.get('g'), record['c'], decode_record(record.get('r')), record.get('e')
+
+def parse_replay_time(value, reference=None):
+    """Parse an ISO timestamp, or a time of day on the recording's first day"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    day = datetime.fromtimestamp(reference or time.time()).date()
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.combine(day, datetime.strptime(value, fmt).time()).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid time {value!r}; expected ISO timestamp or HH:MM[:SS]")
+
+class TargetMonitor:
+    """Everything kept per target: its history, alert engine and, when live, pool and scheduler"""
+    def __init__(self, name, role, history, alerts, pool=None, scheduler=None):
+        self.name = name
+        self.role = role
+        self.history = history
+        self.alerts = alerts
+        self.pool = pool
+        self.scheduler = scheduler
+        # Live monitors share the scheduler's dicts; replayed ones fill their own
+        self.snapshot = scheduler.snapshot if scheduler else {}
+        self.errors = scheduler.errors if scheduler else {}
+        self.ash = None
+
+def render_targets(monitors, args):
+    """Render each target's report, with a banner when targets are named"""
+    for monitor in monitors:
+        if monitor.name:
+            role = f" ({monitor.role})" if monitor.role else ""
+            print(f"\n{Colors.BOLD}{Colors.CYAN}{'━' * 30} 🎯 {monitor.name}{role} {'━' * 30}{Colors.NC}")
+        render_report(monitor.snapshot, monitor.errors, args, monitor.history, monitor.alerts)
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+class DashboardLog:
+    """Stand-in for stdout while the dashboard owns the terminal; keeps the last few lines"""
+    def __init__(self, maxlen=50):
+        self.lines = deque(maxlen=maxlen)
+        self._partial = ''
+
+    def write(self, text):
+        text = ANSI_ESCAPE.sub('', self._partial + text)
+        *complete, self._partial = text.split('\n')
+        self.lines.extend(line for line in complete if line.strip())
+        return len(text)
+
+    def flush(self):
+        pass
+
+# Statements/functions kept per sort column for the --tui panes
+DASHBOARD_ROWS = 50
+
+class DashboardPane:
+    """One sortable table on the dashboard.
+
+    rows(snapshot) lists the row dicts, key(row) identifies a row across
+    refreshes (for selection and drill-down), columns are (header, width,
+    row -> text) with width 0 taking the spare space, sorts are (label,
+    row -> number) and color(row) picks a Colors code for the row.
+    """
+    def __init__(self, name, title, source, rows, key, columns, sorts, color=lambda row: ''):
+        self.name = name
+        self.title = title
+        self.source = source
+        self.rows = rows
+        self.key = key
+        self.columns = columns
+        self.sorts = sorts
+        self.color = color
+        self.sort = 0
+        self.descending = True
+        self.selected = None
+        self.visible = OrderedDict()
+
+def interval_value(row, interval_field, cumulative_field):
+    """A row's per-interval value, or its cumulative one before the first delta"""
+    return row.get(interval_field, row[cumulative_field])
+
+def format_ratio(value):
+    return f"{value:.1f}%" if value is not None else "N/A"
+
+def table_row(table):
+    row = dict(zip(TABLE_STAT_COLUMNS, table))
+    row['dead_pct'] = 100.0 * row['n_dead_tup'] / row['n_live_tup'] if row['n_live_tup'] else 0.0
+    return row
+
+def table_color(row):
+    if row['seq_scan'] > row['idx_scan'] and row['seq_scan'] > 100:
+        return Colors.RED
+    return Colors.YELLOW if row['seq_scan'] > row['idx_scan'] else Colors.GREEN
+
+def build_dashboard_panes():
+    """The dashboard's panes: statements, functions and critical tables"""
+    return [
+        DashboardPane(
+            'queries', 'Statements', 'queries',
+            lambda snapshot: snapshot['queries']['active_queries'] or snapshot['queries']['slow_queries'],
+            lambda row: row['queryid'],
+            [('Statement', 0, lambda row: row['query_preview']),
+             ('Category', 14, lambda row: row['category']),
+             ('Calls/s', 9, lambda row: f"{row['calls_per_sec']:.2f}" if 'calls_per_sec' in row else str(row['calls'])),
+             ('Mean', 9, lambda row: format_duration(interval_value(row, 'interval_mean_time', 'mean_exec_time'))),
+             ('Total', 9, lambda row: format_duration(interval_value(row, 'interval_total_time', 'total_exec_time'))),
+             ('Max', 9, lambda row: format_duration(row['max_exec_time'])),
+             ('Hit%', 6, lambda row: format_ratio(interval_value(row, 'interval_hit_ratio', 'hit_ratio')))],
+            [('mean', lambda row: interval_value(row, 'interval_mean_time', 'mean_exec_time')),
+             ('calls', lambda row: row.get('calls_per_sec', row['calls'])),
+             ('total', lambda row: interval_value(row, 'interval_total_time', 'total_exec_time'))],
+            lambda row: performance_color(interval_value(row, 'interval_mean_time', 'mean_exec_time'))[0]),
+        DashboardPane(
+            'functions', 'Functions', 'functions',
+            lambda snapshot: snapshot['functions']['active_functions'] or snapshot['functions']['function_stats'],
+            lambda row: row['funcid'],
+            [('Function', 0, lambda row: row['funcname']),
+             ('Calls/s', 9, lambda row: f"{row['calls_per_sec']:.2f}" if 'calls_per_sec' in row else str(row['calls'])),
+             ('Mean', 9, lambda row: format_duration(interval_value(row, 'interval_mean_time', 'mean_time'))),
+             ('Self', 9, lambda row: format_duration(interval_value(row, 'interval_mean_self_time', 'mean_self_time'))),
+             ('Total', 9, lambda row: format_duration(interval_value(row, 'interval_total_time', 'total_time')))],
+            [('mean', lambda row: interval_value(row, 'interval_mean_time', 'mean_time')),
+             ('calls', lambda row: row.get('calls_per_sec', row['calls'])),
+             ('total', lambda row: interval_value(row, 'interval_total_time', 'total_time'))],
+            lambda row: performance_color(interval_value(row, 'interval_mean_time', 'mean_time'), warning=200)[0]),
+        DashboardPane(
+            'edge', 'Edge functions', 'edge',
+            lambda snapshot: edge_function_rows(snapshot['edge'], snapshot.get('queries')),
+            lambda row: row['function'],
+            [('Function', 0, lambda row: row['function']),
+             ('Req/s', 8, lambda row: f"{row['rate']:.2f}" if row['rate'] is not None else 'all'),
+             ('Err%', 6, lambda row: f"{row['error_rate'] * 100:.1f}"),
+             ('p50', 9, lambda row: format_duration(row['p50'])),
+             ('p95', 9, lambda row: format_duration(row['p95'])),
+             ('p99', 9, lambda row: format_duration(row['p99'])),
+             ('DB mean', 9, lambda row: format_duration(row['db_mean']) if row['db_mean'] is not None else '-')],
+            [('requests', lambda row: row['requests']),
+             ('p95', lambda row: row['p95']),
+             ('errors', lambda row: row['error_rate'])],
+            lambda row: performance_color(row['p95'], critical=2000, warning=1000)[0]),
+        DashboardPane(
+            'tables', 'Critical tables', 'tables',
+            lambda snapshot: [table_row(table) for table in snapshot['tables']['table_stats']],
+            lambda row: row['relname'],
+            [('Table', 0, lambda row: row['relname']),
+             ('SeqScans', 10, lambda row: str(row['seq_scan'])),
+             ('IdxScans', 10, lambda row: str(row['idx_scan'])),
+             ('Live', 11, lambda row: f"{row['n_live_tup']:,}"),
+             ('Dead', 11, lambda row: f"{row['n_dead_tup']:,}"),
+             ('Dead%', 7, lambda row: f"{row['dead_pct']:.1f}%")],
+            [('dead', lambda row: row['n_dead_tup']),
+             ('seq_scan', lambda row: row['seq_scan']),
+             ('dead%', lambda row: row['dead_pct'])],
+            table_color),
+    ]
+
+def split_lines(available, wants):
+    """Share screen lines fairly between panes, never giving a pane more than it wants"""
+    heights = [0] * len(wants)
+    pending = [index for index, want in enumerate(wants) if want > 0]
+    while pending and available > 0:
+        share = max(available // len(pending), 1)
+        for index in list(pending):
+            given = min(share, wants[index] - heights[index], available)
+            heights[index] += given
+            available -= given
+            if heights[index] >= wants[index]:
+                pending.remove(index)
+            if not available:
+                break
+    return heights
+
+class Dashboard:
+    """Full-screen terminal dashboard (--tui) over the targets' latest snapshots.
+
+    Every frame is composed as exactly one screen of lines; only lines that
+    differ from the previous frame are rewritten, and curses then sends just
+    the changed cells, so a refresh over SSH costs what changed rather than
+    the whole report. Panes pick their visible rows with a bounded heap and
+    sparklines are only drawn for the drilled-down row, keeping the cost of
+    a frame independent of how many statements the database has.
+    """
+    HELP = "Tab pane  s sort  r reverse  Up/Down select  Enter details  Esc back  t target  q quit"
+
+    def __init__(self, monitors, log, args):
+        self.monitors = monitors
+        self.log = log
+        self.args = args
+        self.panes = build_dashboard_panes()
+        self.focus = 0
+        self.target = 0
+        self.detail = None
+        self.frame = []
+        self.screen = None
+        self.quit = False
+
+    def __enter__(self):
+        os.environ.setdefault('ESCDELAY', '25')
+        self.screen = curses.initscr()
+        curses.noecho()
+        curses.cbreak()
+        self.screen.keypad(True)
+        self.screen.nodelay(True)
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.attrs = {}
+        if curses.has_colors():
+            curses.start_color()
+            try:
+                curses.use_default_colors()
+                background = -1
+            except curses.error:
+                background = curses.COLOR_BLACK
+            palette = [(Colors.RED, curses.COLOR_RED), (Colors.YELLOW, curses.COLOR_YELLOW),
+                       (Colors.GREEN, curses.COLOR_GREEN), (Colors.BLUE, curses.COLOR_BLUE),
+                       (Colors.CYAN, curses.COLOR_CYAN)]
+            for pair, (code, color) in enumerate(palette, start=1):
+                curses.init_pair(pair, color, background)
+                self.attrs[code] = curses.color_pair(pair)
+        self.render()
+        return self
+
+    def __exit__(self, *exc):
+        self.screen.keypad(False)
+        curses.nocbreak()
+        curses.echo()
+        curses.endwin()
+
+    def attr(self, code='', bold=False, selected=False):
+        return self.attrs.get(code, curses.A_NORMAL) | (curses.A_BOLD if bold else 0) | (curses.A_REVERSE if selected else 0)
+
+    async def wait(self, seconds):
+        """Handle keys until the next refresh is due; returns False once the user quits"""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            handled = False
+            key = self.screen.getch()
+            while key != -1:
+                self.handle_key(key)
+                handled = True
+                key = self.screen.getch()
+            if self.quit:
+                return False
+            if handled:
+                self.render()
+            await asyncio.sleep(0.05)
+        return True
+
+    def handle_key(self, key):
+        pane = self.panes[self.focus]
+        if key in (ord('q'), ord('Q')):
+            self.quit = True
+        elif key == curses.KEY_RESIZE:
+            self.frame = []
+        elif key in (27, curses.KEY_BACKSPACE, 127, 8, curses.KEY_LEFT):
+            self.detail = None
+        elif key == ord('t'):
+            self.target = (self.target + 1) % len(self.monitors)
+            self.detail = None
+        elif self.detail is not None:
+            return
+        elif key in (9, curses.KEY_BTAB):
+            self.cycle_focus(1 if key == 9 else -1)
+        elif key == ord('s'):
+            pane.sort = (pane.sort + 1) % len(pane.sorts)
+        elif key == ord('r'):
+            pane.descending = not pane.descending
+        elif key in (curses.KEY_UP, ord('k')):
+            self.move(pane, -1)
+        elif key in (curses.KEY_DOWN, ord('j')):
+            self.move(pane, 1)
+        elif key in (10, 13, curses.KEY_ENTER, curses.KEY_RIGHT) and pane.selected in pane.visible:
+            self.detail = (pane, pane.selected, pane.visible[pane.selected])
+
+    def cycle_focus(self, step):
+        """Move focus to the next pane that has data for the current target"""
+        snapshot = self.monitors[self.target].snapshot
+        for _ in self.panes:
+            self.focus = (self.focus + step) % len(self.panes)
+            if self.panes[self.focus].source in snapshot:
+                return
+
+    def move(self, pane, step):
+        keys = list(pane.visible)
+        if not keys:
+            return
+        if pane.selected not in pane.visible:
+            pane.selected = keys[0]
+            return
+        pane.selected = keys[max(0, min(len(keys) - 1, keys.index(pane.selected) + step))]
+
+    def render(self):
+        """Compose one frame and write only the lines that changed"""
+        height, width = self.screen.getmaxyx()
+        if len(self.frame) != height:
+            self.screen.erase()
+            self.frame = [None] * height
+        monitor = self.monitors[self.target]
+        lines = self.compose_detail(monitor, height, width) if self.detail else self.compose(monitor, height, width)
+        lines = (lines + [()] * height)[:height]
+        for y, line in enumerate(lines):
+            if self.frame[y] == line:
+                continue
+            self.frame[y] = line
+            self.screen.move(y, 0)
+            self.screen.clrtoeol()
+            x = 0
+            for text, attr in line:
+                if x >= width - 1:
+                    break
+                self.screen.addnstr(y, x, text, width - 1 - x, attr)
+                x += len(text)
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def compose(self, monitor, height, width):
+        snapshot = monitor.snapshot
+        lines = [self.header_line(monitor)]
+        summary = self.summary_lines(monitor)
+        footer = self.footer_lines(monitor)
+        rows = [pane.rows(snapshot) if pane.source in snapshot else [] for pane in self.panes]
+        # Short panes (e.g. the six critical tables) give their spare lines to the others
+        heights = split_lines(height - len(lines) - len(summary) - len(footer),
+                              [len(pane_rows) + 2 if pane.source in snapshot else 0 for pane, pane_rows in zip(self.panes, rows)])
+        for index, (pane, pane_rows, pane_height) in enumerate(zip(self.panes, rows, heights)):
+            lines.extend(self.compose_pane(pane, index == self.focus, pane_rows, pane_height, width))
+        return lines + summary + footer
+
+    def header_line(self, monitor):
+        name = f"  target {monitor.name}{f' ({monitor.role})' if monitor.role else ''} [{self.target + 1}/{len(self.monitors)}]" if monitor.name else ''
+        stats = monitor.snapshot.get('monitor')
+        load = f"  monitor load {stats['load'] * 100:.2f}%" if stats and stats['load'] is not None else ''
+        clock = datetime.fromtimestamp(current_time()).strftime('%H:%M:%S')
+        return ((f"Art Battle UX  {clock}{name}{load}", self.attr(Colors.CYAN, bold=True)),)
+
+    def compose_pane(self, pane, focused, rows, height, width):
+        """Title, column header and as many rows as fit, chosen by the pane's sort"""
+        if height <= 0:
+            return []
+        label, sort_key = pane.sorts[pane.sort]
+        marker = '>' if focused else ' '
+        title = ((f"{marker} {pane.title} - sort {label} {'desc' if pane.descending else 'asc'}", self.attr(Colors.BLUE, bold=True)),)
+        if height == 1:
+            return [title]
+        
+        fixed = sum(column[1] + 1 for column in pane.columns if column[1])
+        widths = [column[1] or max(width - 1 - fixed, 10) for column in pane.columns]
+        header = ((' '.join(f"{column[0]:<{w}}" for column, w in zip(pane.columns, widths)), self.attr(bold=True)),)
+        
+        pick = heapq.nlargest if pane.descending else heapq.nsmallest
+        visible = pick(height - 2, rows, key=sort_key)
+        pane.visible = OrderedDict((pane.key(row), row) for row in visible)
+        
+        lines = [title, header]
+        for row in visible:
+            text = ' '.join(f"{str(column[2](row))[:w]:<{w}}" for column, w in zip(pane.columns, widths))
+            selected = focused and pane.key(row) == pane.selected
+            lines.append(((text, self.attr(pane.color(row), selected=selected)),))
+        return lines + [()] * (height - len(lines))
+
+    def summary_lines(self, monitor):
+        """Fixed three lines: user experience, database health, live events or latency"""
+        snapshot = monitor.snapshot
+        ux_line = []
+        if 'ux' in snapshot:
+            voting, bidding, events = snapshot['ux']['voting'], snapshot['ux']['bidding'], snapshot['ux']['events']
+            avg_vote = voting[1] or 0
+            color = Colors.RED if avg_vote > 2 else (Colors.YELLOW if avg_vote > 1 else Colors.GREEN)
+            ux_line = [("UX  ", self.attr(bold=True)),
+                       (f"votes/h {voting[0] or 0}  ", self.attr()),
+                       (f"avg vote {avg_vote:.2f}s  ", self.attr(color)),
+                       (f"bids/h {bidding[0] or 0}  events {events[0] or 0} rounds {events[1] or 0} art {events[2] or 0}", self.attr())]
+        
+        db_line = []
+        if 'connections' in snapshot:
+            connections = snapshot['connections']['connections']
+            total = sum(conn[1] for conn in connections)
+            active = next((conn[1] for conn in connections if conn[0] == 'active'), 0)
+            lock_waits = sum(lock[1] for lock in snapshot['connections']['locks'])
+            color = Colors.RED if total > 200 else (Colors.YELLOW if total > 100 else Colors.GREEN)
+            db_line = [("DB  ", self.attr(bold=True)),
+                       (f"connections {total} ({active} active)  ", self.attr(color)),
+                       (f"lock waits {lock_waits}  ", self.attr(Colors.RED if lock_waits else Colors.GREEN))]
+            if 'database' in snapshot:
+                db_line.append((f"cache hit {snapshot['database']['database'][1]:.1f}%  ", self.attr()))
+            replication = snapshot.get('replication')
+            if replication and replication['is_replica'] and replication['replay_lag'] is not None:
+                db_line.append((f"replay lag {replication['replay_lag']:.1f}s", self.attr(Colors.YELLOW if replication['replay_lag'] > 5 else '')))
+            elif replication and replication['replicas']:
+                worst = max(replica['replay_lag'] or 0 for replica in replication['replicas'])
+                db_line.append((f"replica lag {worst:.1f}s", self.attr(Colors.YELLOW if worst > 5 else '')))
+        
+        third = []
+        if snapshot.get('live') and snapshot['live']['events']:
+            third = [("LIVE", self.attr(bold=True))]
+            for event in snapshot['live']['events'][:4]:
+                eid = event['eid']
+                third.append((f"  {eid} {window_sum(monitor.history, f'live.{eid}.votes', 10) / 10:.1f} votes/s "
+                              f"{window_sum(monitor.history, f'live.{eid}.bids', 10) / 10:.1f} bids/s", self.attr(Colors.YELLOW)))
+        elif 'latency' in snapshot:
+            third = [("LAT ", self.attr(bold=True))]
+            for name, result in snapshot['latency']['latency'].items():
+                if result and result['window'].total:
+                    color = Colors.RED if result['p95'] > 2000 else (Colors.YELLOW if result['p95'] > 1000 else Colors.GREEN)
+                    third.append((f" {name} p50 {format_latency_edge(result['p50'])} p95 {format_latency_edge(result['p95'])} "
+                                  f"p99 {format_latency_edge(result['p99'])} ", self.attr(color)))
+        return [tuple(ux_line), tuple(db_line), tuple(third)]
+
+    def footer_lines(self, monitor):
+        """Fixed three lines: firing alerts, the latest error or message, key help"""
+        firing = monitor.alerts.firing() if monitor.alerts else []
+        if firing:
+            rule, series, value = firing[0]
+            more = f" (+{len(firing) - 1} more)" if len(firing) > 1 else ''
+            alert_line = ((f"ALERT [{rule.severity}] {rule.name} {series} = {value:.2f}{more}", self.attr(Colors.RED, bold=True)),)
+        else:
+            alert_line = (("No alerts firing", self.attr(Colors.GREEN)),)
+        if monitor.errors:
+            name, error = next(iter(monitor.errors.items()))
+            message_line = ((f"Error collecting {name}: {error}", self.attr(Colors.RED)),)
+        elif self.log.lines:
+            message_line = ((self.log.lines[-1], self.attr()),)
+        else:
+            message_line = ()
+        return [alert_line, message_line, ((self.HELP, self.attr(bold=True)),)]
+
+    def compose_detail(self, monitor, height, width):
+        """Every field of the drilled-down row, plus trends from the history"""
+        pane, key, last_row = self.detail
+        snapshot = monitor.snapshot
+        current = {pane.key(row): row for row in pane.rows(snapshot)} if pane.source in snapshot else {}
+        row = current.get(key, last_row)
+        self.detail = (pane, key, row)
+        
+        lines = [((f"{pane.title}: {key}{'' if key in current else '  (not in the latest snapshot)'}", self.attr(Colors.CYAN, bold=True)),)]
+        series = {'queries': [f"query.{key}.mean"], 'functions': [f"function.{key}.mean"],
+                  'edge': [f"edge.{key}.rate", f"edge.{key}.error_rate", f"edge.{key}.p95"],
+                  'tables': [f"table.{key}.dead_tuples", f"table.{key}.seq_scan"]}[pane.name]
+        for name in series:
+            buffer = monitor.history.get(name)
+            stats = buffer.stats(600) if buffer else None
+            if stats:
+                lines.append(((f"{name:<40} {buffer.sparkline(600, 40)}  last {buffer.latest():,.1f} "
+                               f"p95 {stats['p95']:,.1f} max {stats['max']:,.1f}", self.attr(Colors.CYAN)),))
+        lines.append(())
+        
+        if pane.name == 'queries':
+            for regression in snapshot.get('queries', {}).get('plan_regressions', []):
+                if regression['row']['queryid'] == key:
+                    lines.append(((f"Plan regression: {format_duration(regression['baseline'])} -> "
+                                   f"{format_duration(regression['row']['interval_mean_time'])}", self.attr(Colors.RED, bold=True)),))
+                    lines.extend(((f"  {line}", self.attr(Colors.RED if line.startswith('+') else '')),)
+                                 for line in regression.get('diff', []))
+        if pane.name == 'tables':
+            for table in snapshot.get('table_health', {}).get('tables', []):
+                if table['relname'] == key:
+                    lines.extend(((f"-> {suggestion}"[:width - 1], self.attr(Colors.YELLOW)),) for suggestion in table['suggestions'])
+        for field, value in row.items():
+            if field == 'query_preview':
+                continue
+            if isinstance(value, float):
+                value = f"{value:,.2f}"
+            lines.append(((f"{field:<28} {value}", self.attr()),))
+        if 'query_preview' in row:
+            lines.append(())
+            text = ' '.join(row['query_preview'].split())
+            lines.extend(((text[start:start + width - 1], self.attr()),) for start in range(0, len(text), width - 1))
+        
+        lines = lines[:height - 1]
+        return lines + [()] * (height - 1 - len(lines)) + [(("Esc back  t target  q quit", self.attr(bold=True)),)]
+
+def replay_recording(args, make_target, context_seconds=600):
+    """Render reports from a recording instead of a live database.
+
+    Collector results are fed through the same history and report code in
+    recorded order; a report is printed every --interval seconds of recorded
+    time, paced by --speed (0 = as fast as possible). Alert rules see recorded
+    timestamps, so a rules file can be tested against a past event. Records
+    from up to context_seconds before --from only warm the trends.
+    make_target(name) returns a fresh TargetMonitor for each recorded target.
+    """
+    global REPLAY_TIME
+    reader = SnapshotReader(args.replay)
+    first = reader.first_timestamp()
+    if first is None:
+        print(f"Recording {args.replay} is empty")
+        return
+    start = parse_replay_time(args.replay_from, first)
+    until = parse_replay_time(args.replay_until, first)
+    
+    monitors = {}
+    next_render = None
+    last_render = None
+    for timestamp, target, name, result, error in reader.records(start - context_seconds if start else None):
+        if until is not None and timestamp > until:
+            break
+        if args.target and target not in args.target:
+            continue
+        REPLAY_TIME = timestamp
+        monitor = monitors.get(target)
+        if monitor is None:
+            monitor = monitors[target] = make_target(target)
+        if error is not None:
+            monitor.errors[name] = error
+        else:
+            if name == 'ash':
+                monitor.ash = monitor.ash or ActiveSessionHistory()
+                monitor.ash.add(timestamp, result['rows'])
+                result['ash'] = monitor.ash
+            monitor.snapshot[name] = result
+            monitor.errors.pop(name, None)
+            record_history(monitor.history, name, result, timestamp)
+        
+        if start is not None and timestamp < start:
+            continue
+        if next_render is None:
+            next_render = timestamp + args.interval
+        if timestamp >= next_render:
+            if args.speed and last_render is not None:
+                time.sleep((timestamp - last_render) / args.speed)
+            render_targets(list(monitors.values()), args)
+            last_render = timestamp
+            next_render = timestamp + args.interval
+    
+    # Show the tail of the recording unless it was just rendered
+    if monitors and last_render != REPLAY_TIME:
+        render_targets(list(monitors.values()), args)
+
+def render_report(snapshot, errors, args, history=None, alerts=None):
+    """Print every section from the latest collected snapshot"""
+    if not args.once:
+        print(f"\n{Colors.BOLD}📍 {datetime.fromtimestamp(current_time()).strftime('%H:%M:%S')} - Performance Check{Colors.NC}")
+    
+    if 'live' in snapshot:
+        print_live_events(snapshot['live'], history)
+    if 'queries' in snapshot:
+        print_query_performance(snapshot['queries'], args.verbose, history)
+        print_query_categories(snapshot['queries'], history)
+        print_plan_regressions(snapshot['queries'])
+    if 'edge' in snapshot:
+        print_edge_functions(snapshot['edge'], snapshot.get('queries'), args.verbose, history)
+    if 'functions' in snapshot:
+        print_function_performance(snapshot['functions'], args.verbose, history)
+    if 'tables' in snapshot:
+        print_table_performance(snapshot['tables'], args.verbose, history)
+    if 'table_health' in snapshot:
+        print_table_health(snapshot['table_health'], args.verbose, bool(snapshot.get('live', {}).get('events')), history)
+    if 'ux' in snapshot:
+        print_user_experience_metrics(snapshot['ux'], history)
+    if 'latency' in snapshot:
+        print_latency_histograms(snapshot['latency'], args.verbose, history)
+    if 'ash' in snapshot:
+        print_active_session_history(snapshot['ash'], args.ash_window, args.verbose, history)
+    if 'locks' in snapshot:
+        print_lock_tree(snapshot['locks'], args.verbose, history)
+    if 'connections' in snapshot:
+        print_system_health(snapshot['connections'], snapshot.get('database'), history)
+    if 'replication' in snapshot:
+        print_replication(snapshot['replication'], history)
+    
+    if 'monitor' in snapshot:
+        print_monitor_overhead(snapshot['monitor'], args.verbose, history)
+    
+    for name, error in errors.items():
+        print(f"{Colors.RED}Error collecting {name}: {error}{Colors.NC}")
+    
+    if alerts is None:
+        return
+    firing = alerts.firing()
+    if firing:
+        print(f"\n{Colors.RED}🚨 ALERT: {len(firing)} rule(s) firing{Colors.NC}")
+        for rule, series, value in firing:
+            color = Colors.RED if rule.severity == 'critical' else Colors.YELLOW
+            print(f"  {color}[{rule.severity}] {rule.name}{Colors.NC} {series} = {value:.2f} ({rule.op} {rule.threshold:g})")
+
+def default_alert_rules(alert_threshold):
+    """Rules used without --alert-rules, matching the monitor's long-standing alerts"""
+    return [
+        AlertRule({'name': 'slow-statement', 'match': 'query.*.mean', 'op': '>',
+                   'threshold': alert_threshold, 'severity': 'critical'}),
+        AlertRule({'name': 'cache-hit-ratio', 'metric': 'database.cache_hit_ratio', 'op': '<',
+                   'threshold': 90, 'clear': 92}),
+        AlertRule({'name': 'connections', 'metric': 'connections.total', 'op': '>',
+                   'threshold': 200, 'clear': 180, 'for': 30}),
+    ]
+
 def print_header(interval):
     """Print monitoring header"""
     print(f"{Colors.BOLD}{'='*80}{Colors.NC}")
@@ -273,56 +3212,156 @@ def print_header(interval):
     print(f"Monitoring: Database queries, functions, user experience metrics")
     print(f"{Colors.BOLD}{'='*80}{Colors.NC}")
 
-def print_query_performance(stats, verbose=False):
+def performance_color(mean_time, critical=1000, warning=500):
+    """Color and status for a mean execution time in milliseconds"""
+    if mean_time > critical:
+        return Colors.RED, "CRITICAL"
+    elif mean_time > warning:
+        return Colors.YELLOW, "WARNING"
+    return Colors.GREEN, "OK"
+
+def print_query_performance(stats, verbose=False, history=None):
     """Print query performance statistics"""
-    print(f"\n{Colors.BOLD}{Colors.BLUE}📊 Query Performance (Top Slow Queries){Colors.NC}")
-    print(f"{'Query Preview':<50} {'Calls':<8} {'Avg Time':<10} {'Max Time':<10} {'Hit%':<8}")
-    print("-" * 90)
+    if stats['interval']:
+        print(f"\n{Colors.BOLD}{Colors.BLUE}📊 Query Performance (Slowest This Interval){Colors.NC}")
+        print(f"{'Query Preview':<50} {'Calls/s':<9} {'Int Mean':<10} {'Int Total':<10} {'Max Time':<10} {'Hit%':<8}")
+        print("-" * 100)
+    else:
+        print(f"\n{Colors.BOLD}{Colors.BLUE}📊 Query Performance (Top Slow Queries){Colors.NC}")
+        print(f"{'Query Preview':<50} {'Calls':<8} {'Avg Time':<10} {'Max Time':<10} {'Hit%':<8}")
+        print("-" * 90)
     
     for query in stats['slow_queries']:
-        query_preview, calls, total_time, mean_time, max_time, avg_rows, hit_ratio = query
-        
-        # Color code based on performance
-        if mean_time > 1000:  # > 1 second
-            color = Colors.RED
-            status = "CRITICAL"
-        elif mean_time > 500:  # > 500ms
-            color = Colors.YELLOW
-            status = "WARNING"
-        else:
-            color = Colors.GREEN
-            status = "OK"
+        if stats['interval']:
+            color, status = performance_color(query['interval_mean_time'])
+            hit_ratio = query['interval_hit_ratio']
+            hit_ratio_str = f"{hit_ratio:.1f}%" if hit_ratio is not None else "N/A"
+            trend = format_trend(history, f"query.{query['queryid']}.mean", fmt=format_duration)
+            print(f"{color}{query['query_preview'][:50]:<50} {query['calls_per_sec']:<9.2f} "
+                  f"{format_duration(query['interval_mean_time']):<10} {format_duration(query['interval_total_time']):<10} "
+                  f"{format_duration(query['max_exec_time']):<10} {hit_ratio_str:<8}{Colors.NC}{trend}")
+            
+            if verbose and query['interval_mean_time'] > 100:
+                print(f"  └─ Interval calls: {query['interval_calls']}, Cumulative mean: "
+                      f"{format_duration(query['mean_exec_time'])}, Avg rows: {query['avg_rows']:.1f}")
+            continue
         
+        color, status = performance_color(query['mean_exec_time'])
+        hit_ratio = query['hit_ratio']
         hit_ratio_str = f"{hit_ratio:.1f}%" if hit_ratio else "N/A"
         
-        print(f"{color}{query_preview[:50]:<50} {calls:<8} {format_duration(mean_time):<10} {format_duration(max_time):<10} {hit_ratio_str:<8}{Colors.NC}")
+        print(f"{color}{query['query_preview'][:50]:<50} {query['calls']:<8} {format_duration(query['mean_exec_time']):<10} "
+              f"{format_duration(query['max_exec_time']):<10} {hit_ratio_str:<8}{Colors.NC}")
         
-        if verbose and mean_time > 100:  # Show details for queries > 100ms
-            print(f"  └─ Total time: {format_duration(total_time)}, Avg rows: {avg_rows:.1f}")
+        if verbose and query['mean_exec_time'] > 100:  # Show details for queries > 100ms
+            print(f"  └─ Total time: {format_duration(query['total_exec_time'])}, Avg rows: {query['avg_rows']:.1f}")
+
+def print_plan_regressions(stats):
+    """Print statements whose mean time jumped, with plan diffs against the last good plan"""
+    if not stats.get('plan_regressions'):
+        return
+    
+    print(f"\n{Colors.BOLD}{Colors.RED}🧭 Plan Regressions{Colors.NC}")
+    for regression in stats['plan_regressions']:
+        row = regression['row']
+        print(f"{Colors.RED}{row['query_preview'][:60]:<60}{Colors.NC} {format_duration(regression['baseline'])} → "
+              f"{format_duration(row['interval_mean_time'])} ({row['interval_mean_time'] / regression['baseline']:.1f}x)")
+        if 'error' in regression:
+            print(f"  └─ EXPLAIN failed: {regression['error']}")
+        elif regression['plan_changed']:
+            print(f"  └─ {Colors.RED}Plan changed{Colors.NC} {regression['good_hash']} → {regression['plan_hash']}")
+            for line in regression['diff']:
+                color = Colors.RED if line.startswith('+') else (Colors.GREEN if line.startswith('-') else '')
+                print(f"     {color}{line}{Colors.NC}")
+        elif regression['good_hash']:
+            print(f"  └─ Same plan as last good ({regression['plan_hash']}); look at data volume or contention")
+        else:
+            print(f"  └─ Plan {regression['plan_hash']} captured; no earlier good plan to compare")
 
-def print_function_performance(stats, verbose=False):
+def print_query_categories(stats, history=None):
+    """Print pg_stat_statements aggregated by query category"""
+    print(f"\n{Colors.BOLD}{Colors.BLUE}🗂  Query Categories{Colors.NC}")
+    if stats['interval']:
+        print(f"{'Category':<16} {'Stmts':<7} {'Calls/s':<9} {'Int Mean':<10} {'Int Total':<10}")
+        print("-" * 56)
+        for category in stats['categories']:
+            if not category['interval_calls']:
+                continue
+            color, _ = performance_color(category['interval_mean_time'])
+            trend = format_trend(history, f"category.{category['category']}.mean", fmt=format_duration)
+            print(f"{color}{category['category']:<16} {category['queries']:<7} {category['calls_per_sec']:<9.2f} "
+                  f"{format_duration(category['interval_mean_time']):<10} {format_duration(category['interval_total_time']):<10}{Colors.NC}{trend}")
+        return
+    
+    print(f"{'Category':<16} {'Stmts':<7} {'Calls':<10} {'Avg Time':<10} {'Total':<10}")
+    print("-" * 56)
+    for category in stats['categories']:
+        color, _ = performance_color(category['mean_time'])
+        print(f"{color}{category['category']:<16} {category['queries']:<7} {category['calls']:<10} "
+              f"{format_duration(category['mean_time']):<10} {format_duration(category['total_time']):<10}{Colors.NC}")
+
+def edge_function_rows(edge, queries=None):
+    """Edge function rows, each with the interval mean of its database query category alongside"""
+    categories = {category['category']: category for category in queries['categories']} if queries else {}
+    rows = []
+    for function in edge['functions']:
+        category = categories.get(function['category'], {})
+        rows.append(dict(function, db_mean=category.get('interval_mean_time', category.get('mean_time'))))
+    return rows
+
+def print_edge_functions(stats, queries=None, verbose=False, history=None):
+    """Print per-function request rate, error rate and duration percentiles from the edge logs"""
+    print(f"\n{Colors.BOLD}{Colors.CYAN}🌐 Edge Functions (last {stats['window']}s){Colors.NC}")
+    if not stats['functions']:
+        print(f"No edge function requests ingested ({stats['lines']:,} lines read)")
+        return
+    print(f"{'Function':<32} {'Req/s':<8} {'Err%':<7} {'p50':<9} {'p95':<9} {'p99':<9} {'DB category mean':<24}")
+    print("-" * 100)
+    
+    rows = edge_function_rows(stats, queries)
+    for function in rows if verbose else rows[:15]:
+        color, _ = performance_color(function['p95'] or 0, critical=2000, warning=1000)
+        error_color = Colors.RED if function['error_rate'] > 0.05 else (Colors.YELLOW if function['error_rate'] > 0.01 else '')
+        rate = f"{function['rate']:.2f}" if function['rate'] is not None else "all"
+        db_mean = (f"{function['category']} {format_duration(function['db_mean'])}"
+                   if function['db_mean'] is not None else (function['category'] or '-'))
+        trend = format_trend(history, f"edge.{function['function']}.p95", fmt=format_duration) if function['scope'] == 'window' else ''
+        print(f"{function['function'][:32]:<32} {rate:<8} {error_color}{function['error_rate'] * 100:<7.1f}{Colors.NC if error_color else ''}"
+              f"{color}{format_duration(function['p50']):<9} {format_duration(function['p95']):<9} "
+              f"{format_duration(function['p99']):<9}{Colors.NC} {db_mean:<24}{trend}")
+    
+    if stats['malformed'] or stats['backlog']:
+        print(f"{Colors.YELLOW}{stats['malformed']:,} malformed lines, {format_bytes(stats['backlog'])} not yet read{Colors.NC}")
+    elif verbose:
+        newest = stats['newest'].strftime('%H:%M:%S') if stats['newest'] else 'never'
+        print(f"  └─ {stats['lines']:,} lines ingested ({stats['ignored']:,} non-request), newest request at {newest}")
+
+def print_function_performance(stats, verbose=False, history=None):
     """Print function performance statistics"""
     if not stats['function_stats']:
         return
-        
-    print(f"\n{Colors.BOLD}{Colors.CYAN}⚡ Function Performance{Colors.NC}")
-    print(f"{'Function Name':<30} {'Calls':<8} {'Mean Time':<12} {'Self Time':<12}")
+    
+    interval = stats['interval']
+    print(f"\n{Colors.BOLD}{Colors.CYAN}⚡ Function Performance{' (This Interval)' if interval else ''}{Colors.NC}")
+    print(f"{'Function Name':<30} {'Calls/s' if interval else 'Calls':<8} {'Mean Time':<12} {'Self Time':<12}")
     print("-" * 65)
     
     for func in stats['function_stats']:
-        schema, funcname, calls, total_time, self_time, mean_time, mean_self_time = func
-        
-        # Color code based on performance
-        if mean_time > 1000:
-            color = Colors.RED
-        elif mean_time > 200:
-            color = Colors.YELLOW
+        if interval:
+            calls = f"{func['calls_per_sec']:.2f}"
+            mean_time = func['interval_mean_time']
+            mean_self_time = func['interval_mean_self_time']
         else:
-            color = Colors.GREEN
+            calls = func['calls']
+            mean_time = func['mean_time']
+            mean_self_time = func['mean_self_time']
+        
+        color, _ = performance_color(mean_time, warning=200)
         
-        print(f"{color}{funcname[:30]:<30} {calls:<8} {format_duration(mean_time):<12} {format_duration(mean_self_time):<12}{Colors.NC}")
+        trend = format_trend(history, f"function.{func['funcid']}.mean", fmt=format_duration) if interval else ''
+        print(f"{color}{func['funcname'][:30]:<30} {calls:<8} {format_duration(mean_time):<12} {format_duration(mean_self_time):<12}{Colors.NC}{trend}")
 
-def print_table_performance(stats, verbose=False):
+def print_table_performance(stats, verbose=False, history=None):
     """Print table performance statistics"""
     print(f"\n{Colors.BOLD}{Colors.BLUE}🗂️  Table Performance (Critical Tables){Colors.NC}")
     print(f"{'Table':<15} {'SeqScans':<10} {'IdxScans':<10} {'Live Tuples':<12} {'Dead Tuples':<12}")
@@ -344,12 +3383,50 @@ def print_table_performance(stats, verbose=False):
         dead_ratio = n_dead_tup / max(n_live_tup, 1) if n_live_tup else 0
         dead_color = Colors.RED if dead_ratio > 0.1 else Colors.GREEN
         
-        print(f"{color}{relname:<15}{Colors.NC} {seq_scan:<10} {idx_scan:<10} {n_live_tup:<12} {dead_color}{n_dead_tup:<12}{Colors.NC}")
+        trend = format_trend(history, f"table.{relname}.dead_tuples", fmt=lambda value: f"{value:,.0f}")
+        print(f"{color}{relname:<15}{Colors.NC} {seq_scan:<10} {idx_scan:<10} {n_live_tup:<12} {dead_color}{n_dead_tup:<12}{Colors.NC}{trend}")
         
         if verbose:
             print(f"  └─ Inserts: {n_tup_ins}, Updates: {n_tup_upd}, Deletes: {n_tup_del}")
 
-def print_user_experience_metrics(stats):
+def print_table_health(stats, verbose=False, live=False, history=None):
+    """Print projected autovacuum timing, bloat growth, seq-scan trends and suggestions per table"""
+    print(f"\n{Colors.BOLD}{Colors.BLUE}🩹 Table Health Advisor{Colors.NC}")
+    print(f"{'Table':<18} {'Dead%':<7} {'Dead/min':<10} {'Bloat/min':<10} {'Autovacuum':<12} {'SeqScans/min':<14}")
+    print("-" * 75)
+    
+    for table in stats['tables']:
+        dead_color = Colors.RED if table['dead_pct'] > 20 else (Colors.YELLOW if table['dead_pct'] > 10 else Colors.GREEN)
+        dead_pct = f"{table['dead_pct']:.1f}%"
+        dead_rate = f"{table['dead_rate']:+,.0f}" if table['dead_rate'] is not None else "-"
+        bloat_rate = format_bytes(table['bloat_rate']) if table['bloat_rate'] and table['bloat_rate'] > 0 else "-"
+        if not table['autovacuum_enabled']:
+            autovacuum, av_color = "off", Colors.RED
+        elif table['due']:
+            autovacuum, av_color = "due now", Colors.YELLOW
+        elif table['eta'] is not None:
+            autovacuum, av_color = f"in {format_age(table['eta'])}", Colors.GREEN
+        else:
+            autovacuum, av_color = "no growth", Colors.GREEN
+        if table['seq_scan_rate'] is None:
+            seq_scans, seq_color = "-", Colors.NC
+        else:
+            seq_scans = f"{table['seq_scan_rate']:.1f}{' ↑' if table['seq_scan_climbing'] else ''}"
+            seq_color = Colors.RED if table['seq_scan_climbing'] else Colors.NC
+        
+        trend = format_trend(history, f"table.{table['relname']}.dead_rate", fmt=lambda value: f"{value:,.0f}/min")
+        print(f"{table['relname']:<18} {dead_color}{dead_pct:<7}{Colors.NC} {dead_rate:<10} {bloat_rate:<10} "
+              f"{av_color}{autovacuum:<12}{Colors.NC} {seq_color}{seq_scans:<14}{Colors.NC}{trend}")
+        
+        if verbose:
+            insert_trigger = f"{table['insert_trigger']:,.0f}" if table['insert_trigger'] is not None else "off"
+            print(f"  └─ Vacuum trigger {table['vacuum_trigger']:,.0f} dead (insert trigger {insert_trigger}), "
+                  f"{format_bytes(table['table_bytes'])}, ~{table['avg_seq_rows']:,.0f} rows per seq scan")
+        for suggestion in table['suggestions']:
+            during = "During live events: " if live and suggestion.startswith("Sequential scans") else ""
+            print(f"  {Colors.YELLOW}→ {during}{suggestion}{Colors.NC}")
+
+def print_user_experience_metrics(stats, history=None):
     """Print user experience specific metrics"""
     print(f"\n{Colors.BOLD}{Colors.GREEN}👥 User Experience Metrics{Colors.NC}")
     
@@ -364,8 +3441,10 @@ def print_user_experience_metrics(stats):
     
     vote_color = Colors.RED if avg_vote_time > 2 else (Colors.YELLOW if avg_vote_time > 1 else Colors.GREEN)
     
-    print(f"Votes (last hour): {vote_color}{votes_last_hour}{Colors.NC}")
-    print(f"Avg vote processing: {vote_color}{avg_vote_time:.2f}s{Colors.NC}")
+    print(f"Votes (last hour): {vote_color}{votes_last_hour}{Colors.NC}"
+          f"{format_trend(history, 'votes.last_hour', fmt=lambda value: f'{value:.0f}')}")
+    print(f"Avg vote processing: {vote_color}{avg_vote_time:.2f}s{Colors.NC}"
+          f"{format_trend(history, 'votes.avg_processing', fmt=lambda value: f'{value:.2f}s')}")
     if max_vote_time > 5:
         print(f"Max vote processing: {Colors.RED}{max_vote_time:.2f}s{Colors.NC}")
     
@@ -374,7 +3453,7 @@ def print_user_experience_metrics(stats):
     avg_bid = bidding[1] or 0
     max_bid = bidding[2] or 0
     
-    print(f"Bids (last hour): {bids_last_hour}")
+    print(f"Bids (last hour): {bids_last_hour}{format_trend(history, 'bids.last_hour', fmt=lambda value: f'{value:.0f}')}")
     if avg_bid > 0:
         print(f"Avg bid amount: ${avg_bid:.2f}")
     
@@ -387,7 +3466,168 @@ def print_user_experience_metrics(stats):
     print(f"Active rounds: {active_rounds}")
     print(f"Artworks in play: {artworks}")
 
-def print_system_health(stats):
+def format_latency_edge(ms):
+    """Format a histogram edge; the overflow bucket has no upper edge"""
+    return f">{format_duration(LATENCY_BUCKETS_MS[-1])}" if ms == float('inf') else f"≤{format_duration(ms)}"
+
+def print_latency_histograms(stats, verbose=False, history=None):
+    """Print rolling vote/bid latency percentiles and bucket counts"""
+    print(f"\n{Colors.BOLD}{Colors.GREEN}⏱️  Vote & Bid Latency (last hour){Colors.NC}")
+    
+    for name, result in stats['latency'].items():
+        if result is None:
+            print(f"{name.title():<6} latency unavailable (requires track_commit_timestamp = on)")
+            continue
+        window = result['window']
+        if not window.total:
+            print(f"{name.title():<6} no samples")
+            continue
+        
+        p95 = result['p95']
+        color = Colors.RED if p95 > 2000 else (Colors.YELLOW if p95 > 1000 else Colors.GREEN)
+        trend = format_trend(history, f"latency.{name}.p95", fmt=format_duration)
+        print(f"{name.title():<6} {color}p50 {format_latency_edge(result['p50'])}  p95 {format_latency_edge(p95)}  "
+              f"p99 {format_latency_edge(result['p99'])}{Colors.NC}  ({window.total:,} samples){trend}")
+        
+        if verbose:
+            buckets = [f"{format_latency_edge(edge)}: {count}"
+                       for edge, count in zip(window.edges + [float('inf')], window.counts) if count]
+            print(f"  └─ {', '.join(buckets)}")
+
+def window_sum(history, name, seconds):
+    """Sum of a per-sample count series over the last `seconds`"""
+    buffer = history.get(name) if history else None
+    return sum(buffer.window(seconds)) if buffer else 0
+
+def print_live_events(stats, history=None):
+    """Print per-event, per-round and top-artwork vote/bid rates"""
+    print(f"\n{Colors.BOLD}{Colors.YELLOW}🎨 Live Events{Colors.NC}")
+    if not stats['events']:
+        print("No active events")
+        return
+    
+    for event in stats['events']:
+        eid = event['eid']
+        votes_10s = window_sum(history, f"live.{eid}.votes", 10)
+        bids_10s = window_sum(history, f"live.{eid}.bids", 10)
+        print(f"{Colors.BOLD}{eid}{Colors.NC} {event['name'] or ''}")
+        print(f"  Votes: {votes_10s / 10:.1f}/s ({window_sum(history, f'live.{eid}.votes', 60):.0f}/min)"
+              f"{format_trend(history, f'live.{eid}.votes', window=300, fmt=lambda value: f'{value:.0f}')}")
+        print(f"  Bids:  {bids_10s / 10:.1f}/s ({window_sum(history, f'live.{eid}.bids', 60):.0f}/min)"
+              f"{format_trend(history, f'live.{eid}.bids', window=300, fmt=lambda value: f'{value:.0f}')}")
+        
+        rounds = sorted({round_number for (e, round_number, _) in stats['totals'] if e == eid}, key=lambda r: (r is None, r))
+        for round_number in rounds:
+            votes_min = window_sum(history, f"live.{eid}.round.{round_number}.votes", 60)
+            bids_min = window_sum(history, f"live.{eid}.round.{round_number}.bids", 60)
+            if votes_min or bids_min:
+                print(f"  Round {round_number}: {votes_min:.0f} votes/min, {bids_min:.0f} bids/min")
+        
+        # Totals since the monitor started, busiest artworks first
+        art_totals = [(art_code, counts) for (e, _, art_code), counts in stats['totals'].items() if e == eid]
+        art_totals.sort(key=lambda item: (item[1]['votes'] + item[1]['bids']), reverse=True)
+        for art_code, counts in art_totals[:5]:
+            print(f"    {art_code or '?':<14} {counts['votes']:>6} votes {counts['bids']:>5} bids")
+
+def print_active_session_history(stats, window=60, verbose=False, history=None):
+    """Print ASH top-N breakdowns over the last `window` seconds"""
+    ash = stats['ash']
+    print(f"\n{Colors.BOLD}{Colors.BLUE}📊 Active Sessions (last {window}s){Colors.NC}"
+          f"{format_trend(history, 'ash.active', window=window, fmt=lambda value: f'{value:.0f}')}")
+    
+    active = sum(sessions for _, _, sessions in ash.top('class', seconds=window, limit=None))
+    if not active:
+        print("No active sessions sampled")
+        return
+    
+    dimensions = [('class', 'Wait class'), ('wait', 'Wait event'), ('query', 'Query id'), ('application', 'Application')]
+    if verbose:
+        dimensions.append(('backend', 'Backend type'))
+    for dimension, title in dimensions:
+        print(f"{Colors.BOLD}{title}:{Colors.NC}")
+        for label, samples, sessions in ash.top(dimension, seconds=window):
+            print(f"  {str(label):<36} {sessions:>6.2f} AAS {sessions * 100 / active:>5.1f}%")
+
+def print_lock_tree(stats, verbose=False, history=None, max_roots=5, max_children=10):
+    """Print blocker -> waiter trees and the most contended rows"""
+    if not stats['waiting']:
+        return
+    
+    print(f"\n{Colors.BOLD}{Colors.RED}🔒 Lock Waits: {stats['waiting']} blocked, longest {stats['max_wait']:.1f}s{Colors.NC}"
+          f"{format_trend(history, 'locks.blocked', fmt=lambda value: f'{value:.0f}')}")
+    backends = stats['backends']
+    
+    def print_node(pid, depth, seen):
+        node = backends[pid]
+        target = node['relation'] or node['locktype'] or ''
+        if node['tuple']:
+            target = f"{node['tuple'][0]} {node['tuple'][1]}"
+        label = f"{node['mode']} on {target}" if node['blocked_by'] else f"holding, {node['wait_event'] or 'idle'}"
+        color = Colors.RED if node['seconds'] > 5 else (Colors.YELLOW if node['seconds'] > 1 else Colors.NC)
+        print(f"{'  ' * depth}{'└─ ' if depth else ''}pid {pid} {node['application'] or ''} "
+              f"{color}{node['seconds']:.1f}s{Colors.NC} {label}")
+        if verbose and node['query']:
+            print(f"{'  ' * (depth + 2)}{node['query']}")
+        children = [child for child in node['waiters'] if child not in seen]
+        seen.update(children)
+        for child in children[:max_children]:
+            print_node(child, depth + 1, seen)
+        if len(children) > max_children:
+            print(f"{'  ' * (depth + 1)}└─ ... {len(children) - max_children} more")
+    
+    for pid in stats['roots'][:max_roots]:
+        print_node(pid, 0, {pid})
+    
+    hot_rows = [row for row in stats['hot_rows'] if row['waiters'] > 1]
+    if hot_rows:
+        print(f"{Colors.BOLD}Hot rows:{Colors.NC}")
+        for row in hot_rows[:5]:
+            print(f"  {row['relation']} {row['row_id'] or row['ctid']}: {row['waiters']} waiters, "
+                  f"longest {row['max_wait']:.1f}s {row['description'] or ''}")
+
+def print_monitor_overhead(stats, verbose=False, history=None):
+    """Print what the monitor itself costs the database, and any load-budget backoff"""
+    stretched = {name: cost for name, cost in stats['collectors'].items()
+                 if cost['effective_interval'] > cost['interval'] * 1.01}
+    if not verbose and not stretched:
+        return
+    
+    print(f"\n{Colors.BOLD}{Colors.CYAN}🩺 Monitor Overhead{Colors.NC}")
+    if stats['load'] is not None:
+        color = Colors.YELLOW if stretched else Colors.GREEN
+        print(f"Load: {color}{stats['load'] * 100:.2f}%{Colors.NC} of a backend (budget {stats['allowed'] * 100:.2f}%), "
+              f"DB pressure {stats['pressure']:.2f}"
+              f"{format_trend(history, 'monitor.load', fmt=lambda value: f'{value * 100:.2f}%')}")
+    for name, cost in stretched.items():
+        print(f"{Colors.YELLOW}Backing off {name}: every {cost['effective_interval']:.0f}s instead of {cost['interval']:g}s{Colors.NC}")
+    if not verbose:
+        return
+    
+    print(f"{'Collector':<12} {'Runs':<7} {'Avg Wall':<10} {'Stmts':<8} {'Rows/run':<10} {'Bytes/run':<10} {'Timeout':<8} {'Every':<8}")
+    print("-" * 80)
+    for name, cost in stats['collectors'].items():
+        avg_wall = format_duration(cost['avg_wall'] * 1000) if cost['avg_wall'] is not None else "-"
+        print(f"{name:<12} {cost['runs']:<7} {avg_wall:<10} {cost['statements']:<8} {cost['last_rows']:<10} "
+              f"{format_bytes(cost['last_bytes']):<10} {cost['timeout']:<8g} {cost['effective_interval']:<8.1f}")
+
+def print_replication(stats, history=None):
+    """Print replica lag (on a replica) or per-replica lag (on a primary)"""
+    if stats['is_replica']:
+        lag = stats['replay_lag']
+        color = Colors.RED if lag is not None and lag > 30 else (Colors.YELLOW if lag is not None and lag > 5 else Colors.GREEN)
+        lag_str = f"{lag:.1f}s" if lag is not None else "N/A"
+        print(f"Replica replay lag: {color}{lag_str}{Colors.NC} ({format_bytes(stats['replay_bytes'] or 0)} pending)"
+              f"{format_trend(history, 'replication.replay_lag', fmt=lambda value: f'{value:.1f}s')}")
+        return
+    for replica in stats['replicas']:
+        lag = replica['replay_lag'] or 0
+        color = Colors.RED if lag > 30 else (Colors.YELLOW if lag > 5 else Colors.GREEN)
+        trend = format_trend(history, f"replication.{replica['replica']}.replay_lag", fmt=lambda value: f'{value:.1f}s')
+        print(f"Replica {replica['replica']} ({replica['state']}, {replica['sync_state']}): "
+              f"{color}{lag:.1f}s{Colors.NC} replay lag, {format_bytes(replica['lag_bytes'] or 0)} behind"
+              f"{trend}")
+
+def print_system_health(stats, db_stats=None, history=None):
     """Print system health metrics"""
     print(f"\n{Colors.BOLD}{Colors.CYAN}🔧 System Health{Colors.NC}")
     
@@ -396,90 +3636,193 @@ def print_system_health(stats):
     active_connections = next((conn[1] for conn in stats['connections'] if conn[0] == 'active'), 0)
     
     conn_color = Colors.RED if total_connections > 200 else (Colors.YELLOW if total_connections > 100 else Colors.GREEN)
-    print(f"Total connections: {conn_color}{total_connections}{Colors.NC}")
-    print(f"Active connections: {active_connections}")
+    print(f"Total connections: {conn_color}{total_connections}{Colors.NC}"
+          f"{format_trend(history, 'connections.total', fmt=lambda value: f'{value:.0f}')}")
+    print(f"Active connections: {active_connections}"
+          f"{format_trend(history, 'connections.active', fmt=lambda value: f'{value:.0f}')}")
     
     # Lock waits
     if stats['locks']:
         total_locks = sum(lock[1] for lock in stats['locks'])
         if total_locks > 0:
-            print(f"{Colors.RED}Lock waits: {total_locks}{Colors.NC}")
+            print(f"{Colors.RED}Lock waits: {total_locks}{Colors.NC}"
+                  f"{format_trend(history, 'locks.waiting', fmt=lambda value: f'{value:.0f}')}")
     else:
         print(f"{Colors.GREEN}No lock waits{Colors.NC}")
     
     # Database stats
-    db_size, cache_hit_ratio = stats['database']
+    if db_stats is None:
+        return
+    db_size, cache_hit_ratio, _ = db_stats['database']
     cache_color = Colors.RED if cache_hit_ratio < 90 else (Colors.YELLOW if cache_hit_ratio < 95 else Colors.GREEN)
     
     print(f"Database size: {db_size}")
-    print(f"Cache hit ratio: {cache_color}{cache_hit_ratio:.1f}%{Colors.NC}")
+    print(f"Cache hit ratio: {cache_color}{cache_hit_ratio:.1f}%{Colors.NC}"
+          f"{format_trend(history, 'database.cache_hit_ratio', fmt=lambda value: f'{value:.1f}%')}")
 
 def main():
     parser = argparse.ArgumentParser(description='Monitor Art Battle user experience metrics')
     parser.add_argument('--verbose', action='store_true', help='Show detailed output')
-    parser.add_argument('--interval', type=int, default=30, help='Check interval in seconds')
+    parser.add_argument('--interval', type=int, default=30, help='Report interval in seconds')
     parser.add_argument('--alert-threshold', type=int, default=5000, 
                        help='Alert threshold for query time in milliseconds')
+    parser.add_argument('--alert-rules', metavar='FILE',
+                       help='Alert rules and sinks (JSON, see scripts/monitor_alerts.py); replaces the built-in rules')
     parser.add_argument('--once', action='store_true', help='Run once and exit')
+    parser.add_argument('--cadence', action='append', metavar='NAME=SECONDS',
+                       help=f"Override a collector's sampling interval ({', '.join(COLLECTOR_DEFAULTS)}); repeatable")
+    parser.add_argument('--timeout', action='append', metavar='NAME=SECONDS',
+                       help="Override a collector's statement_timeout; repeatable")
+    parser.add_argument('--load-budget', type=float, default=0.05,
+                       help='Backend-seconds per second the monitor may use before backing off (default: 0.05)')
+    parser.add_argument('--max-active', type=int, default=50,
+                       help='Active connections at which the database counts as under pressure (default: 50)')
+    parser.add_argument('--max-lock-waits', type=int, default=5,
+                       help='Lock waits at which the database counts as under pressure (default: 5)')
+    parser.add_argument('--pool-size', type=int, default=3, help='Database connections shared by collectors')
+    parser.add_argument('--history-seconds', type=int, default=7200,
+                       help='Samples kept per metric for trends (default: 7200, i.e. 2h at 1s)')
+    parser.add_argument('--event', metavar='EID', help='Sample votes/bids per round and artwork for one event (e.g. AB3001)')
+    parser.add_argument('--live', action='store_true',
+                       help='Sample votes/bids per round and artwork for every currently active event')
+    parser.add_argument('--ash', action='store_true',
+                       help='Sample every active backend at 10 Hz (wait event, query id, application)')
+    parser.add_argument('--ash-window', type=int, default=60, metavar='SECONDS',
+                       help='Window for active-session breakdowns (default: 60)')
+    parser.add_argument('--plan-ratio', type=float, metavar='RATIO',
+                       help='Capture a generic plan (PREPARE + EXPLAIN) when a query\'s interval mean exceeds this multiple '
+                            'of its baseline, e.g. 3; off unless given')
+    parser.add_argument('--plan-cache', metavar='FILE', help='Persist captured plans (JSON) across runs')
+    parser.add_argument('--record', metavar='FILE',
+                       help='Append every collected snapshot to FILE (gzip JSON lines, FILE.idx index)')
+    parser.add_argument('--replay', metavar='FILE', help='Render reports from a recording instead of the database')
+    parser.add_argument('--speed', type=float, default=0,
+                       help='Replay speed as a multiple of real time (default: 0, as fast as possible)')
+    parser.add_argument('--from', dest='replay_from', metavar='TIME', help='Replay from an ISO timestamp or HH:MM[:SS]')
+    parser.add_argument('--until', dest='replay_until', metavar='TIME', help='Stop replaying at an ISO timestamp or HH:MM[:SS]')
+    parser.add_argument('--targets', metavar='FILE',
+                       help='Monitor every database in a targets file (JSON, see scripts/monitor_targets.py) concurrently')
+    parser.add_argument('--target', action='append', metavar='NAME',
+                       help='Only monitor (or replay) the named target; repeatable')
+    parser.add_argument('--tui', action='store_true',
+                       help='Full-screen dashboard with sortable panes and drill-down instead of scrolling reports')
+    parser.add_argument('--edge-logs', action='append', metavar='PATH',
+                       help='Ingest edge function logs from JSON-lines files (glob patterns, .gz exports); repeatable')
+    parser.add_argument('--edge-window', type=int, default=60, metavar='SECONDS',
+                       help='Window for edge function rates and percentiles (default: 60)')
+    parser.add_argument('--edge-from-start', action='store_true',
+                       help='Read existing edge log contents instead of only following new lines')
+    parser.add_argument('--serve', type=parse_listen_address, metavar='[HOST]:PORT',
+                       help='Expose collected values as Prometheus metrics at http://HOST:PORT/metrics')
     
     args = parser.parse_args()
     
-    # Test database connection
+    try:
+        cadences = parse_cadences(args.cadence)
+        timeouts = parse_cadences(args.timeout, '--timeout')
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    
+    try:
+        rules, sinks = load_alert_config(args.alert_rules) if args.alert_rules else (default_alert_rules(args.alert_threshold), {})
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"Invalid --alert-rules: {e}")
+    
+    def make_target(name, role=None):
+        alerts = AlertEngine(rules, sinks, labels={'target': name} if name else None)
+        history = MetricHistory(capacity=args.history_seconds)
+        history.listeners.append(alerts.observe)
+        return TargetMonitor(name, role, history, alerts)
+    
+    if args.tui and (args.once or args.replay):
+        parser.error("--tui cannot be combined with --once or --replay")
+    
+    if args.replay:
+        if args.serve or args.record:
+            parser.error("--replay cannot be combined with --serve or --record")
+        try:
+            replay_recording(args, make_target)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        except KeyboardInterrupt:
+            print(f"\n{Colors.BOLD}Replay stopped by user{Colors.NC}")
+        return
+    
+    try:
+        targets = select_targets(load_targets(args.targets), args.target) if args.targets else [None]
+    except (OSError, ValueError) as e:
+        parser.error(f"Invalid --targets: {e}")
+    
+    recorder = SnapshotRecorder(args.record) if args.record else None
+    monitors = []
+    for index, target in enumerate(targets):
+        name = target['name'] if target else None
+        monitor = make_target(name, target['role'] if target else 'primary')
+        monitor.pool = MonitorPool(maxconn=args.pool_size, connect=target['connect'] if target else None)
+        query_tracker = StatsDeltaTracker(
+            ('userid', 'dbid', 'queryid'),
+            ('calls', 'total_exec_time', 'rows', 'shared_blks_hit', 'shared_blks_read'))
+        function_tracker = StatsDeltaTracker(('funcid',), ('calls', 'total_time', 'self_time'))
+        live_tracker = LiveEventTracker(eid=args.event) if (args.event or args.live) else None
+        ash = ActiveSessionHistory() if args.ash else None
+        plan_cache = f"{args.plan_cache}.{name}" if args.plan_cache and name else args.plan_cache
+        plan_detector = PlanRegressionDetector(ratio=args.plan_ratio, cache_file=plan_cache) if args.plan_ratio else None
+        collectors = build_collectors(query_tracker, function_tracker, build_latency_trackers(), cadences, live_tracker, ash,
+                                      QueryClassifier(), plan_detector, timeouts, DASHBOARD_ROWS if args.tui else 0,
+                                      TableHealthAdvisor(),
+                                      # Edge logs belong to the project, not a database: ingest them once
+                                      EdgeLogCollector(args.edge_logs, args.edge_window, args.edge_from_start or args.once,
+                                                       classify_query, current_time)
+                                      if args.edge_logs and index == 0 else None)
+        governor = LoadGovernor(args.load_budget, args.max_active, args.max_lock_waits)
+        monitor.scheduler = CollectorScheduler(monitor.pool, collectors, args.pool_size, monitor.history,
+                                               recorder, governor, target=name)
+        monitor.snapshot, monitor.errors = monitor.scheduler.snapshot, monitor.scheduler.errors
+        monitors.append(monitor)
+    
+    # Test database connections; with a targets file an unreachable target is
+    # retried in the background instead of stopping the others
     print("Testing database connection...")
-    conn = get_db_connection()
-    if not conn:
-        print("Failed to connect to database. Exiting.")
-        sys.exit(1)
-    conn.close()
-    print("Database connection successful.")
+    for monitor in monitors:
+        conn = get_db_connection(monitor.pool.connect)
+        if conn:
+            monitor.pool.add(conn)
+            print(f"Database connection successful{f' ({monitor.name})' if monitor.name else ''}.")
+        elif monitor.name:
+            print(f"{Colors.YELLOW}Target {monitor.name} unreachable; will keep retrying.{Colors.NC}")
+        else:
+            print("Failed to connect to database. Exiting.")
+            sys.exit(1)
     
-    if not args.once:
+    if not args.once and not args.tui:
         print_header(args.interval)
     
+    async def run_monitor(render=lambda: render_targets(monitors, args), wait=None):
+        if not args.serve:
+            await run_targets(monitors, render, args.interval, once=args.once, wait=wait)
+            return
+        host, port = args.serve
+        server = await asyncio.start_server(MetricsExporter(monitors).handle, host, port)
+        print(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+        async with server:
+            await run_targets(monitors, render, args.interval, once=args.once, wait=wait)
+    
     try:
-        while True:
-            conn = get_db_connection()
-            if not conn:
-                print(f"{Colors.RED}Lost database connection. Retrying...{Colors.NC}")
-                time.sleep(5)
-                continue
-            
-            try:
-                # Collect all metrics
-                query_stats = get_query_performance_stats(conn)
-                function_stats = get_function_performance_stats(conn)
-                table_stats = get_table_performance_stats(conn)
-                connection_stats = get_connection_and_lock_stats(conn)
-                ux_stats = get_user_experience_metrics(conn)
-                
-                # Print results
-                if not args.once:
-                    print(f"\n{Colors.BOLD}📍 {datetime.now().strftime('%H:%M:%S')} - Performance Check{Colors.NC}")
-                
-                print_query_performance(query_stats, args.verbose)
-                print_function_performance(function_stats, args.verbose)
-                print_table_performance(table_stats, args.verbose)
-                print_user_experience_metrics(ux_stats)
-                print_system_health(connection_stats)
-                
-                # Check for alerts
-                slow_queries = [q for q in query_stats['slow_queries'] if q[3] > args.alert_threshold]
-                if slow_queries:
-                    print(f"\n{Colors.RED}🚨 ALERT: {len(slow_queries)} queries exceeding {args.alert_threshold}ms threshold{Colors.NC}")
-                
-            except Exception as e:
-                print(f"{Colors.RED}Error collecting metrics: {e}{Colors.NC}")
-            finally:
-                conn.close()
-            
-            if args.once:
-                break
-                
-            time.sleep(args.interval)
-            
+        if args.tui:
+            # Anything printed while the dashboard owns the terminal goes to its message line
+            log = DashboardLog()
+            with Dashboard(monitors, log, args) as dashboard, redirect_stdout(log):
+                asyncio.run(run_monitor(dashboard.render, dashboard.wait))
+        else:
+            asyncio.run(run_monitor())
     except KeyboardInterrupt:
         print(f"\n{Colors.BOLD}Monitoring stopped by user{Colors.NC}")
         sys.exit(0)
+    finally:
+        for monitor in monitors:
+            monitor.pool.closeall()
+        if recorder is not None:
+            recorder.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
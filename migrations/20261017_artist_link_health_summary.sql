@@ -0,0 +1,215 @@
+-- Artist Profile Link Health - Maintained Summary Table (optional)
+-- Date: October 17, 2026
+-- Purpose: Keep per-table, per-day total/linked/broken counters for
+--          artist_applications, artist_invitations and artist_confirmations so
+--          `monitor_artist_profile_links.py --summary-table` reads a few hundred
+--          small rows instead of aggregating the source tables on every poll.
+--
+-- INSERT and DELETE are counted by statement-level triggers using transition
+-- tables, so a multi-row statement costs one upsert per affected day. UPDATE
+-- is counted by a row-level trigger limited to the link and date columns
+-- (UPDATE OF ... WHEN ...): updates that do not change whether a row is
+-- linked, or which day it falls on, never fire it. Transition tables cannot be
+-- combined with a column list, so the guard needs a row-level trigger; the
+-- price is one upsert per relinked row, e.g. per row repaired by `--fix`.
+--
+-- Contention trade-off: each upsert locks one (table, day) counter row until
+-- the writing transaction commits. Concurrent transactions inserting rows for
+-- the same day therefore serialize on today's counter row for the remainder of
+-- their transaction. That is cheap for the short single-row inserts these
+-- tables see; long transactions that write many rows should commit in batches
+-- (as --fix does). Drop the triggers if that is not acceptable, and use the
+-- batched or --incremental monitor modes instead.
+--
+-- Run `SELECT * FROM reconcile_artist_link_health('<table>')` once per source
+-- table, each in its own transaction (the monitor's --reconcile-summary does
+-- this), after applying this migration to seed the counters.
+
+CREATE TABLE IF NOT EXISTS artist_link_health (
+    table_name TEXT NOT NULL,
+    record_date DATE NOT NULL,          -- '-infinity' holds rows with no date
+    total_records BIGINT NOT NULL DEFAULT 0,
+    linked_records BIGINT NOT NULL DEFAULT 0,
+    broken_records BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (table_name, record_date)
+);
+
+COMMENT ON TABLE artist_link_health IS 'Per-table, per-day artist_profile_id link counters maintained by triggers';
+
+-- Apply the net change of one INSERT or DELETE statement to the counters.
+-- TG_ARGV[0] is the date column of the source table (applied_at / created_at).
+CREATE OR REPLACE FUNCTION update_artist_link_health()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    date_column TEXT := TG_ARGV[0];
+    delta_sql TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta_sql := format(
+            'SELECT COALESCE(%1$I::date, ''-infinity''::date) AS record_date, 1 AS total, (artist_profile_id IS NOT NULL)::int AS linked FROM new_rows',
+            date_column);
+    ELSE
+        delta_sql := format(
+            'SELECT COALESCE(%1$I::date, ''-infinity''::date) AS record_date, -1 AS total, -(artist_profile_id IS NOT NULL)::int AS linked FROM old_rows',
+            date_column);
+    END IF;
+
+    -- Days are upserted in a fixed order so concurrent statements cannot deadlock
+    EXECUTE format(
+        'INSERT INTO artist_link_health (table_name, record_date, total_records, linked_records, broken_records, updated_at)
+         SELECT %1$L, record_date, SUM(total), SUM(linked), SUM(total) - SUM(linked), NOW()
+         FROM (%2$s) delta
+         GROUP BY record_date
+         HAVING SUM(total) <> 0 OR SUM(linked) <> 0
+         ORDER BY record_date
+         ON CONFLICT (table_name, record_date) DO UPDATE
+         SET total_records = artist_link_health.total_records + EXCLUDED.total_records,
+             linked_records = artist_link_health.linked_records + EXCLUDED.linked_records,
+             broken_records = artist_link_health.broken_records + EXCLUDED.broken_records,
+             updated_at = NOW()',
+        TG_TABLE_NAME, delta_sql);
+
+    RETURN NULL;
+END;
+$$;
+
+-- Apply one updated row's change to the counters. Only called for rows whose
+-- linked state or record day changed (see the WHEN guard on the triggers).
+-- TG_ARGV[0] is the date column of the source table.
+CREATE OR REPLACE FUNCTION update_artist_link_health_row()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    date_column TEXT := TG_ARGV[0];
+    old_date DATE := COALESCE((to_jsonb(OLD) ->> date_column)::timestamptz::date, '-infinity'::date);
+    new_date DATE := COALESCE((to_jsonb(NEW) ->> date_column)::timestamptz::date, '-infinity'::date);
+BEGIN
+    -- Days are upserted in a fixed order so concurrent statements cannot deadlock
+    INSERT INTO artist_link_health (table_name, record_date, total_records, linked_records, broken_records, updated_at)
+    SELECT TG_TABLE_NAME, delta.record_date, SUM(delta.total), SUM(delta.linked), SUM(delta.total) - SUM(delta.linked), NOW()
+    FROM (VALUES
+        (old_date, -1, -(OLD.artist_profile_id IS NOT NULL)::int),
+        (new_date, 1, (NEW.artist_profile_id IS NOT NULL)::int)
+    ) AS delta(record_date, total, linked)
+    GROUP BY delta.record_date
+    HAVING SUM(delta.total) <> 0 OR SUM(delta.linked) <> 0
+    ORDER BY delta.record_date
+    ON CONFLICT (table_name, record_date) DO UPDATE
+    SET total_records = artist_link_health.total_records + EXCLUDED.total_records,
+        linked_records = artist_link_health.linked_records + EXCLUDED.linked_records,
+        broken_records = artist_link_health.broken_records + EXCLUDED.broken_records,
+        updated_at = NOW();
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS artist_applications_link_health_insert ON artist_applications;
+CREATE TRIGGER artist_applications_link_health_insert
+    AFTER INSERT ON artist_applications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('applied_at');
+
+DROP TRIGGER IF EXISTS artist_applications_link_health_update ON artist_applications;
+CREATE TRIGGER artist_applications_link_health_update
+    AFTER UPDATE OF artist_profile_id, applied_at ON artist_applications
+    FOR EACH ROW
+    WHEN ((OLD.artist_profile_id IS NULL) IS DISTINCT FROM (NEW.artist_profile_id IS NULL)
+          OR OLD.applied_at::date IS DISTINCT FROM NEW.applied_at::date)
+    EXECUTE FUNCTION update_artist_link_health_row('applied_at');
+
+DROP TRIGGER IF EXISTS artist_applications_link_health_delete ON artist_applications;
+CREATE TRIGGER artist_applications_link_health_delete
+    AFTER DELETE ON artist_applications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('applied_at');
+
+DROP TRIGGER IF EXISTS artist_invitations_link_health_insert ON artist_invitations;
+CREATE TRIGGER artist_invitations_link_health_insert
+    AFTER INSERT ON artist_invitations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('created_at');
+
+DROP TRIGGER IF EXISTS artist_invitations_link_health_update ON artist_invitations;
+CREATE TRIGGER artist_invitations_link_health_update
+    AFTER UPDATE OF artist_profile_id, created_at ON artist_invitations
+    FOR EACH ROW
+    WHEN ((OLD.artist_profile_id IS NULL) IS DISTINCT FROM (NEW.artist_profile_id IS NULL)
+          OR OLD.created_at::date IS DISTINCT FROM NEW.created_at::date)
+    EXECUTE FUNCTION update_artist_link_health_row('created_at');
+
+DROP TRIGGER IF EXISTS artist_invitations_link_health_delete ON artist_invitations;
+CREATE TRIGGER artist_invitations_link_health_delete
+    AFTER DELETE ON artist_invitations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('created_at');
+
+DROP TRIGGER IF EXISTS artist_confirmations_link_health_insert ON artist_confirmations;
+CREATE TRIGGER artist_confirmations_link_health_insert
+    AFTER INSERT ON artist_confirmations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('created_at');
+
+DROP TRIGGER IF EXISTS artist_confirmations_link_health_update ON artist_confirmations;
+CREATE TRIGGER artist_confirmations_link_health_update
+    AFTER UPDATE OF artist_profile_id, created_at ON artist_confirmations
+    FOR EACH ROW
+    WHEN ((OLD.artist_profile_id IS NULL) IS DISTINCT FROM (NEW.artist_profile_id IS NULL)
+          OR OLD.created_at::date IS DISTINCT FROM NEW.created_at::date)
+    EXECUTE FUNCTION update_artist_link_health_row('created_at');
+
+DROP TRIGGER IF EXISTS artist_confirmations_link_health_delete ON artist_confirmations;
+CREATE TRIGGER artist_confirmations_link_health_delete
+    AFTER DELETE ON artist_confirmations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_artist_link_health('created_at');
+
+-- Rebuild one source table's counters from scratch. The table is locked
+-- against writes (SHARE mode) so the rebuilt counts and later trigger deltas
+-- line up; the lock lasts until the caller's transaction ends, so call this
+-- once per table, each in its own transaction, to block writers for one
+-- table's scan at a time rather than all three.
+DROP FUNCTION IF EXISTS reconcile_artist_link_health();
+
+CREATE OR REPLACE FUNCTION reconcile_artist_link_health(source_table TEXT)
+RETURNS TABLE(table_name TEXT, days INTEGER, total_records BIGINT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    date_column TEXT;
+BEGIN
+    date_column := CASE source_table
+        WHEN 'artist_applications' THEN 'applied_at'
+        WHEN 'artist_invitations' THEN 'created_at'
+        WHEN 'artist_confirmations' THEN 'created_at'
+    END;
+    IF date_column IS NULL THEN
+        RAISE EXCEPTION 'artist_link_health does not track %', source_table;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN SHARE MODE', source_table);
+
+    DELETE FROM artist_link_health alh WHERE alh.table_name = source_table;
+
+    EXECUTE format(
+        'INSERT INTO artist_link_health (table_name, record_date, total_records, linked_records, broken_records, updated_at)
+         SELECT %1$L,
+                COALESCE(%2$I::date, ''-infinity''::date),
+                COUNT(*),
+                COUNT(*) FILTER (WHERE artist_profile_id IS NOT NULL),
+                COUNT(*) FILTER (WHERE artist_profile_id IS NULL),
+                NOW()
+         FROM %1$I
+         GROUP BY 2',
+        source_table, date_column);
+
+    RETURN QUERY
+    SELECT source_table, COUNT(*)::int, COALESCE(SUM(alh.total_records), 0)::bigint
+    FROM artist_link_health alh
+    WHERE alh.table_name = source_table;
+END;
+$$;
@@ -0,0 +1,31 @@
+-- Artist Profile Link Resolver - Supporting Indexes
+-- Date: October 17, 2026
+-- Purpose: Let the fixability resolver in scripts/monitor_artist_profile_links.py
+--          look up artist_profiles by artist_number with index scans instead of
+--          a nested loop over every profile for every broken row.
+
+-- artist_number is TEXT while entry_id / form_17_entry_id are INTEGER, so the
+-- resolver compares on the text cast. Expression indexes make each of the two
+-- split lookups (entry_id, form_17_entry_id) indexable.
+CREATE INDEX IF NOT EXISTS idx_artist_profiles_entry_id_text
+    ON artist_profiles ((entry_id::text));
+
+CREATE INDEX IF NOT EXISTS idx_artist_profiles_form_17_entry_id_text
+    ON artist_profiles ((form_17_entry_id::text));
+
+-- Broken rows are a small fraction of each table; partial indexes keep the
+-- "artist_profile_id IS NULL" side of the lookup proportional to broken rows.
+CREATE INDEX IF NOT EXISTS idx_artist_applications_broken_profile_link
+    ON artist_applications (artist_number)
+    WHERE artist_profile_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_artist_invitations_broken_profile_link
+    ON artist_invitations (artist_number)
+    WHERE artist_profile_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_artist_confirmations_broken_profile_link
+    ON artist_confirmations (artist_number)
+    WHERE artist_profile_id IS NULL;
+
+COMMENT ON INDEX idx_artist_profiles_entry_id_text IS 'Supports artist_number -> artist_profiles lookups on entry_id::text';
+COMMENT ON INDEX idx_artist_profiles_form_17_entry_id_text IS 'Supports artist_number -> artist_profiles lookups on form_17_entry_id::text';
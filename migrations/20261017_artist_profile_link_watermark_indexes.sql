@@ -0,0 +1,20 @@
+-- Artist Profile Link Monitor - Watermark Indexes
+-- Date: October 17, 2026
+-- Purpose: Keep `monitor_artist_profile_links.py --incremental` runs proportional to
+--          the rows created/updated since the last checkpoint, not table size.
+
+-- artist_applications already has idx_artist_applications_applied_at
+CREATE INDEX IF NOT EXISTS idx_artist_applications_updated_at
+    ON artist_applications (updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_artist_invitations_created_at
+    ON artist_invitations (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_artist_invitations_updated_at
+    ON artist_invitations (updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_artist_confirmations_created_at
+    ON artist_confirmations (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_artist_confirmations_updated_at
+    ON artist_confirmations (updated_at);
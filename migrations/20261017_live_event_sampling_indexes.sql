@@ -0,0 +1,14 @@
+-- Live Event Sampling - Supporting Indexes
+-- Date: October 17, 2026
+-- Purpose: Let `monitor-user-experience.py --event/--live` read only the votes
+--          and bids created since its last sample for the cached art ids,
+--          instead of scanning every vote/bid for the event each second.
+
+CREATE INDEX IF NOT EXISTS idx_votes_art_id_created_at
+    ON votes (art_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_bids_art_id_created_at
+    ON bids (art_id, created_at);
+
+COMMENT ON INDEX idx_votes_art_id_created_at IS 'Supports per-artwork keyset windows over recent votes';
+COMMENT ON INDEX idx_bids_art_id_created_at IS 'Supports per-artwork keyset windows over recent bids';
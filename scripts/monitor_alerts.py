@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Monitor Alert Rules
+
+Declarative alert rules shared by scripts/monitor_artist_profile_links.py and
+art-battle-broadcast/scripts/monitor-user-experience.py. Both monitors feed
+their metric series into an AlertEngine, which evaluates the rules
+incrementally and sends firing/resolved notifications to pluggable sinks.
+
+Rules file (JSON):
+
+  {
+    "sinks": {
+      "console": {"type": "stdout"},
+      "log": {"type": "file", "path": "/var/log/ab-alerts.jsonl"},
+      "ops": {"type": "webhook", "url": "https://hooks.example.com/alerts"}
+    },
+    "rules": [
+      {"name": "vote-path-slow", "metric": "category.vote path.mean",
+       "op": ">", "threshold": 500, "clear": 300, "function": "avg", "window": 60,
+       "for": 30, "cooldown": 600, "severity": "critical", "sinks": ["console", "ops"]},
+      {"name": "slow-statement", "match": "query.*.mean", "op": ">", "threshold": 5000},
+      {"name": "link-health", "match": "links.*.linked_pct", "op": "<", "threshold": 95, "clear": 96}
+    ]
+  }
+
+Rule fields:
+  metric / match   exact series name, or an fnmatch glob (one alert per series)
+  op, threshold    condition that starts the alert: >, >=, < or <=
+  clear            hysteresis: the alert resolves only once the condition no
+                   longer holds against this value (default: threshold)
+  function         value (default), avg, min, max over `window` seconds;
+                   rate (per second, for counters) or delta over `window`
+  for              seconds the condition must hold before firing
+  cooldown         minimum seconds between notifications for one series
+  severity, sinks  label passed to sinks; sink names (default: every sink)
+"""
+
+import json
+import os
+import sys
+import threading
+import urllib.request
+from collections import deque
+from datetime import datetime
+from fnmatch import fnmatchcase
+
+OPERATORS = {
+    '>': lambda value, limit: value > limit,
+    '>=': lambda value, limit: value >= limit,
+    '<': lambda value, limit: value < limit,
+    '<=': lambda value, limit: value <= limit,
+}
+
+FUNCTIONS = ('value', 'avg', 'min', 'max', 'rate', 'delta')
+
+class AlertRule:
+    """One alert rule, validated from its config dict"""
+    def __init__(self, config):
+        self.name = config['name']
+        self.metric = config.get('metric')
+        self.match = config.get('match')
+        if bool(self.metric) == bool(self.match):
+            raise ValueError(f"Rule {self.name!r} needs exactly one of 'metric' or 'match'")
+        self.op = config.get('op', '>')
+        if self.op not in OPERATORS:
+            raise ValueError(f"Rule {self.name!r} has unknown op {self.op!r}")
+        self.threshold = float(config['threshold'])
+        self.clear = float(config.get('clear', self.threshold))
+        self.function = config.get('function', 'value')
+        if self.function not in FUNCTIONS:
+            raise ValueError(f"Rule {self.name!r} has unknown function {self.function!r}")
+        self.window = float(config.get('window', 60))
+        self.for_seconds = float(config.get('for', 0))
+        self.cooldown = float(config.get('cooldown', 0))
+        self.severity = config.get('severity', 'warning')
+        self.sinks = config.get('sinks')
+
+    def matches(self, series):
+        return series == self.metric if self.metric else fnmatchcase(series, self.match)
+
+class SeriesWindow:
+    """Sliding window over one series with O(1) amortized avg/min/max/rate.
+
+    For rate, each sample keeps its increase over the previous one, where a
+    drop is a counter reset and counts as an increase from zero (as
+    Prometheus rate() does); the window's increase is the sum of those steps
+    after its first sample.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.total = 0.0
+        self.increase = 0.0
+        self.minimums = deque()
+        self.maximums = deque()
+
+    def add(self, timestamp, value):
+        step = 0.0
+        if self.samples:
+            previous = self.samples[-1][1]
+            step = value - previous if value >= previous else value
+        self.samples.append((timestamp, value, step))
+        self.total += value
+        self.increase += step
+        while self.minimums and self.minimums[-1][1] >= value:
+            self.minimums.pop()
+        self.minimums.append((timestamp, value))
+        while self.maximums and self.maximums[-1][1] <= value:
+            self.maximums.pop()
+        self.maximums.append((timestamp, value))
+
+        cutoff = timestamp - self.seconds
+        while self.samples[0][0] < cutoff:
+            _, old, _ = self.samples.popleft()
+            self.total -= old
+            # The step into the new first sample now starts outside the window
+            self.increase -= self.samples[0][2]
+        while self.minimums[0][0] < cutoff:
+            self.minimums.popleft()
+        while self.maximums[0][0] < cutoff:
+            self.maximums.popleft()
+
+    def evaluate(self, function):
+        if function == 'avg':
+            return self.total / len(self.samples)
+        if function == 'min':
+            return self.minimums[0][1]
+        if function == 'max':
+            return self.maximums[0][1]
+        (first_t, first, _), (last_t, last, _) = self.samples[0], self.samples[-1]
+        if function == 'delta':
+            return last - first
+        # rate: per-second increase, summed across counter resets
+        if last_t <= first_t:
+            return None
+        return self.increase / (last_t - first_t)
+
+class StdoutSink:
+    def send(self, event):
+        icon = '🚨' if event['status'] == 'firing' else '✅'
+        labels = ''.join(f" {key}={value}" for key, value in event.get('labels', {}).items())
+        print(f"{icon} [{event['severity']}]{labels} {event['rule']} {event['status']}: {event['series']} = "
+              f"{event['value']:.2f} ({event['op']} {event['threshold']:g})")
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, event):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event) + '\n')
+
+class WebhookSink:
+    """POST each event as JSON from a background thread so a slow endpoint never stalls collection"""
+    def __init__(self, url, timeout=5, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def _post(self, event):
+        request = urllib.request.Request(self.url, data=json.dumps(event).encode(), method='POST',
+                                         headers={'Content-Type': 'application/json', **self.headers})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except Exception as e:
+            print(f"Alert webhook {self.url} failed: {e}", file=sys.stderr)
+
+    def send(self, event):
+        threading.Thread(target=self._post, args=(event,), daemon=True).start()
+
+def build_sink(config):
+    sink_type = config.get('type')
+    if sink_type == 'stdout':
+        return StdoutSink()
+    if sink_type == 'file':
+        return FileSink(config['path'])
+    if sink_type == 'webhook':
+        return WebhookSink(config['url'], config.get('timeout', 5), config.get('headers'))
+    raise ValueError(f"Unknown alert sink type {sink_type!r}")
+
+def load_alert_config(path):
+    """Read a rules file, returning (rules, sinks)"""
+    with open(path) as f:
+        config = json.load(f)
+    sinks = {name: build_sink(sink) for name, sink in config.get('sinks', {}).items()}
+    rules = [AlertRule(rule) for rule in config.get('rules', [])]
+    for rule in rules:
+        unknown = set(rule.sinks or []) - set(sinks)
+        if unknown:
+            raise ValueError(f"Rule {rule.name!r} references unknown sinks: {', '.join(sorted(unknown))}")
+    return rules, sinks
+
+class AlertEngine:
+    """Evaluate alert rules as series values arrive.
+
+    Rules are matched against each series name once and cached, so an
+    observation only touches the rules for its series. Per (rule, series)
+    state moves ok -> pending -> firing -> ok; firing waits for `for`
+    seconds, resolving waits for the `clear` hysteresis bound, and
+    notifications for one series are rate-limited by `cooldown`. With a
+    state_file the states survive between runs of one-shot monitors.
+    labels (e.g. {'target': 'production'}) are attached to every event.
+    """
+    def __init__(self, rules, sinks=None, state_file=None, max_routes=10000, labels=None):
+        self.rules = rules
+        self.labels = labels or {}
+        self.max_routes = max_routes
+        self.sinks = sinks or {}
+        self.state_file = state_file
+        self.routes = {}
+        self.windows = {}
+        self.states = {}
+        if state_file:
+            try:
+                with open(state_file) as f:
+                    self.states = {tuple(key.split('\t', 1)): state for key, state in json.load(f).items()}
+            except FileNotFoundError:
+                pass
+
+    def save_state(self):
+        if not self.state_file:
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'\t'.join(key): state for key, state in self.states.items()}, f)
+        os.replace(tmp_file, self.state_file)
+
+    def observe(self, series, value, timestamp):
+        if value is None:
+            return
+        rules = self.routes.get(series)
+        if rules is None:
+            if len(self.routes) >= self.max_routes:
+                self.routes.clear()
+            rules = self.routes[series] = [rule for rule in self.rules if rule.matches(series)]
+        for rule in rules:
+            key = (rule.name, series)
+            if rule.function != 'value':
+                window = self.windows.get(key)
+                if window is None:
+                    window = self.windows[key] = SeriesWindow(rule.window)
+                window.add(timestamp, value)
+                value = window.evaluate(rule.function)
+                if value is None:
+                    continue
+            self._transition(rule, key, value, timestamp)
+
+    def _transition(self, rule, key, value, timestamp):
+        state = self.states.setdefault(key, {'status': 'ok', 'since': None, 'notified_at': None, 'notified': False})
+        state['value'] = value
+        condition = OPERATORS[rule.op]
+
+        if state['status'] == 'firing':
+            if not condition(value, rule.clear):
+                state.update(status='ok', since=None)
+                if state['notified']:
+                    self._notify(rule, key, value, timestamp, 'resolved')
+                    state['notified'] = False
+            return
+
+        if not condition(value, rule.threshold):
+            state.update(status='ok', since=None)
+            return
+        if state['status'] == 'ok':
+            state.update(status='pending', since=timestamp)
+        if timestamp - state['since'] >= rule.for_seconds:
+            state['status'] = 'firing'
+            if state['notified_at'] is None or timestamp - state['notified_at'] >= rule.cooldown:
+                state.update(notified_at=timestamp, notified=True)
+                self._notify(rule, key, value, timestamp, 'firing')
+
+    def _notify(self, rule, key, value, timestamp, status):
+        event = {
+            'rule': rule.name, 'series': key[1], 'status': status, 'severity': rule.severity,
+            'value': value, 'op': rule.op, 'threshold': rule.threshold if status == 'firing' else rule.clear,
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+        }
+        if self.labels:
+            event['labels'] = self.labels
+        for name in (rule.sinks if rule.sinks is not None else self.sinks):
+            self.sinks[name].send(event)
+
+    def firing(self):
+        """Currently firing alerts as (rule, series, value), most severe first"""
+        rules = {rule.name: rule for rule in self.rules}
+        alerts = [(rules[name], series, state['value']) for (name, series), state in self.states.items()
+                  if state['status'] == 'firing' and name in rules]
+        return sorted(alerts, key=lambda alert: (alert[0].severity != 'critical', alert[0].name, alert[1]))
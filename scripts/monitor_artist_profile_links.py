@@ -9,14 +9,37 @@ Usage:
   python monitor_artist_profile_links.py                    # Full report
   python monitor_artist_profile_links.py --recent           # Recent records only
   python monitor_artist_profile_links.py --alert-threshold 5 # Alert if >5% broken
+  python monitor_artist_profile_links.py --per-table        # Legacy one-query-per-statement path
+  python monitor_artist_profile_links.py --resolver memory  # Resolve fixability from an in-memory entry_id map
+  python monitor_artist_profile_links.py --incremental      # Scan only rows changed since the last run
+  python monitor_artist_profile_links.py --fix --dry-run    # Preview the bulk link repair
+  python monitor_artist_profile_links.py --fix --rows-per-second 200  # Throttled bulk repair (resumable)
+  python monitor_artist_profile_links.py --export unfixable --output unfixable.csv.gz  # Stream rows for triage
+  python monitor_artist_profile_links.py --approximate      # Sampled full-history status, exact only near thresholds
+  python monitor_artist_profile_links.py --summary-table    # Read trigger-maintained counters (optional migration)
+  python monitor_artist_profile_links.py --reconcile-summary # Rebuild those counters from scratch
+  python monitor_artist_profile_links.py --alert-rules alerts.json --alert-state ~/.link_alerts.json  # Rule-based alerts
+  python monitor_artist_profile_links.py --targets targets.json --target staging  # Check databases from a targets file
 """
 
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
 import argparse
 import sys
+import os
+import time
+import json
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from statistics import NormalDist
 from datetime import datetime, timedelta
 
+from monitor_alerts import AlertEngine, AlertRule, load_alert_config
+from monitor_targets import load_targets, select_targets, target_from_config
+
 supabase_config = {
     'host': 'db.xsqdkubgyqwpyvfltnrf.supabase.co',
     'port': 5432,
@@ -25,7 +48,15 @@ supabase_config = {
     'database': 'postgres'
 }
 
-def get_table_health(cursor, table_name, days_back=None):
+HEALTH_TABLES = ['artist_applications', 'artist_invitations', 'artist_confirmations']
+
+DATE_FIELDS = {
+    'artist_applications': 'applied_at',
+    'artist_invitations': 'created_at',
+    'artist_confirmations': 'created_at'
+}
+
+def get_table_health(cursor, table_name, days_back=None, profile_index=None):
     """Get health statistics for a specific table"""
     
     date_filter = ""
@@ -43,7 +74,7 @@ def get_table_health(cursor, table_name, days_back=None):
         SELECT COUNT(*) as total_records,
                COUNT(CASE WHEN artist_profile_id IS NOT NULL THEN 1 END) as linked_records,
                COUNT(CASE WHEN artist_profile_id IS NULL THEN 1 END) as broken_records,
-               ROUND((COUNT(CASE WHEN artist_profile_id IS NOT NULL THEN 1 END)::numeric / COUNT(*)) * 100, 2) as linked_pct,
+               ROUND((COUNT(CASE WHEN artist_profile_id IS NOT NULL THEN 1 END)::numeric / NULLIF(COUNT(*), 0)) * 100, 2) as linked_pct,
                MIN({date_field}) as oldest_record,
                MAX({date_field}) as newest_record
         FROM {table_name}
@@ -53,19 +84,7 @@ def get_table_health(cursor, table_name, days_back=None):
     basic_stats = cursor.fetchone()
     
     # Get fixability statistics
-    date_filter_fixability = date_filter.replace(date_field, f't.{date_field}') if date_filter else ""
-    cursor.execute(f"""
-        SELECT COUNT(*) as broken_records,
-               COUNT(CASE WHEN ap.id IS NOT NULL THEN 1 END) as fixable_records,
-               ROUND((COUNT(CASE WHEN ap.id IS NOT NULL THEN 1 END)::numeric / NULLIF(COUNT(*), 0)) * 100, 2) as fixable_pct
-        FROM {table_name} t
-        LEFT JOIN artist_profiles ap ON ap.entry_id::text = t.artist_number 
-                                     OR ap.form_17_entry_id::text = t.artist_number
-        WHERE t.artist_profile_id IS NULL
-        {date_filter_fixability.replace('WHERE', 'AND') if date_filter_fixability else ''}
-    """)
-    
-    fixability_stats = cursor.fetchone()
+    fixability_stats = get_fixability_stats(cursor, table_name, days_back, profile_index)
     
     # Get daily breakdown for recent records
     cursor.execute(f"""
@@ -88,6 +107,101 @@ def get_table_health(cursor, table_name, days_back=None):
         'daily_breakdown': daily_breakdown
     }
 
+def build_resolver_sql(table_name, days_back=None, extra_filter=""):
+    """Build the indexable artist_number -> artist_profiles lookup for broken rows.
+
+    The original single join used `entry_id::text = artist_number OR
+    form_17_entry_id::text = artist_number`, which defeats every index. Here
+    each key gets its own join (backed by the expression indexes in
+    migrations/20261017_artist_profile_link_resolver_indexes.sql) and results
+    are deduped per record, preferring an entry_id match over form_17_entry_id.
+    """
+    date_field = DATE_FIELDS.get(table_name, 'created_at')
+    date_filter = f"AND t.{date_field} >= NOW() - INTERVAL '{days_back} days'" if days_back else ""
+
+    return f"""
+        SELECT DISTINCT ON (m.record_id) m.*
+        FROM (
+            SELECT t.id as record_id, ap.id as profile_id, 1 as match_rank
+            FROM {table_name} t
+            JOIN artist_profiles ap ON ap.entry_id::text = t.artist_number
+            WHERE t.artist_profile_id IS NULL
+            {date_filter}
+            {extra_filter}
+            UNION ALL
+            SELECT t.id as record_id, ap.id as profile_id, 2 as match_rank
+            FROM {table_name} t
+            JOIN artist_profiles ap ON ap.form_17_entry_id::text = t.artist_number
+            WHERE t.artist_profile_id IS NULL
+            {date_filter}
+            {extra_filter}
+        ) m
+        ORDER BY m.record_id, m.match_rank
+    """
+
+def load_profile_index(cursor):
+    """Load a compact artist_number -> artist_profile_id map for client-side resolution.
+
+    Keys are the text form of entry_id / form_17_entry_id so they compare exactly
+    like the SQL cast. entry_id matches are written last so they win ties.
+    """
+    cursor.execute("""
+        SELECT id, entry_id, form_17_entry_id
+        FROM artist_profiles
+        WHERE entry_id IS NOT NULL OR form_17_entry_id IS NOT NULL
+    """)
+    rows = cursor.fetchall()
+
+    profile_index = {}
+    for row in rows:
+        if row['form_17_entry_id'] is not None:
+            profile_index[str(row['form_17_entry_id'])] = str(row['id'])
+    for row in rows:
+        if row['entry_id'] is not None:
+            profile_index[str(row['entry_id'])] = str(row['id'])
+
+    return profile_index
+
+def get_fixability_stats(cursor, table_name, days_back=None, profile_index=None):
+    """Get broken/fixable counts for a table.
+
+    Both counts come from one server-side aggregate over the indexable EXISTS
+    probes (build_fixable_sql). With a profile_index only the distinct broken
+    artist_numbers are fetched, with their row counts, and matched in memory.
+    Resolved (record, profile) pairs are only fetched by --fix.
+    """
+    date_field = DATE_FIELDS.get(table_name, 'created_at')
+    date_filter = f"AND t.{date_field} >= NOW() - INTERVAL '{days_back} days'" if days_back else ""
+
+    if profile_index is None:
+        cursor.execute(f"""
+            SELECT COUNT(*) as broken_records,
+                   COUNT(*) FILTER (WHERE {build_fixable_sql('t')}) as fixable_records
+            FROM {table_name} t
+            WHERE t.artist_profile_id IS NULL
+            {date_filter}
+        """)
+        counts = cursor.fetchone()
+        broken_count = counts['broken_records']
+        fixable_count = counts['fixable_records']
+    else:
+        cursor.execute(f"""
+            SELECT t.artist_number, COUNT(*) as broken_records
+            FROM {table_name} t
+            WHERE t.artist_profile_id IS NULL
+            {date_filter}
+            GROUP BY t.artist_number
+        """)
+        numbers = cursor.fetchall()
+        broken_count = sum(row['broken_records'] for row in numbers)
+        fixable_count = sum(row['broken_records'] for row in numbers if profile_index.get(row['artist_number']))
+
+    return {
+        'broken_records': broken_count,
+        'fixable_records': fixable_count,
+        'fixable_pct': (Decimal(fixable_count * 100) / broken_count).quantize(Decimal('0.01')) if broken_count else None
+    }
+
 def check_recent_broken_records(cursor):
     """Check for any recently created records with broken links"""
     
@@ -118,18 +232,983 @@ def check_recent_broken_records(cursor):
     
     return recent_broken
 
-def print_health_report(table_stats, recent_broken, args):
+def build_fixable_sql(alias):
+    """Build a boolean expression that is true when a broken row of alias resolves to a profile.
+
+    Two EXISTS probes against the expression indexes used by
+    build_resolver_sql, so a row counts once however many profiles match it.
+    """
+    return f"""(EXISTS (SELECT 1 FROM artist_profiles ap WHERE ap.entry_id::text = {alias}.artist_number)
+                OR EXISTS (SELECT 1 FROM artist_profiles ap WHERE ap.form_17_entry_id::text = {alias}.artist_number))"""
+
+def json_timestamp(value):
+    """Rebuild a timestamp selected as to_jsonb(...).
+
+    A UNION ALL over applied_at (timestamptz) and created_at (timestamp)
+    would unify the column to timestamptz, printing the naive columns with a
+    session TimeZone offset; as jsonb each branch keeps its own type.
+    """
+    return datetime.fromisoformat(value) if value is not None else None
+
+def build_health_scan_sql(table_name, days_back=None, include_fixability=True, profile_index=None):
+    """Build a single-scan statement for one table.
+
+    GROUPING SETS ((), (record_date)) yields one summary row plus one row per
+    day of the 7-day breakdown; FILTER aggregates keep the scope and the daily
+    window apart within the same pass. Fixability is an index probe per broken
+    row of that pass; with a profile_index the summary row returns the broken
+    artist_numbers instead, for collect_health_batched() to match in memory.
+    The 24h broken sample is a separate top-5 lookup.
+    Timestamps are returned as jsonb (see json_timestamp).
+    """
+    date_field = DATE_FIELDS.get(table_name, 'created_at')
+
+    if days_back:
+        in_scope = f"{date_field} >= NOW() - INTERVAL '{days_back} days'"
+        # The daily breakdown and 24h sample always look back at least 7 days
+        scan_filter = f"WHERE {date_field} >= NOW() - INTERVAL '{max(days_back, 7)} days'"
+    else:
+        in_scope = "TRUE"
+        scan_filter = ""
+
+    fixable_column = "NULL::boolean"
+    fixable_records = "NULL::bigint"
+    broken_numbers = "NULL::text[]"
+    if include_fixability and profile_index is None:
+        fixable_column = f"CASE WHEN artist_profile_id IS NULL AND ({in_scope}) THEN {build_fixable_sql(table_name)} END"
+        fixable_records = "COUNT(*) FILTER (WHERE in_scope AND fixable)"
+    elif include_fixability:
+        broken_numbers = ("CASE WHEN GROUPING(record_date) = 1 "
+                          "THEN array_agg(artist_number) FILTER (WHERE in_scope AND NOT linked) END")
+
+    return f"""
+        SELECT s.*,
+               CASE WHEN NOT s.is_daily THEN (
+                   SELECT jsonb_agg(jsonb_build_object('id', r.id,
+                                                       'artist_number', r.artist_number,
+                                                       'event_eid', r.event_eid,
+                                                       'record_date', r.record_ts)
+                                    ORDER BY r.record_ts DESC)
+                   FROM (
+                       SELECT id, artist_number, event_eid, {date_field} as record_ts
+                       FROM {table_name}
+                       WHERE artist_profile_id IS NULL
+                       AND {date_field} >= NOW() - INTERVAL '24 hours'
+                       ORDER BY {date_field} DESC
+                       LIMIT 5
+                   ) r
+               ) END as recent_broken
+        FROM (
+            SELECT '{table_name}'::text as table_name,
+                   GROUPING(record_date) = 0 as is_daily,
+                   record_date,
+                   COUNT(*) FILTER (WHERE in_scope) as total_records,
+                   COUNT(*) FILTER (WHERE in_scope AND linked) as linked_records,
+                   COUNT(*) FILTER (WHERE in_scope AND NOT linked) as broken_records,
+                   ROUND((COUNT(*) FILTER (WHERE in_scope AND linked))::numeric
+                         / NULLIF(COUNT(*) FILTER (WHERE in_scope), 0) * 100, 2) as linked_pct,
+                   to_jsonb(MIN(record_ts) FILTER (WHERE in_scope)) as oldest_record,
+                   to_jsonb(MAX(record_ts) FILTER (WHERE in_scope)) as newest_record,
+                   COUNT(*) as daily_total,
+                   COUNT(*) FILTER (WHERE linked) as daily_linked,
+                   COUNT(*) FILTER (WHERE NOT linked) as daily_broken,
+                   {fixable_records} as fixable_records,
+                   {broken_numbers} as broken_numbers
+            FROM (
+                SELECT {date_field} as record_ts,
+                       artist_number,
+                       artist_profile_id IS NOT NULL as linked,
+                       ({in_scope}) as in_scope,
+                       {fixable_column} as fixable,
+                       CASE WHEN {date_field} >= NOW() - INTERVAL '7 days'
+                            THEN DATE({date_field}) END as record_date
+                FROM {table_name}
+                {scan_filter}
+            ) scan
+            GROUP BY GROUPING SETS ((), (record_date))
+        ) s
+    """
+
+def collect_health_batched(cursor, table_names, days_back=None, profile_index=None, fixability=True):
+    """Collect health stats and recent broken records for all tables in one round trip.
+
+    Returns (table_stats, recent_broken) shaped exactly like the output of
+    get_table_health() and check_recent_broken_records(). With a profile_index,
+    fixability is resolved client-side from the broken artist_numbers the same
+    statement returns; with fixability=False it is not resolved at all and
+    fixability_stats is None.
+    """
+    cursor.execute("\nUNION ALL\n".join(
+        build_health_scan_sql(table_name, days_back, fixability, profile_index)
+        for table_name in table_names
+    ))
+    rows = cursor.fetchall()
+
+    by_table = {table_name: {'summary': None, 'daily': []} for table_name in table_names}
+    for row in rows:
+        entry = by_table[row['table_name']]
+        if row['is_daily']:
+            # Rows older than the 7-day window collapse into a NULL date group
+            if row['record_date'] is not None:
+                entry['daily'].append(row)
+        else:
+            entry['summary'] = row
+
+    table_stats = []
+    recent_broken = []
+    for table_name in table_names:
+        summary = by_table[table_name]['summary']
+        daily = sorted(by_table[table_name]['daily'], key=lambda r: r['record_date'], reverse=True)
+
+        if not fixability:
+            fixability_stats = None
+        else:
+            broken_count = summary['broken_records']
+            if profile_index is not None:
+                fixable_count = sum(1 for number in summary['broken_numbers'] or [] if profile_index.get(number))
+            else:
+                fixable_count = summary['fixable_records']
+            fixability_stats = {
+                'broken_records': broken_count,
+                'fixable_records': fixable_count,
+                'fixable_pct': (Decimal(fixable_count * 100) / broken_count).quantize(Decimal('0.01')) if broken_count else None
+            }
+
+        table_stats.append({
+            'table_name': table_name,
+            'basic_stats': {
+                'total_records': summary['total_records'],
+                'linked_records': summary['linked_records'],
+                'broken_records': summary['broken_records'],
+                'linked_pct': summary['linked_pct'],
+                'oldest_record': json_timestamp(summary['oldest_record']),
+                'newest_record': json_timestamp(summary['newest_record'])
+            },
+            'fixability_stats': fixability_stats,
+            'daily_breakdown': [{
+                'record_date': day['record_date'],
+                'daily_total': day['daily_total'],
+                'daily_linked': day['daily_linked'],
+                'daily_broken': day['daily_broken']
+            } for day in daily]
+        })
+
+        records = summary['recent_broken'] or []
+        if isinstance(records, str):
+            records = json.loads(records)
+        if records:
+            for record in records:
+                record['record_date'] = json_timestamp(record['record_date'])
+            recent_broken.append({
+                'table': table_name,
+                'records': records[:5]
+            })
+
+    return table_stats, recent_broken
+
+def estimate_link_health(cursor, table_names, sample_percent=1.0, sample_method='system', confidence=0.95,
+                         profile_index=None):
+    """Estimate linked percentage per table from a TABLESAMPLE scan.
+
+    Totals come from pg_class (reltuples scaled to the current relation size,
+    as the planner does); the linked fraction is a ratio estimate over the
+    sampled blocks. The variance is computed between blocks, which keeps the
+    interval honest for SYSTEM sampling where broken rows cluster by insert time.
+    The fixable fraction is resolved for the sampled broken rows only.
+    """
+    cursor.execute("\nUNION ALL\n".join(f"""
+        SELECT '{table_name}'::text as table_name,
+               (SELECT CASE WHEN c.relpages > 0
+                            THEN c.reltuples / c.relpages * (pg_relation_size(c.oid) / current_setting('block_size')::int)
+                            ELSE c.reltuples END
+                FROM pg_class c WHERE c.oid = '{table_name}'::regclass) as estimated_total,
+               to_jsonb((SELECT MIN({DATE_FIELDS.get(table_name, 'created_at')}) FROM {table_name})) as oldest_record,
+               to_jsonb((SELECT MAX({DATE_FIELDS.get(table_name, 'created_at')}) FROM {table_name})) as newest_record
+    """ for table_name in table_names))
+    estimates = {row['table_name']: row for row in cursor.fetchall()}
+
+    if profile_index is None:
+        fixable_column = build_fixable_sql('t')
+        sample_fixable = "COUNT(*) FILTER (WHERE fixable)"
+        broken_numbers = "NULL::text[]"
+    else:
+        fixable_column = "NULL::boolean"
+        sample_fixable = "NULL::bigint"
+        broken_numbers = "array_agg(artist_number) FILTER (WHERE NOT linked)"
+
+    cursor.execute("\nUNION ALL\n".join(f"""
+        SELECT '{table_name}'::text as table_name,
+               COUNT(*) as sample_rows,
+               COUNT(*) FILTER (WHERE linked) as sample_linked,
+               COUNT(*) FILTER (WHERE NOT linked) as sample_broken,
+               {sample_fixable} as sample_fixable,
+               {broken_numbers} as broken_numbers
+        FROM (
+            SELECT t.ctid, t.artist_number,
+                   t.artist_profile_id IS NOT NULL as linked,
+                   CASE WHEN t.artist_profile_id IS NULL THEN {fixable_column} END as fixable
+            FROM {table_name} t TABLESAMPLE {sample_method.upper()} ({float(sample_percent)})
+        ) s
+        GROUP BY (ctid::text::point)[0]
+    """ for table_name in table_names))
+    blocks = {table_name: [] for table_name in table_names}
+    sampled_broken = dict.fromkeys(table_names, 0)
+    sampled_fixable = dict.fromkeys(table_names, 0)
+    for row in cursor.fetchall():
+        blocks[row['table_name']].append((row['sample_linked'], row['sample_rows']))
+        sampled_broken[row['table_name']] += row['sample_broken']
+        if profile_index is not None:
+            sampled_fixable[row['table_name']] += sum(1 for number in row['broken_numbers'] or [] if profile_index.get(number))
+        else:
+            sampled_fixable[row['table_name']] += row['sample_fixable']
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    results = {}
+    for table_name in table_names:
+        sampled = blocks[table_name]
+        n = len(sampled)
+        sample_rows = sum(rows for _, rows in sampled)
+        estimated_total = estimates[table_name]['estimated_total']
+
+        result = {
+            'estimated_total': int(max(estimated_total or 0, 0)),
+            'oldest_record': json_timestamp(estimates[table_name]['oldest_record']),
+            'newest_record': json_timestamp(estimates[table_name]['newest_record']),
+            'sample_blocks': n,
+            'sample_rows': sample_rows,
+            'sample_broken': sampled_broken[table_name],
+            'fixable_fraction': sampled_fixable[table_name] / sampled_broken[table_name] if sampled_broken[table_name] else None,
+            'linked_fraction': None,
+            'ci_low': None,
+            'ci_high': None
+        }
+
+        if n >= 2 and sample_rows > 0:
+            p = sum(linked for linked, _ in sampled) / sample_rows
+            mean_rows = sample_rows / n
+            variance = sum((linked - p * rows) ** 2 for linked, rows in sampled) / (n * (n - 1) * mean_rows ** 2)
+            margin = z * variance ** 0.5
+            result.update({
+                'linked_fraction': p,
+                'ci_low': max(p - margin, 0.0),
+                'ci_high': min(p + margin, 1.0)
+            })
+
+        results[table_name] = result
+
+    return results
+
+def collect_health_approximate(cursor, table_names, args, profile_index=None, boundaries=None):
+    """Build the summary from sampled estimates, falling back to exact scans where needed.
+
+    A table is scanned exactly when it is too small to be worth sampling, never
+    analyzed, or its confidence interval straddles an alert boundary (the 85%
+    band, --alert-threshold, or the linked_pct thresholds of the alert rules),
+    so the traffic-light status is never a guess.
+    """
+    estimates = estimate_link_health(cursor, table_names, args.sample_percent, args.sample_method, args.confidence,
+                                     profile_index)
+    boundaries = boundaries if boundaries is not None else [85.0, 100 - args.alert_threshold]
+
+    exact_tables = []
+    approx_tables = []
+    for table_name in table_names:
+        estimate = estimates[table_name]
+        if estimate['linked_fraction'] is None or estimate['estimated_total'] < args.approx_min_rows or \
+                any(estimate['ci_low'] * 100 < boundary <= estimate['ci_high'] * 100 for boundary in boundaries):
+            exact_tables.append(table_name)
+        else:
+            approx_tables.append(table_name)
+
+    stats_by_table = {}
+    recent_broken = []
+
+    if exact_tables:
+        table_stats, exact_recent = collect_health_batched(cursor, exact_tables, None, profile_index)
+        stats_by_table.update({stats['table_name']: stats for stats in table_stats})
+        recent_broken.extend(exact_recent)
+
+    if approx_tables:
+        # The 7-day breakdown and 24h sample stay exact; they only touch recent rows.
+        # Fixability comes from the sample, so this scan skips the resolver.
+        table_stats, approx_recent = collect_health_batched(cursor, approx_tables, 7, fixability=False)
+        recent_broken.extend(approx_recent)
+        for stats in table_stats:
+            table_name = stats['table_name']
+            estimate = estimates[table_name]
+            total = estimate['estimated_total']
+            linked = round(total * estimate['linked_fraction'])
+            broken = total - linked
+            stats['basic_stats'] = {
+                'total_records': total,
+                'linked_records': linked,
+                'broken_records': broken,
+                'linked_pct': Decimal(estimate['linked_fraction'] * 100).quantize(Decimal('0.01')),
+                'oldest_record': estimate['oldest_record'],
+                'newest_record': estimate['newest_record']
+            }
+            fixable = round(broken * estimate['fixable_fraction']) if estimate['fixable_fraction'] is not None else None
+            stats['fixability_stats'] = {
+                'broken_records': broken,
+                'fixable_records': fixable,
+                'fixable_pct': Decimal(estimate['fixable_fraction'] * 100).quantize(Decimal('0.01'))
+                               if fixable is not None else None,
+                'estimated': True
+            }
+            stats['approximate'] = {
+                'ci_low': Decimal(estimate['ci_low'] * 100).quantize(Decimal('0.01')),
+                'ci_high': Decimal(estimate['ci_high'] * 100).quantize(Decimal('0.01')),
+                'confidence': args.confidence,
+                'sample_rows': estimate['sample_rows'],
+                'sample_blocks': estimate['sample_blocks'],
+                'method': args.sample_method
+            }
+            stats_by_table[table_name] = stats
+
+    recent_broken.sort(key=lambda item: table_names.index(item['table']))
+    return [stats_by_table[table_name] for table_name in table_names], recent_broken
+
+def collect_health_summary_table(cursor, table_names, days_back=None):
+    """Read health stats from the trigger-maintained artist_link_health counters.
+
+    Totals and the 7-day breakdown come from one small aggregate over the
+    counters table (see migrations/20261017_artist_link_health_summary.sql);
+    the 24h broken sample uses the partial broken-row indexes. Fixability is
+    not computed in this mode. Windows are whole calendar days.
+    """
+    scope_filter = f"AND record_date >= CURRENT_DATE - {int(days_back)}" if days_back else ""
+
+    cursor.execute(f"""
+        SELECT table_name,
+               GROUPING(daily_date) = 0 as is_daily,
+               daily_date as record_date,
+               SUM(total_records) FILTER (WHERE in_scope) as total_records,
+               SUM(linked_records) FILTER (WHERE in_scope) as linked_records,
+               SUM(broken_records) FILTER (WHERE in_scope) as broken_records,
+               MIN(record_date) FILTER (WHERE in_scope AND total_records > 0 AND record_date > '-infinity') as oldest_record,
+               MAX(record_date) FILTER (WHERE in_scope AND total_records > 0 AND record_date > '-infinity') as newest_record,
+               SUM(total_records) as daily_total,
+               SUM(linked_records) as daily_linked,
+               SUM(broken_records) as daily_broken
+        FROM (
+            SELECT table_name, record_date, total_records, linked_records, broken_records,
+                   TRUE {scope_filter} as in_scope,
+                   CASE WHEN record_date >= CURRENT_DATE - 7 THEN record_date END as daily_date
+            FROM artist_link_health
+            WHERE table_name = ANY(%s)
+        ) h
+        GROUP BY GROUPING SETS ((table_name), (table_name, daily_date))
+    """, [list(table_names)])
+    rows = cursor.fetchall()
+
+    table_stats = []
+    for table_name in table_names:
+        summary = next((row for row in rows if row['table_name'] == table_name and not row['is_daily']), None)
+        if summary is None:
+            raise RuntimeError(f"artist_link_health has no counters for {table_name}; run --reconcile-summary first")
+
+        total = int(summary['total_records'] or 0)
+        linked = int(summary['linked_records'] or 0)
+        daily = sorted((row for row in rows if row['table_name'] == table_name and row['is_daily']
+                        and row['record_date'] is not None and row['daily_total']),
+                       key=lambda r: r['record_date'], reverse=True)
+
+        table_stats.append({
+            'table_name': table_name,
+            'basic_stats': {
+                'total_records': total,
+                'linked_records': linked,
+                'broken_records': int(summary['broken_records'] or 0),
+                'linked_pct': (Decimal(linked * 100) / total).quantize(Decimal('0.01')) if total else None,
+                'oldest_record': summary['oldest_record'],
+                'newest_record': summary['newest_record']
+            },
+            'fixability_stats': None,
+            'daily_breakdown': [{
+                'record_date': day['record_date'],
+                'daily_total': int(day['daily_total']),
+                'daily_linked': int(day['daily_linked']),
+                'daily_broken': int(day['daily_broken'])
+            } for day in daily]
+        })
+
+    return table_stats, check_recent_broken_records(cursor)
+
+def reconcile_summary_table(conn, table_names, lock_timeout=None):
+    """Rebuild the artist_link_health counters from the source tables.
+
+    Each table is rebuilt in its own transaction, so its SHARE lock blocks
+    writers for one table's scan only; lock_timeout (ms) gives up instead of
+    queueing writers behind a lock that cannot be taken promptly.
+    """
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    results = []
+    for table_name in table_names:
+        if lock_timeout:
+            cursor.execute(f"SET LOCAL lock_timeout = '{int(lock_timeout)}ms'")
+        cursor.execute("SELECT * FROM reconcile_artist_link_health(%s)", [table_name])
+        results.extend(cursor.fetchall())
+        conn.commit()
+    cursor.close()
+
+    print("🔄 Rebuilt artist_link_health counters:")
+    for row in results:
+        print(f"  {row['table_name']}: {row['total_records']:,} records across {row['days']:,} days")
+    print()
+    return results
+
+def load_link_state(state_file):
+    """Load the incremental watermark state file, or None if it does not exist yet"""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file) as f:
+        return json.load(f)
+
+def save_link_state(state_file, state):
+    """Write the state file atomically so an interrupted run never leaves it half-written"""
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, default=str)
+    os.replace(tmp_file, state_file)
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+# Bumped whenever the state file layout changes; an older file forces a reconcile
+LINK_STATE_VERSION = 3
+
+def build_link_days_sql(table_name, row_filter="", profile_index=None):
+    """Build per-day total/broken/fixable counts for the rows of one table matching row_filter.
+
+    Fixability is an index probe per broken row (build_fixable_sql); with a
+    profile_index the broken artist_numbers are returned instead and matched
+    client-side by count_link_days(). Timestamps are returned as jsonb
+    (see json_timestamp).
+    """
+    date_field = DATE_FIELDS.get(table_name, 'created_at')
+    if profile_index is None:
+        fixable_column = f"CASE WHEN t.artist_profile_id IS NULL THEN {build_fixable_sql('t')} END"
+        fixable_records = "COUNT(*) FILTER (WHERE fixable)"
+        broken_numbers = "NULL::text[]"
+    else:
+        fixable_column = "NULL::boolean"
+        fixable_records = "NULL::bigint"
+        broken_numbers = "array_agg(artist_number) FILTER (WHERE NOT linked)"
+
+    return f"""
+        SELECT '{table_name}'::text as table_name,
+               DATE(record_ts) as record_date,
+               COUNT(*) as total_records,
+               COUNT(*) FILTER (WHERE NOT linked) as broken_records,
+               {fixable_records} as fixable_records,
+               {broken_numbers} as broken_numbers,
+               to_jsonb(MIN(record_ts)) as oldest_record,
+               to_jsonb(MAX(record_ts)) as newest_record,
+               MAX(updated_at) as last_updated
+        FROM (
+            SELECT t.{date_field} as record_ts,
+                   t.updated_at,
+                   t.artist_number,
+                   t.artist_profile_id IS NOT NULL as linked,
+                   {fixable_column} as fixable
+            FROM {table_name} t
+            {row_filter}
+        ) scan
+        GROUP BY DATE(record_ts)
+    """
+
+def count_link_days(rows, profile_index=None):
+    """{table_name: {day: [total, broken, fixable]}} from build_link_days_sql() rows"""
+    days = {}
+    for row in rows:
+        if profile_index is not None:
+            fixable = sum(1 for number in row['broken_numbers'] or [] if profile_index.get(number))
+        else:
+            fixable = row['fixable_records']
+        days.setdefault(row['table_name'], {})[str(row['record_date'])] = \
+            [row['total_records'], row['broken_records'], fixable]
+    return days
+
+def reconcile_link_state(cursor, table_names, profile_index=None):
+    """Rebuild watermarks and per-day counters from a full scan of every table.
+
+    Per table the state keeps [total, broken, fixable] per day plus the
+    created/updated watermarks the next run resumes from. No per-row data is
+    kept, so the file stays proportional to the number of days.
+    """
+    state = {'version': LINK_STATE_VERSION, 'last_reconcile': datetime.now().isoformat(), 'tables': {}}
+
+    cursor.execute("\nUNION ALL\n".join(
+        build_link_days_sql(table_name, profile_index=profile_index) for table_name in table_names
+    ))
+    rows = cursor.fetchall()
+    days = count_link_days(rows, profile_index)
+
+    for table_name in table_names:
+        table_rows = [row for row in rows if row['table_name'] == table_name]
+        dated = [row for row in table_rows if row['record_date'] is not None]
+        newest = max((json_timestamp(row['newest_record']) for row in dated), default=None)
+
+        state['tables'][table_name] = {
+            'created_watermark': _iso(newest),
+            'updated_watermark': _iso(max((row['last_updated'] for row in table_rows
+                                           if row['last_updated'] is not None), default=None)),
+            'oldest_record': _iso(min((json_timestamp(row['oldest_record']) for row in dated), default=None)),
+            'newest_record': _iso(newest),
+            'days': days.get(table_name, {})
+        }
+
+    return state
+
+def advance_link_state(cursor, state, table_names, overlap_minutes=5, profile_index=None):
+    """Recount the days that hold rows created or updated since the last checkpoint.
+
+    The first round trip finds which days changed (re-reading an overlap
+    window behind the watermarks so rows committed late are not missed); the
+    second recounts exactly those days, resolving fixability only for their
+    broken rows. A recount replaces the day's counters, so re-reading the
+    overlap never double-counts. Days without changes keep their counters,
+    including fixable counts, until the next reconcile.
+    """
+    overlap = timedelta(minutes=overlap_minutes)
+    selects = []
+    params = []
+
+    for table_name in table_names:
+        table_state = state['tables'][table_name]
+        date_field = DATE_FIELDS.get(table_name, 'created_at')
+        created_wm = table_state['created_watermark']
+        updated_wm = table_state['updated_watermark']
+        created_from = (datetime.fromisoformat(created_wm) - overlap).isoformat() if created_wm else '-infinity'
+        updated_from = (datetime.fromisoformat(updated_wm) - overlap).isoformat() if updated_wm else '-infinity'
+
+        selects.append(f"""
+            SELECT '{table_name}'::text as table_name,
+                   DATE({date_field}) as record_date,
+                   to_jsonb(MIN({date_field})) as oldest_record,
+                   to_jsonb(MAX({date_field})) as newest_record,
+                   MAX(updated_at) as last_updated
+            FROM {table_name}
+            WHERE {date_field} >= %s OR updated_at >= %s
+            GROUP BY DATE({date_field})
+        """)
+        params.extend([created_from, updated_from])
+
+    cursor.execute("\nUNION ALL\n".join(selects), params)
+    changed = cursor.fetchall()
+
+    selects = []
+    params = []
+    for table_name in table_names:
+        date_field = DATE_FIELDS.get(table_name, 'created_at')
+        table_changed = [row for row in changed if row['table_name'] == table_name]
+        touched = sorted(str(row['record_date']) for row in table_changed if row['record_date'] is not None)
+        if touched:
+            selects.append(build_link_days_sql(
+                table_name,
+                f"JOIN unnest(%s::date[]) d(day) ON t.{date_field} >= d.day AND t.{date_field} < d.day + 1",
+                profile_index))
+            params.append(touched)
+        if any(row['record_date'] is None for row in table_changed):
+            selects.append(build_link_days_sql(table_name, f"WHERE t.{date_field} IS NULL", profile_index))
+
+    recounted = {}
+    if selects:
+        cursor.execute("\nUNION ALL\n".join(selects), params)
+        recounted = count_link_days(cursor.fetchall(), profile_index)
+
+    for table_name in table_names:
+        table_state = state['tables'][table_name]
+        table_changed = [row for row in changed if row['table_name'] == table_name]
+        days = table_state['days']
+        for row in table_changed:
+            # A changed day with no rows left was emptied by deletes
+            days.pop(str(row['record_date']), None)
+        days.update(recounted.get(table_name, {}))
+
+        for row in table_changed:
+            if row['newest_record'] is not None:
+                newest_record = json_timestamp(row['newest_record'])
+                oldest_record = json_timestamp(row['oldest_record'])
+                if table_state['created_watermark'] is None or \
+                        newest_record > datetime.fromisoformat(table_state['created_watermark']):
+                    table_state['created_watermark'] = newest_record.isoformat()
+                if table_state['oldest_record'] is None or \
+                        oldest_record < datetime.fromisoformat(table_state['oldest_record']):
+                    table_state['oldest_record'] = oldest_record.isoformat()
+            if row['last_updated'] is not None and (table_state['updated_watermark'] is None or
+                                                    row['last_updated'] > datetime.fromisoformat(table_state['updated_watermark'])):
+                table_state['updated_watermark'] = row['last_updated'].isoformat()
+        table_state['newest_record'] = table_state['created_watermark']
+
+    return state
+
+def summarize_link_state(cursor, state, table_names):
+    """Build table_stats/recent_broken from saved counters in the same shape as the live collectors.
+
+    Days are bucketed in the server session's TimeZone and the 7-day window
+    starts on the server's date, as in the live scans; daily windows use
+    whole calendar days, so the breakdown can differ from a live scan by rows
+    near the window edge. The 24h broken sample is read live; it is a top-5
+    lookup and needs no saved rows.
+    """
+    cursor.execute("SELECT DATE(NOW() - INTERVAL '7 days') as week_start")
+    week_start = str(cursor.fetchone()['week_start'])
+
+    table_stats = []
+    for table_name in table_names:
+        table_state = state['tables'][table_name]
+        days = table_state['days']
+
+        total = sum(counts[0] for counts in days.values())
+        broken_count = sum(counts[1] for counts in days.values())
+        fixable_count = sum(counts[2] for counts in days.values())
+        linked = total - broken_count
+
+        daily_breakdown = []
+        for day in sorted((d for d in days if d != 'None' and d >= week_start), reverse=True):
+            daily_total, daily_broken, _ = days[day]
+            daily_breakdown.append({
+                'record_date': datetime.fromisoformat(day).date(),
+                'daily_total': daily_total,
+                'daily_linked': daily_total - daily_broken,
+                'daily_broken': daily_broken
+            })
+
+        table_stats.append({
+            'table_name': table_name,
+            'basic_stats': {
+                'total_records': total,
+                'linked_records': linked,
+                'broken_records': broken_count,
+                'linked_pct': (Decimal(linked * 100) / total).quantize(Decimal('0.01')) if total else None,
+                'oldest_record': datetime.fromisoformat(table_state['oldest_record']) if table_state['oldest_record'] else None,
+                'newest_record': datetime.fromisoformat(table_state['newest_record']) if table_state['newest_record'] else None
+            },
+            'fixability_stats': {
+                'broken_records': broken_count,
+                'fixable_records': fixable_count,
+                'fixable_pct': (Decimal(fixable_count * 100) / broken_count).quantize(Decimal('0.01')) if broken_count else None
+            },
+            'daily_breakdown': daily_breakdown
+        })
+
+    return table_stats, check_recent_broken_records(cursor)
+
+def collect_health_incremental(cursor, table_names, args, profile_index=None):
+    """Advance (or rebuild on schedule) the saved state and summarize it"""
+    state = load_link_state(args.state_file)
+
+    reconcile_due = args.reconcile or state is None or \
+        state.get('version') != LINK_STATE_VERSION or \
+        set(state.get('tables', {})) != set(table_names) or \
+        datetime.now() - datetime.fromisoformat(state['last_reconcile']) >= timedelta(hours=args.reconcile_hours)
+
+    if reconcile_due:
+        state = reconcile_link_state(cursor, table_names, profile_index)
+    else:
+        state = advance_link_state(cursor, state, table_names, args.overlap_minutes, profile_index)
+
+    save_link_state(args.state_file, state)
+    return summarize_link_state(cursor, state, table_names)
+
+def load_fix_checkpoint(checkpoint_file):
+    """Load per-table keyset positions left by an interrupted --fix run"""
+    if not os.path.exists(checkpoint_file):
+        return {}
+    with open(checkpoint_file) as f:
+        return json.load(f)
+
+def format_eta(seconds):
+    """Format an ETA in seconds as H:MM:SS"""
+    return str(timedelta(seconds=int(seconds)))
+
+def fix_table_links(conn, table_name, args, checkpoint, profile_index=None):
+    """Repair fixable broken links in one table in keyset-paginated, throttled batches.
+
+    Each batch selects the next broken ids after the last committed id, resolves
+    them, and applies UPDATE ... FROM unnest() in its own short transaction under
+    lock_timeout/statement_timeout so live writers are never held up for long.
+    A batch that hits a timeout is rolled back and retried after a backoff.
+    """
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    last_id = checkpoint.get(table_name)
+
+    cursor.execute(f"""
+        SELECT COUNT(*) as remaining
+        FROM {table_name}
+        WHERE artist_profile_id IS NULL
+        {"AND id > %s" if last_id else ""}
+    """, [last_id] if last_id else None)
+    remaining = cursor.fetchone()['remaining']
+    conn.commit()
+
+    scanned = 0
+    fixed = 0
+    retries = 0
+    started = time.monotonic()
+
+    while True:
+        try:
+            cursor.execute(f"SET LOCAL lock_timeout = '{args.lock_timeout}ms'")
+            cursor.execute(f"SET LOCAL statement_timeout = '{args.statement_timeout}ms'")
+
+            cursor.execute(f"""
+                SELECT id, artist_number
+                FROM {table_name}
+                WHERE artist_profile_id IS NULL
+                {"AND id > %s" if last_id else ""}
+                ORDER BY id
+                LIMIT %s
+            """, [last_id, args.batch_size] if last_id else [args.batch_size])
+            batch = cursor.fetchall()
+            if not batch:
+                conn.rollback()
+                break
+            batch_ids = [str(row['id']) for row in batch]
+
+            if profile_index is not None:
+                resolved = {}
+                for row in batch:
+                    profile_id = profile_index.get(row['artist_number'])
+                    if profile_id:
+                        resolved[str(row['id'])] = profile_id
+            else:
+                cursor.execute(build_resolver_sql(table_name, extra_filter="AND t.id = ANY(%(batch_ids)s::uuid[])"),
+                               {'batch_ids': batch_ids})
+                resolved = {str(row['record_id']): str(row['profile_id']) for row in cursor.fetchall()}
+
+            if resolved and not args.dry_run:
+                cursor.execute(f"""
+                    UPDATE {table_name} t
+                    SET artist_profile_id = r.profile_id,
+                        updated_at = NOW()
+                    FROM unnest(%s::uuid[], %s::uuid[]) as r(record_id, profile_id)
+                    WHERE t.id = r.record_id
+                    AND t.artist_profile_id IS NULL
+                """, [list(resolved.keys()), list(resolved.values())])
+                fixed += cursor.rowcount
+            else:
+                fixed += len(resolved)
+
+            if args.dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+
+        except (psycopg2.errors.LockNotAvailable, psycopg2.extensions.QueryCanceledError) as e:
+            conn.rollback()
+            retries += 1
+            if retries > args.max_retries:
+                raise
+            backoff = min(2 ** retries, 30)
+            print(f"\n  ⏳ {table_name}: {type(e).__name__}, retrying batch in {backoff}s ({retries}/{args.max_retries})")
+            time.sleep(backoff)
+            continue
+
+        retries = 0
+        last_id = batch_ids[-1]
+        scanned += len(batch_ids)
+
+        if not args.dry_run:
+            checkpoint[table_name] = last_id
+            save_link_state(args.fix_checkpoint, checkpoint)
+
+        # Throttle to the target rate, measured over the whole run
+        elapsed = time.monotonic() - started
+        if args.rows_per_second:
+            ahead = scanned / args.rows_per_second - elapsed
+            if ahead > 0:
+                time.sleep(ahead)
+                elapsed += ahead
+
+        rate = scanned / elapsed if elapsed > 0 else 0
+        eta = format_eta((remaining - scanned) / rate) if rate > 0 and remaining > scanned else "0:00:00"
+        print(f"\r  🔧 {table_name}: {scanned:,}/{remaining:,} broken scanned | "
+              f"{'would fix' if args.dry_run else 'fixed'} {fixed:,} | {rate:,.0f} rows/s | ETA {eta}   ",
+              end='', flush=True)
+
+    print()
+    cursor.close()
+    return {'table_name': table_name, 'scanned': scanned, 'fixed': fixed}
+
+def run_bulk_fix(conn, table_names, args, profile_index=None):
+    """Run the bulk link repair across all tables, resuming from any saved checkpoint"""
+    checkpoint = load_fix_checkpoint(args.fix_checkpoint) if not args.dry_run else {}
+    if checkpoint:
+        print(f"↩️  Resuming bulk fix from checkpoint {args.fix_checkpoint}")
+
+    print("=" * 80)
+    print(f"🔧 BULK LINK FIX{' (DRY RUN)' if args.dry_run else ''}")
+    print(f"Batch size: {args.batch_size} | Target rate: {args.rows_per_second or 'unthrottled'} rows/s | "
+          f"lock_timeout: {args.lock_timeout}ms | statement_timeout: {args.statement_timeout}ms")
+    print("=" * 80)
+
+    results = [fix_table_links(conn, table_name, args, checkpoint, profile_index) for table_name in table_names]
+
+    # A completed run leaves nothing to resume
+    if not args.dry_run and os.path.exists(args.fix_checkpoint):
+        os.remove(args.fix_checkpoint)
+
+    for result in results:
+        verb = 'would be fixed' if args.dry_run else 'fixed'
+        print(f"  {result['table_name']}: {result['fixed']:,} of {result['scanned']:,} broken records {verb}")
+    print()
+
+    return results
+
+EXPORT_COLUMNS = ['source_table', 'id', 'artist_number', 'event_eid', 'record_date', 'resolved_profile_id']
+
+def build_export_sql(table_names, kind, columns, days_back=None):
+    """Build one statement selecting every broken/fixable/unfixable row across tables.
+
+    source_table, record_date (the table's date field) and resolved_profile_id
+    are derived; any other column name is read from the table itself and must
+    exist on all of them.
+    """
+    selects = []
+    for table_name in table_names:
+        date_field = DATE_FIELDS.get(table_name, 'created_at')
+        derived = {
+            'source_table': f"'{table_name}'::text",
+            'record_date': f"t.{date_field}",
+            'resolved_profile_id': "r.profile_id"
+        }
+        select_list = ", ".join(f"{derived.get(column, f't.{column}')} as {column}" for column in columns)
+
+        kind_filter = {
+            'broken': "",
+            'fixable': "AND r.record_id IS NOT NULL",
+            'unfixable': "AND r.record_id IS NULL"
+        }[kind]
+        date_filter = f"AND t.{date_field} >= NOW() - INTERVAL '{days_back} days'" if days_back else ""
+
+        selects.append(f"""
+            SELECT {select_list}
+            FROM {table_name} t
+            LEFT JOIN ({build_resolver_sql(table_name, days_back)}) r ON r.record_id = t.id
+            WHERE t.artist_profile_id IS NULL
+            {kind_filter}
+            {date_filter}
+        """)
+
+    return "\nUNION ALL\n".join(selects)
+
+class CsvRecordCounter:
+    """Write-through file wrapper counting the CSV records written to it.
+
+    A record ends at a newline outside a quoted field; COPY quotes fields
+    that contain newlines, and an escaped quote ("") toggles the state twice.
+    """
+    def __init__(self, out):
+        self.out = out
+        self.records = 0
+        self.quoted = False
+
+    def write(self, data):
+        for i, part in enumerate(bytes(data).split(b'"')):
+            if i:
+                self.quoted = not self.quoted
+            if not self.quoted:
+                self.records += part.count(b'\n')
+        return self.out.write(data)
+
+def export_link_records(conn, table_names, args):
+    """Stream matching rows to CSV (COPY TO STDOUT) or JSONL (named server-side cursor).
+
+    Neither path materialises the result set client-side, so memory stays flat
+    regardless of row count. Output is gzipped when --gzip is set or the output
+    path ends in .gz.
+    """
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else EXPORT_COLUMNS
+    for column in columns:
+        if not column.isidentifier():
+            raise ValueError(f"Invalid export column: {column!r}")
+
+    query = build_export_sql(table_names, args.export, columns, args.recent)
+
+    use_gzip = args.gzip or (args.output or '').endswith('.gz')
+    if args.output:
+        out = gzip.open(args.output, 'wb') if use_gzip else open(args.output, 'wb')
+    else:
+        out = gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb') if use_gzip else sys.stdout.buffer
+
+    rows_written = 0
+    try:
+        if args.format == 'csv':
+            cursor = conn.cursor()
+            counter = CsvRecordCounter(out)
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", counter)
+            rows_written = max(counter.records - 1, 0)
+            cursor.close()
+        else:
+            cursor = conn.cursor(name='artist_link_export', cursor_factory=RealDictCursor)
+            cursor.itersize = 5000
+            cursor.execute(query)
+            for row in cursor:
+                out.write((json.dumps(row, default=str) + "\n").encode('utf-8'))
+                rows_written += 1
+            cursor.close()
+        conn.commit()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    print(f"📤 Exported {rows_written:,} {args.export} records ({args.format}{', gzip' if use_gzip else ''}) "
+          f"to {args.output or 'stdout'}", file=sys.stderr)
+    return rows_written
+
+def default_link_alert_rules(alert_threshold):
+    """Rules used without --alert-rules, matching the report's long-standing alerts"""
+    return [
+        AlertRule({'name': 'link-health-critical', 'match': 'links.*.linked_pct', 'op': '<',
+                   'threshold': 85, 'severity': 'critical'}),
+        AlertRule({'name': 'link-health', 'match': 'links.*.linked_pct', 'op': '<',
+                   'threshold': 100 - alert_threshold}),
+        AlertRule({'name': 'recent-broken-links', 'match': 'links.*.recent_broken', 'op': '>', 'threshold': 0}),
+    ]
+
+def link_health_boundaries(rules, table_names):
+    """linked_pct values where some rule changes state, plus the 85% status band"""
+    boundaries = {85.0}
+    for rule in rules:
+        if any(rule.matches(f"links.{table_name}.linked_pct") for table_name in table_names):
+            boundaries.update((rule.threshold, rule.clear))
+    return sorted(boundaries)
+
+def evaluate_link_alerts(engine, table_stats, recent_broken):
+    """Feed this run's per-table series to the alert engine and return the firing alerts"""
+    now = time.time()
+    recent_counts = {item['table']: len(item['records']) for item in recent_broken}
+    for stats in table_stats:
+        table_name = stats['table_name']
+        basic = stats['basic_stats']
+        # An empty table (or window) has no link percentage to alert on
+        if basic['linked_pct'] is not None:
+            engine.observe(f"links.{table_name}.linked_pct", float(basic['linked_pct']), now)
+        engine.observe(f"links.{table_name}.broken_records", basic['broken_records'], now)
+        engine.observe(f"links.{table_name}.recent_broken", recent_counts.get(table_name, 0), now)
+    engine.save_state()
+    return engine.firing()
+
+def format_pct(value):
+    """Format a percentage for the report, or n/a when there were no records"""
+    return f"{value}%" if value is not None else "n/a"
+
+def print_health_report(table_stats, recent_broken, args, firing=()):
     """Print comprehensive health report"""
     
     print("=" * 80)
     print("🔗 ARTIST PROFILE LINK HEALTH MONITOR")
     print("=" * 80)
     print(f"Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    if args.target_name:
+        print(f"🎯 Target: {args.target_name} ({args.target_role})")
     
     if args.recent:
         print(f"📊 Scope: Records from last {args.recent} days")
     else:
-        print("📊 Scope: All historical records")
+        print(f"📊 Scope: All historical records{' (approximate where safe)' if args.approximate else ''}")
     
     print()
     
@@ -139,26 +1218,25 @@ def print_health_report(table_stats, recent_broken, args):
     print(f"{'Table':<15} {'Total':<8} {'Linked':<8} {'Broken':<8} {'Link %':<8} {'Status':<10}")
     print("-" * 80)
     
-    alert_tables = []
+    # Alerts come from the rule engine; the status column is display only
+    alert_tables = list(dict.fromkeys(series.split('.')[1] for _, series, _ in firing))
     
     for stats in table_stats:
         basic = stats['basic_stats']
         table_name = stats['table_name'].replace('artist_', '').title()
         
         # Determine status
-        if basic['linked_pct'] >= 95:
+        if basic['linked_pct'] is None:
+            status = "➖ Empty"
+        elif basic['linked_pct'] >= 95:
             status = "✅ Good"
         elif basic['linked_pct'] >= 85:
             status = "⚠️  Warning" 
         else:
             status = "🚨 Alert"
-            alert_tables.append(stats['table_name'])
-        
-        if args.alert_threshold and basic['linked_pct'] < (100 - args.alert_threshold):
-            alert_tables.append(stats['table_name'])
         
         print(f"{table_name:<15} {basic['total_records']:<8,} {basic['linked_records']:<8,} "
-              f"{basic['broken_records']:<8,} {basic['linked_pct']:<8}% {status:<10}")
+              f"{basic['broken_records']:<8,} {format_pct(basic['linked_pct']):<9} {status:<10}")
     
     print()
     
@@ -171,15 +1249,24 @@ def print_health_report(table_stats, recent_broken, args):
         print(f"🔍 DETAILED: {stats['table_name'].upper()}")
         print("-" * 50)
         print(f"  Total Records: {basic['total_records']:,}")
-        print(f"  Linked (Good): {basic['linked_records']:,} ({basic['linked_pct']}%)")
+        print(f"  Linked (Good): {basic['linked_records']:,} ({format_pct(basic['linked_pct'])})")
         print(f"  Broken Links:  {basic['broken_records']:,}")
         
-        if fixability['broken_records'] > 0:
-            print(f"  Fixable:       {fixability['fixable_records']:,} ({fixability['fixable_pct']}% of broken)")
-            print(f"  Unfixable:     {fixability['broken_records'] - fixability['fixable_records']:,}")
+        if fixability and fixability['broken_records'] > 0 and fixability['fixable_records'] is None:
+            print("  Fixable:       skipped (no broken rows in the sample)")
+        elif fixability and fixability['broken_records'] > 0:
+            estimated = " (estimated from sample)" if fixability.get('estimated') else ""
+            print(f"  Fixable:       {fixability['fixable_records']:,} ({fixability['fixable_pct']}% of broken){estimated}")
+            print(f"  Unfixable:     {fixability['broken_records'] - fixability['fixable_records']:,}{estimated}")
         
         print(f"  Date Range:    {basic['oldest_record']} to {basic['newest_record']}")
         
+        if stats.get('approximate'):
+            approx = stats['approximate']
+            print(f"  Estimate:      {approx['ci_low']}% – {approx['ci_high']}% linked "
+                  f"({approx['confidence']:.0%} CI, {approx['method']} sample of {approx['sample_rows']:,} rows "
+                  f"in {approx['sample_blocks']:,} blocks)")
+        
         if daily and len(daily) > 0:
             print("  📅 Last 7 Days:")
             for day in daily:
@@ -204,6 +1291,8 @@ def print_health_report(table_stats, recent_broken, args):
         print("🚨 ALERTS & RECOMMENDATIONS")
         print("-" * 50)
         print(f"⚠️  Tables with linking issues: {', '.join(alert_tables)}")
+        for rule, series, value in firing:
+            print(f"   [{rule.severity}] {rule.name}: {series} = {value:g} ({rule.op} {rule.threshold:g})")
         print("💡 Recommended actions:")
         print("   1. Run fixability analysis: Check which broken records can be auto-fixed")
         print("   2. Run bulk fix script: Fix linkable records using entry_id matching")
@@ -220,52 +1309,181 @@ def main():
     parser.add_argument('--alert-threshold', type=float, default=5.0, 
                        help='Alert if broken percentage exceeds this threshold (default: 5%%)')
     parser.add_argument('--quiet', action='store_true', help='Only show alerts and errors')
+    parser.add_argument('--alert-rules', metavar='FILE',
+                       help='Alert rules and sinks (JSON, see scripts/monitor_alerts.py); replaces the built-in rules')
+    parser.add_argument('--alert-state', metavar='FILE',
+                       help='Keep alert state between runs so for-durations, hysteresis and cooldowns apply')
+    parser.add_argument('--resolver', choices=['sql', 'memory'], default='sql',
+                       help='Fixability resolution: indexed SQL lookups, or an in-memory entry_id map loaded once (default: sql)')
+    parser.add_argument('--per-table', action='store_true',
+                       help='Use the legacy per-table queries instead of the batched single-scan collector')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only scan rows created/updated since the last run, merging into saved counters')
+    parser.add_argument('--state-file', default=os.path.expanduser('~/.artist_profile_links_state.json'),
+                       help='Watermark/counter state file for --incremental')
+    parser.add_argument('--reconcile-hours', type=float, default=24,
+                       help='Run a full reconcile when the last one is older than this (default: 24)')
+    parser.add_argument('--reconcile', action='store_true',
+                       help='Force a full reconcile of the --incremental state')
+    parser.add_argument('--fix', action='store_true',
+                       help='Repair fixable broken links in all tables before reporting')
+    parser.add_argument('--dry-run', action='store_true', help='With --fix, resolve and count but roll back every batch')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per --fix batch (default: 500)')
+    parser.add_argument('--rows-per-second', type=float, default=500,
+                       help='Target --fix throughput; 0 disables throttling (default: 500)')
+    parser.add_argument('--lock-timeout', type=int, default=2000, help='lock_timeout per --fix batch and --reconcile-summary table in ms (default: 2000)')
+    parser.add_argument('--statement-timeout', type=int, default=10000,
+                       help='statement_timeout per --fix batch in ms (default: 10000)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                       help='Retries for a --fix batch that hits a timeout (default: 5)')
+    parser.add_argument('--fix-checkpoint', default=os.path.expanduser('~/.artist_profile_links_fix.json'),
+                       help='Checkpoint file used to resume an interrupted --fix run')
+    parser.add_argument('--export', choices=['broken', 'unfixable', 'fixable'],
+                       help='Stream every matching record instead of printing the report')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help='Export format (default: csv)')
+    parser.add_argument('--output', help='Export file path (default: stdout; a .gz suffix implies --gzip)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the export output')
+    parser.add_argument('--columns', help=f"Comma-separated export columns (default: {','.join(EXPORT_COLUMNS)})")
+    parser.add_argument('--approximate', action='store_true',
+                       help='Estimate full-history totals from pg_class and TABLESAMPLE, scanning exactly only near alert thresholds')
+    parser.add_argument('--sample-percent', type=float, default=1.0, help='TABLESAMPLE percentage for --approximate (default: 1)')
+    parser.add_argument('--sample-method', choices=['system', 'bernoulli'], default='system',
+                       help='TABLESAMPLE method for --approximate (default: system)')
+    parser.add_argument('--confidence', type=float, default=0.95, help='Confidence level for --approximate intervals (default: 0.95)')
+    parser.add_argument('--approx-min-rows', type=int, default=50000,
+                       help='Tables estimated below this many rows are always scanned exactly (default: 50000)')
+    parser.add_argument('--summary-table', action='store_true',
+                       help='Read the trigger-maintained artist_link_health counters instead of scanning the tables')
+    parser.add_argument('--reconcile-summary', action='store_true',
+                       help='Rebuild the artist_link_health counters from scratch')
+    parser.add_argument('--overlap-minutes', type=int, default=5,
+                       help='Re-read this far behind the watermarks to catch late commits (default: 5)')
+    parser.add_argument('--targets', metavar='FILE',
+                       help='Check the databases in a targets file (JSON, see monitor_targets.py) instead of the built-in one')
+    parser.add_argument('--target', action='append', metavar='NAME',
+                       help='Only check the named target; repeatable (default: every target in --targets)')
     
     args = parser.parse_args()
     
+    if args.incremental and args.recent:
+        parser.error('--incremental tracks full history and cannot be combined with --recent')
+    if args.approximate and (args.recent or args.incremental):
+        parser.error('--approximate only applies to full-history reports (not --recent or --incremental)')
+    
+    try:
+        rules, sinks = load_alert_config(args.alert_rules) if args.alert_rules else (default_link_alert_rules(args.alert_threshold), {})
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"Invalid --alert-rules: {e}")
+    
+    try:
+        targets = select_targets(load_targets(args.targets), args.target) if args.targets else [target_from_config(None, supabase_config)]
+    except (OSError, ValueError) as e:
+        parser.error(f"Invalid --targets: {e}")
+    if len(targets) > 1 and (args.fix or args.export or args.reconcile_summary):
+        parser.error('--fix, --export and --reconcile-summary act on one database; pick it with --target')
+    
+    if len(targets) == 1:
+        target_args = targets_args(args, targets)[0]
+        try:
+            result = check_target(target_args, targets[0], rules, sinks)
+        except Exception as e:
+            print(f"💥 Error: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(2)
+        sys.exit(report_target(target_args, *result) if result is not None else 0)
+    
+    # Every target is checked on its own connection and thread, so a slow or
+    # unreachable database delays only its own report
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = [(target_args, executor.submit(check_target, target_args, target, rules, sinks))
+                   for target_args, target in zip(targets_args(args, targets), targets)]
+        exit_code = 0
+        for target_args, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"💥 Error ({target_args.target_name}): {e}")
+                exit_code = 2
+                continue
+            if result is not None:
+                exit_code = max(exit_code, report_target(target_args, *result))
+    sys.exit(exit_code)
+
+def targets_args(args, targets):
+    """Per-target copies of args, giving each named target its own state files"""
+    copies = []
+    for target in targets:
+        target_args = argparse.Namespace(**vars(args), target_name=target['name'], target_role=target['role'])
+        if target['name']:
+            for option in ('state_file', 'fix_checkpoint', 'alert_state'):
+                path = getattr(args, option)
+                if path:
+                    root, ext = os.path.splitext(path)
+                    setattr(target_args, option, f"{root}.{target['name']}{ext}")
+        copies.append(target_args)
+    return copies
+
+def check_target(args, target, rules, sinks):
+    """Run the requested actions and health check against one target.
+
+    Returns (table_stats, recent_broken, firing), or None when --export
+    replaced the health check.
+    """
+    alerts = AlertEngine(rules, sinks, args.alert_state, labels={'target': target['name']} if target['name'] else None)
+    conn = psycopg2.connect(**target['connect'])
     try:
-        conn = psycopg2.connect(**supabase_config)
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Get health statistics for all tables
-        table_stats = []
-        for table_name in ['artist_applications', 'artist_invitations', 'artist_confirmations']:
-            stats = get_table_health(cursor, table_name, args.recent)
-            table_stats.append(stats)
-        
-        # Check for recent broken records
-        recent_broken = check_recent_broken_records(cursor)
+        if args.export:
+            export_link_records(conn, HEALTH_TABLES, args)
+            return None
         
-        if not args.quiet:
-            print_health_report(table_stats, recent_broken, args)
+        profile_index = load_profile_index(cursor) if args.resolver == 'memory' else None
         
-        # Exit with error code if alerts detected
-        alert_detected = False
-        for stats in table_stats:
-            if stats['basic_stats']['linked_pct'] < (100 - args.alert_threshold):
-                alert_detected = True
-                break
+        if args.fix:
+            run_bulk_fix(conn, HEALTH_TABLES, args, profile_index)
         
-        if recent_broken:
-            alert_detected = True
+        if args.reconcile_summary:
+            reconcile_summary_table(conn, HEALTH_TABLES, args.lock_timeout)
         
-        if alert_detected:
-            if args.quiet:
-                print("🚨 ALERT: Artist profile linking issues detected")
-            sys.exit(1)
-        else:
-            if args.quiet:
-                print("✅ All artist profile links healthy")
-            sys.exit(0)
+        if args.summary_table:
+            table_stats, recent_broken = collect_health_summary_table(cursor, HEALTH_TABLES, args.recent)
+        elif args.incremental:
+            table_stats, recent_broken = collect_health_incremental(cursor, HEALTH_TABLES, args, profile_index)
+        elif args.approximate:
+            table_stats, recent_broken = collect_health_approximate(cursor, HEALTH_TABLES, args, profile_index,
+                                                                    link_health_boundaries(rules, HEALTH_TABLES))
+        elif args.per_table:
+            # Get health statistics for all tables
+            table_stats = []
+            for table_name in HEALTH_TABLES:
+                stats = get_table_health(cursor, table_name, args.recent, profile_index)
+                table_stats.append(stats)
             
-    except Exception as e:
-        print(f"💥 Error: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(2)
+            # Check for recent broken records
+            recent_broken = check_recent_broken_records(cursor)
+        else:
+            table_stats, recent_broken = collect_health_batched(cursor, HEALTH_TABLES, args.recent, profile_index)
+        
+        return table_stats, recent_broken, evaluate_link_alerts(alerts, table_stats, recent_broken)
     finally:
-        cursor.close()
         conn.close()
 
+def report_target(args, table_stats, recent_broken, firing):
+    """Print one target's report and return its exit code"""
+    if not args.quiet:
+        print_health_report(table_stats, recent_broken, args, firing)
+    
+    label = f" ({args.target_name})" if args.target_name else ""
+    # Exit with error code if alerts detected
+    if firing:
+        if args.quiet:
+            print(f"🚨 ALERT{label}: Artist profile linking issues detected")
+        return 1
+    if args.quiet:
+        print(f"✅ All artist profile links healthy{label}")
+    return 0
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
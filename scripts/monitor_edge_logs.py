@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Monitor Edge Function Logs
+
+Streaming ingestion of Supabase edge function logs (JSON lines) for
+art-battle-broadcast/scripts/monitor-user-experience.py --edge-logs. Files
+are tailed incrementally (rotation-aware, .gz exports read once) and every
+request line is folded into per-function windows of mergeable quantile
+sketches, so memory stays constant however many lines are ingested.
+
+Accepted line shapes:
+
+  function_edge_logs export (Logs Explorer / log drain):
+    {"timestamp": 1792268400123000, "event_message": "POST | 200 | https://x.supabase.co/functions/v1/v2-public-votes/AB3001",
+     "metadata": [{"execution_time_ms": 84, "request": [{"pathname": "/functions/v1/v2-public-votes/AB3001"}],
+                   "response": [{"status_code": 200}]}]}
+
+  flattened:
+    {"timestamp": "2026-10-17T20:30:00.123Z", "function_name": "v2-public-bids", "execution_time_ms": 120, "status_code": 200}
+
+Lines without an execution time (console output from function_logs) are
+counted as ignored.
+"""
+
+import glob
+import gzip
+import json
+import math
+import os
+import re
+import sys
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+FUNCTION_PATH = re.compile(r'/functions/v1/([\w-]+)')
+
+# Position recorded for a gzipped export whose last chunk has been read
+GZIP_DONE = -1
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error (DDSketch-style).
+
+    Bucket bounds grow geometrically by gamma, so every quantile is within
+    relative_accuracy of the true value, and two sketches merge by adding
+    bucket counts. Past max_buckets the lowest buckets are collapsed, giving
+    up accuracy at the fast end rather than memory.
+    """
+    def __init__(self, relative_accuracy=0.01, max_buckets=1024):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+
+    def add(self, value, count=1):
+        if value <= 0:
+            self.zero += count
+        else:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        lowest = keys[excess]
+        for key in keys[:excess]:
+            self.buckets[lowest] += self.buckets.pop(key)
+
+    def quantiles(self, qs):
+        """Values at each quantile in qs (ascending), or Nones when empty"""
+        if not self.count:
+            return [None] * len(qs)
+        results = []
+        keys = iter(sorted(self.buckets))
+        seen = self.zero
+        key = None
+        for q in qs:
+            rank = q * (self.count - 1)
+            if rank < self.zero:
+                results.append(0.0)
+                continue
+            while seen <= rank:
+                key = next(keys)
+                seen += self.buckets[key]
+            results.append(2 * self.gamma ** key / (self.gamma + 1))
+        return results
+
+class RequestStats:
+    """Request and error counts plus a duration sketch and sum for one function and time slot"""
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.client_errors = 0
+        self.durations = QuantileSketch()
+        self.duration_sum = 0.0
+
+    def add(self, duration, status):
+        self.requests += 1
+        if status is not None and status >= 500:
+            self.errors += 1
+        elif status is not None and status >= 400:
+            self.client_errors += 1
+        self.durations.add(duration)
+        self.duration_sum += duration
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.client_errors += other.client_errors
+        self.durations.merge(other.durations)
+        self.duration_sum += other.duration_sum
+
+def parse_timestamp(value):
+    """Epoch seconds from ISO text or epoch s/ms/us numbers"""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    if value > 1e14:
+        return value / 1e6
+    if value > 1e11:
+        return value / 1e3
+    return float(value)
+
+def parse_edge_log_line(line):
+    """(function, timestamp, duration_ms, status) for a request line, None for other lines.
+
+    Raises ValueError for lines that are not JSON objects.
+    """
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    metadata = record.get('metadata')
+    meta = metadata[0] if isinstance(metadata, list) and metadata else (metadata if isinstance(metadata, dict) else {})
+
+    duration = next((source[field] for source in (record, meta)
+                     for field in ('execution_time_ms', 'duration_ms') if source.get(field) is not None), None)
+    if duration is None:
+        return None
+
+    name = record.get('function_name') or record.get('function') or meta.get('function_name')
+    if not name:
+        request = meta.get('request')
+        request = request[0] if isinstance(request, list) and request else (request or {})
+        match = FUNCTION_PATH.search(request.get('pathname') or request.get('url') or record.get('event_message') or '')
+        name = match.group(1) if match else 'unknown'
+
+    status = record.get('status_code', record.get('status'))
+    if status is None:
+        response = meta.get('response')
+        response = response[0] if isinstance(response, list) and response else (response or {})
+        status = response.get('status_code')
+
+    timestamp = record.get('timestamp')
+    return (name, parse_timestamp(timestamp) if timestamp is not None else None,
+            float(duration), int(status) if status is not None else None)
+
+class EdgeLogTailer:
+    """Follow JSON-lines files matching glob patterns, handing complete new lines to a callback.
+
+    Files present at the first poll are followed from their end unless
+    from_start; files that appear later (rotation, new exports) are read
+    from the beginning. A file whose inode changes or that shrinks is
+    re-read from the start. Each poll reads at most max_bytes per file, so
+    a large backlog is worked off over several polls. Gzipped files are
+    exports: they are streamed once, max_bytes of decompressed lines per
+    poll from a reader kept open between polls, and never re-read once
+    their last chunk has been handled (or they turned out to be corrupt).
+    """
+    def __init__(self, patterns, from_start=False, max_bytes=8 * 1024 * 1024):
+        self.patterns = patterns
+        self.from_start = from_start
+        self.max_bytes = max_bytes
+        self.positions = {}
+        self.gzip_readers = {}
+        self.polled = False
+        self.backlog = 0
+
+    def poll(self, handle):
+        self.backlog = 0
+        paths = sorted({path for pattern in self.patterns for path in glob.glob(os.path.expanduser(pattern))})
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            inode, offset = self.positions.get(path, (None, None))
+            if path.endswith('.gz'):
+                if inode != stat.st_ino or offset != GZIP_DONE:
+                    done = self._read_gzip(path, stat, handle)
+                    self.positions[path] = (stat.st_ino, GZIP_DONE if done else None)
+                continue
+            if offset is None:
+                offset = stat.st_size if not self.polled and not self.from_start else 0
+            elif inode != stat.st_ino or stat.st_size < offset:
+                offset = 0
+            if stat.st_size > offset:
+                offset = self._read(path, offset, handle)
+                self.backlog += stat.st_size - offset
+            self.positions[path] = (stat.st_ino, offset)
+        self.polled = True
+        # Forget files that were rotated away
+        for path in set(self.positions) - set(paths):
+            del self.positions[path]
+            reader = self.gzip_readers.pop(path, None)
+            if reader is not None and reader[1] is not None:
+                reader[1].close()
+
+    def _read_gzip(self, path, stat, handle):
+        """Hand up to max_bytes of decompressed lines to handle; True once the file is exhausted or unreadable.
+
+        A file that ends mid-stream (an export still being written, or
+        truncated) is retried once it grows: the reader cannot resume after
+        hitting the end, so it is reopened and seeks past the lines already
+        handled. A corrupt file is skipped with a warning.
+        """
+        inode, f, offset, stalled_size = self.gzip_readers.get(path, (None, None, 0, None))
+        if inode != stat.st_ino:
+            if f is not None:
+                f.close()
+            f, offset, stalled_size = None, 0, None
+        elif f is None and stalled_size == stat.st_size:
+            return False
+        try:
+            if f is None:
+                f = gzip.open(path, 'rb')
+                f.seek(offset)
+            budget = self.max_bytes
+            while budget > 0:
+                line = f.readline(self.max_bytes)
+                if not line:
+                    f.close()
+                    self.gzip_readers.pop(path, None)
+                    return True
+                handle(line)
+                offset += len(line)
+                budget -= len(line)
+        except EOFError:
+            f.close()
+            self.gzip_readers[path] = (stat.st_ino, None, offset, stat.st_size)
+            return False
+        except (OSError, zlib.error) as e:
+            print(f"Skipping unreadable edge log export {path}: {e}", file=sys.stderr)
+            if f is not None:
+                f.close()
+            self.gzip_readers.pop(path, None)
+            return True
+        self.gzip_readers[path] = (stat.st_ino, f, offset, None)
+        # Compressed bytes not yet consumed (approximate: the reader buffers ahead)
+        self.backlog += max(stat.st_size - f.fileobj.tell(), 0)
+        return False
+
+    def _read(self, path, offset, handle):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(self.max_bytes)
+        end = data.rfind(b'\n')
+        if end < 0:
+            # A partial line still being written, unless it alone fills the read budget
+            if len(data) < self.max_bytes:
+                return offset
+            handle(data)
+            return offset + len(data)
+        for line in data[:end].split(b'\n'):
+            handle(line)
+        return offset + end + 1
+
+class EdgeFunctionStats:
+    """Per-function request rate, error rate and duration quantiles over a sliding window.
+
+    Requests are bucketed into slot_seconds slots by their log timestamp;
+    the window is the merge of the slots inside it, and a running total per
+    function covers everything ingested (for exports older than the
+    window). Functions beyond max_functions are evicted least recently seen
+    first, so memory is bounded by functions x slots x sketch buckets.
+    """
+    def __init__(self, window_seconds=60, slot_seconds=5, max_functions=500, categorize=None):
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+        self.max_functions = max_functions
+        self.categorize = categorize or (lambda name: None)
+        self.functions = OrderedDict()
+        self.lines = 0
+        self.malformed = 0
+        self.ignored = 0
+        self.newest = None
+
+    def add_line(self, line, now):
+        if not line.strip():
+            return
+        self.lines += 1
+        try:
+            parsed = parse_edge_log_line(line)
+        except (ValueError, TypeError, AttributeError, KeyError, IndexError):
+            self.malformed += 1
+            return
+        if parsed is None:
+            self.ignored += 1
+            return
+        name, timestamp, duration, status = parsed
+        timestamp = timestamp if timestamp is not None else now
+        self.newest = timestamp if self.newest is None else max(self.newest, timestamp)
+
+        entry = self.functions.get(name)
+        if entry is None:
+            if len(self.functions) >= self.max_functions:
+                self.functions.popitem(last=False)
+            entry = self.functions[name] = {'slots': {}, 'total': RequestStats()}
+        else:
+            self.functions.move_to_end(name)
+        entry['total'].add(duration, status)
+        if timestamp >= now - self.window_seconds - self.slot_seconds:
+            slot = timestamp - timestamp % self.slot_seconds
+            stats = entry['slots'].get(slot)
+            if stats is None:
+                stats = entry['slots'][slot] = RequestStats()
+            stats.add(duration, status)
+
+    def summary(self, now):
+        """One row per function: window stats, or everything ingested when the window is empty"""
+        start = now - self.window_seconds
+        rows = []
+        for name, entry in self.functions.items():
+            slots = entry['slots']
+            for slot in [slot for slot in slots if slot + self.slot_seconds <= start]:
+                del slots[slot]
+            window = RequestStats()
+            for stats in slots.values():
+                window.merge(stats)
+            in_window = window.requests > 0
+            stats = window if in_window else entry['total']
+            p50, p95, p99 = stats.durations.quantiles((0.5, 0.95, 0.99))
+            rows.append({
+                'function': name,
+                'category': self.categorize(name),
+                'scope': 'window' if in_window else 'all',
+                'requests': stats.requests,
+                'rate': stats.requests / self.window_seconds if in_window else None,
+                'error_rate': stats.errors / stats.requests,
+                'client_error_rate': stats.client_errors / stats.requests,
+                'p50': p50,
+                'p95': p95,
+                'p99': p99,
+                'total_requests': entry['total'].requests,
+                'total_duration_ms': entry['total'].duration_sum
+            })
+        return sorted(rows, key=lambda row: (row['scope'] != 'window', -row['requests']))
+
+class EdgeLogCollector:
+    """Collector for the monitor's scheduler: ingest new log lines, then summarize"""
+    def __init__(self, patterns, window_seconds=60, from_start=False, categorize=None, clock=None):
+        self.tailer = EdgeLogTailer(patterns, from_start)
+        self.stats = EdgeFunctionStats(window_seconds, categorize=categorize)
+        self.clock = clock
+
+    def collect(self):
+        now = self.clock()
+        self.tailer.poll(lambda line: self.stats.add_line(line, now))
+        return {
+            'functions': self.stats.summary(now),
+            'window': self.stats.window_seconds,
+            'lines': self.stats.lines,
+            'malformed': self.stats.malformed,
+            'ignored': self.stats.ignored,
+            'backlog': self.tailer.backlog,
+            'newest': datetime.fromtimestamp(self.stats.newest) if self.stats.newest is not None else None,
+            'timestamp': datetime.now()
+        }
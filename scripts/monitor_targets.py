@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Monitor Targets
+
+Database targets shared by scripts/monitor_artist_profile_links.py and
+art-battle-broadcast/scripts/monitor-user-experience.py, so neither has to be
+edited to point at staging, production or a read replica.
+
+Targets file (JSON):
+
+  {
+    "targets": [
+      {"name": "production", "host": "db.example.supabase.co", "port": 5432,
+       "database": "postgres", "user": "postgres", "password_env": "AB_PROD_DB_PASSWORD"},
+      {"name": "production-replica", "role": "replica",
+       "dsn": "postgresql://postgres@replica.example.com:5432/postgres", "password_env": "AB_PROD_DB_PASSWORD"},
+      {"name": "staging", "dsn": "host=staging.example.com dbname=postgres user=postgres"}
+    ]
+  }
+
+Each target has a unique name, an optional role (primary or replica; only
+used for display) and either a libpq "dsn" or individual connection fields.
+Passwords should come from the environment via "password_env" rather than
+being written into the file.
+"""
+
+import json
+import os
+
+CONNECTION_FIELDS = ('host', 'port', 'database', 'user', 'password', 'sslmode')
+
+def target_from_config(name, config, role='primary'):
+    """Wrap a script's built-in connection dict as a target"""
+    return {'name': name, 'role': role, 'connect': dict(config)}
+
+def load_targets(path):
+    """Read a targets file, returning a list of {'name', 'role', 'connect'} dicts.
+
+    'connect' holds psycopg2.connect() keyword arguments (a dsn and/or fields).
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    targets = []
+    for entry in config.get('targets', []):
+        name = entry.get('name')
+        if not name:
+            raise ValueError("Every target needs a 'name'")
+        if any(target['name'] == name for target in targets):
+            raise ValueError(f"Duplicate target name {name!r}")
+        role = entry.get('role', 'primary')
+        if role not in ('primary', 'replica'):
+            raise ValueError(f"Target {name!r} has unknown role {role!r}")
+
+        connect = {field: entry[field] for field in CONNECTION_FIELDS if field in entry}
+        if 'dbname' in entry:
+            connect['database'] = entry['dbname']
+        if 'dsn' in entry:
+            connect['dsn'] = entry['dsn']
+        if 'password_env' in entry:
+            password = os.environ.get(entry['password_env'])
+            if password is None:
+                raise ValueError(f"Target {name!r}: environment variable {entry['password_env']} is not set")
+            connect['password'] = password
+        if not connect.get('dsn') and not connect.get('host'):
+            raise ValueError(f"Target {name!r} needs a 'dsn' or a 'host'")
+        targets.append({'name': name, 'role': role, 'connect': connect})
+
+    if not targets:
+        raise ValueError(f"No targets defined in {path}")
+    return targets
+
+def select_targets(targets, names):
+    """Keep only the named targets (all of them when names is empty)"""
+    if not names:
+        return targets
+    known = {target['name'] for target in targets}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown target(s): {', '.join(unknown)}; known: {', '.join(sorted(known))}")
+    return [target for target in targets if target['name'] in names]
@@ -0,0 +1,41 @@
+"""Fixtures loading the monitor scripts by file path (they are scripts, not a package)"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+def load_script(name, path):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+@pytest.fixture(scope='session')
+def edge_logs():
+    return load_script('monitor_edge_logs', 'scripts/monitor_edge_logs.py')
+
+@pytest.fixture(scope='session')
+def alerts():
+    return load_script('monitor_alerts', 'scripts/monitor_alerts.py')
+
+@pytest.fixture(scope='session')
+def ux():
+    pytest.importorskip('psycopg2')
+    return load_script('monitor_user_experience', 'art-battle-broadcast/scripts/monitor-user-experience.py')
+
+@pytest.fixture(scope='session')
+def links(alerts):
+    pytest.importorskip('psycopg2')
+    load_script('monitor_targets', 'scripts/monitor_targets.py')
+    return load_script('monitor_artist_profile_links', 'scripts/monitor_artist_profile_links.py')
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+class RecordingSink:
+    def __init__(self):
+        self.events = []
+
+    def send(self, event):
+        self.events.append(event)
+
+    def statuses(self):
+        return [event['status'] for event in self.events]
+
+def make_engine(alerts, state_file=None, **rule):
+    sink = RecordingSink()
+    config = {'name': 'slow', 'metric': 'latency', 'op': '>', 'threshold': 100, **rule}
+    engine = alerts.AlertEngine([alerts.AlertRule(config)], {'test': sink}, state_file=state_file)
+    return engine, sink
+
+def test_fires_and_resolves(alerts):
+    engine, sink = make_engine(alerts)
+    engine.observe('latency', 50, 0)
+    engine.observe('latency', 150, 1)
+    engine.observe('latency', 50, 2)
+    assert sink.statuses() == ['firing', 'resolved']
+    assert sink.events[0]['threshold'] == 100
+
+def test_hysteresis_holds_until_clear_bound(alerts):
+    engine, sink = make_engine(alerts, clear=80)
+    engine.observe('latency', 150, 0)
+    engine.observe('latency', 90, 1)
+    assert sink.statuses() == ['firing']
+    assert [alert[1] for alert in engine.firing()] == ['latency']
+
+    engine.observe('latency', 80, 2)
+    assert sink.statuses() == ['firing', 'resolved']
+    assert sink.events[1]['threshold'] == 80
+    assert engine.firing() == []
+
+def test_for_duration_delays_firing(alerts):
+    engine, sink = make_engine(alerts, **{'for': 30})
+    engine.observe('latency', 150, 0)
+    engine.observe('latency', 150, 29)
+    assert sink.events == []
+    engine.observe('latency', 150, 30)
+    assert sink.statuses() == ['firing']
+
+def test_for_duration_restarts_when_condition_breaks(alerts):
+    engine, sink = make_engine(alerts, **{'for': 30})
+    engine.observe('latency', 150, 0)
+    engine.observe('latency', 50, 20)
+    engine.observe('latency', 150, 25)
+    engine.observe('latency', 150, 50)
+    assert sink.events == []
+    engine.observe('latency', 150, 55)
+    assert sink.statuses() == ['firing']
+
+def test_cooldown_suppresses_refiring(alerts):
+    engine, sink = make_engine(alerts, cooldown=600)
+    engine.observe('latency', 150, 0)
+    engine.observe('latency', 50, 10)
+    engine.observe('latency', 150, 20)
+    engine.observe('latency', 50, 30)
+    assert sink.statuses() == ['firing', 'resolved']
+
+    engine.observe('latency', 150, 600)
+    assert sink.statuses() == ['firing', 'resolved', 'firing']
+
+def test_windowed_function(alerts):
+    engine, sink = make_engine(alerts, function='avg', window=60)
+    engine.observe('latency', 180, 0)
+    assert sink.statuses() == ['firing']
+    engine.observe('latency', 0, 10)
+    assert sink.statuses() == ['firing', 'resolved']
+    assert sink.events[1]['value'] == 90
+
+def test_match_creates_one_alert_per_series(alerts):
+    sink = RecordingSink()
+    rule = alerts.AlertRule({'name': 'links', 'match': 'links.*.linked_pct', 'op': '<', 'threshold': 95})
+    engine = alerts.AlertEngine([rule], {'test': sink})
+    engine.observe('links.artist_applications.linked_pct', 90, 0)
+    engine.observe('links.artist_invitations.linked_pct', 99, 0)
+    engine.observe('other.linked_pct', 10, 0)
+    assert [event['series'] for event in sink.events] == ['links.artist_applications.linked_pct']
+
+def test_state_file_round_trip(alerts, tmp_path):
+    state_file = str(tmp_path / 'alerts.json')
+    engine, sink = make_engine(alerts, state_file=state_file, clear=80, cooldown=600)
+    engine.observe('latency', 150, 0)
+    engine.save_state()
+    assert sink.statuses() == ['firing']
+
+    # Still firing after a restart: no second notification, and resolving is remembered
+    engine, sink = make_engine(alerts, state_file=state_file, clear=80, cooldown=600)
+    assert [alert[1] for alert in engine.firing()] == ['latency']
+    engine.observe('latency', 150, 60)
+    assert sink.events == []
+    engine.observe('latency', 50, 120)
+    engine.save_state()
+    assert sink.statuses() == ['resolved']
+
+    # The cooldown carries over too
+    engine, sink = make_engine(alerts, state_file=state_file, clear=80, cooldown=600)
+    engine.observe('latency', 150, 180)
+    assert sink.events == []
+
+def test_missing_state_file_starts_empty(alerts, tmp_path):
+    engine, _ = make_engine(alerts, state_file=str(tmp_path / 'missing.json'))
+    assert engine.states == {}
+
+@pytest.mark.parametrize('config, message', [
+    ({'name': 'r', 'threshold': 1}, "exactly one of"),
+    ({'name': 'r', 'metric': 'a', 'match': 'a*', 'threshold': 1}, "exactly one of"),
+    ({'name': 'r', 'metric': 'a', 'op': '!=', 'threshold': 1}, "unknown op"),
+    ({'name': 'r', 'metric': 'a', 'function': 'p99', 'threshold': 1}, "unknown function"),
+])
+def test_invalid_rules(alerts, config, message):
+    with pytest.raises(ValueError, match=message):
+        alerts.AlertRule(config)
+
+def test_load_alert_config_rejects_unknown_sinks(alerts, tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({
+        'sinks': {'console': {'type': 'stdout'}},
+        'rules': [{'name': 'r', 'metric': 'a', 'threshold': 1, 'sinks': ['console', 'pager']}],
+    }))
+    with pytest.raises(ValueError, match='pager'):
+        alerts.load_alert_config(str(path))
+
+def test_rate_sums_increases_across_a_counter_reset(alerts):
+    window = alerts.SeriesWindow(60)
+    for timestamp, value in ((0, 100), (10, 150), (20, 30), (30, 60)):
+        window.add(timestamp, value)
+    # 50 before the reset, 30 counted from zero at it, 30 after: 110 over 30s
+    assert window.evaluate('rate') == pytest.approx(110 / 30)
+    assert window.evaluate('delta') == -40
+
+def test_rate_forgets_steps_that_leave_the_window(alerts):
+    window = alerts.SeriesWindow(20)
+    for timestamp, value in ((0, 100), (10, 5), (20, 15), (30, 45)):
+        window.add(timestamp, value)
+    # The window now starts at t=10, so the reset step into it is gone
+    assert window.evaluate('rate') == pytest.approx(40 / 20)
+
+def test_rate_rule_does_not_fire_on_a_reset(alerts):
+    sink = RecordingSink()
+    rule = alerts.AlertRule({'name': 'throughput-drop', 'metric': 'calls', 'op': '<', 'threshold': 5,
+                             'function': 'rate', 'window': 60})
+    engine = alerts.AlertEngine([rule], {'test': sink})
+    # 100 calls, a reset, then 50 more: 7.5/s, not the 2.5/s of last-over-first
+    for timestamp, value in ((0, 1000), (10, 1100), (20, 50)):
+        engine.observe('calls', value, timestamp)
+    assert sink.events == []
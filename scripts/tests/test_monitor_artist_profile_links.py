@@ -0,0 +1,181 @@
+import argparse
+import csv
+import gzip
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+class FakeCursor:
+    """Answers each execute() with the next queued result"""
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+        self.result = self.results.pop(0)
+
+    def fetchone(self):
+        return self.result
+
+    def fetchall(self):
+        return self.result
+
+# (table, total, linked, fixable, oldest, newest, daily, recent broken); applied_at is timestamptz
+# and created_at is timestamp, so psycopg2 returns aware and naive datetimes respectively
+TABLES = [
+    ('artist_applications', 100, 90, 4,
+     datetime(2026, 1, 2, 10, tzinfo=timezone.utc), datetime(2026, 10, 17, 9, 30, 0, 250000, tzinfo=timezone.utc),
+     [(date(2026, 10, 17), 5, 4), (date(2026, 10, 15), 3, 3)],
+     [('a1', '1001', 'AB3001', datetime(2026, 10, 17, 9, 30, 0, 250000, tzinfo=timezone.utc))]),
+    ('artist_invitations', 40, 39, 0, datetime(2025, 5, 1, 8, 0, 0, 500000), datetime(2026, 10, 17, 11, 15),
+     [(date(2026, 10, 17), 2, 1)],
+     [('i1', '1002', 'AB3002', datetime(2026, 10, 17, 11, 15))]),
+    ('artist_confirmations', 0, 0, 0, None, None, [], []),
+]
+
+def jsonb(value):
+    # to_jsonb() renders timestamps as ISO 8601, with an offset only for timestamptz
+    return value.isoformat() if value is not None else None
+
+def per_table_results():
+    results = []
+    for table, total, linked, fixable, oldest, newest, daily, _ in TABLES:
+        results.append({'total_records': total, 'linked_records': linked, 'broken_records': total - linked,
+                        'linked_pct': (Decimal(linked * 100) / total).quantize(Decimal('0.01')) if total else None,
+                        'oldest_record': oldest, 'newest_record': newest})
+        results.append({'broken_records': total - linked, 'fixable_records': fixable})
+        results.append([{'record_date': day, 'daily_total': day_total, 'daily_linked': day_linked,
+                         'daily_broken': day_total - day_linked} for day, day_total, day_linked in daily])
+    for _, _, _, _, _, _, _, recent in TABLES:
+        results.append([{'id': record_id, 'artist_number': number, 'event_eid': eid, 'record_date': at}
+                        for record_id, number, eid, at in recent])
+    return results
+
+def batched_results():
+    rows = []
+    for table, total, linked, fixable, oldest, newest, daily, recent in TABLES:
+        rows.append({'table_name': table, 'is_daily': False, 'record_date': None,
+                     'total_records': total, 'linked_records': linked, 'broken_records': total - linked,
+                     'linked_pct': (Decimal(linked * 100) / total).quantize(Decimal('0.01')) if total else None,
+                     'oldest_record': jsonb(oldest), 'newest_record': jsonb(newest),
+                     'fixable_records': fixable,
+                     'recent_broken': [{'id': record_id, 'artist_number': number, 'event_eid': eid,
+                                        'record_date': jsonb(at)} for record_id, number, eid, at in recent] or None})
+        for day, day_total, day_linked in daily:
+            rows.append({'table_name': table, 'is_daily': True, 'record_date': day,
+                         'daily_total': day_total, 'daily_linked': day_linked, 'daily_broken': day_total - day_linked})
+    return [rows]
+
+def report(links, capsys, table_stats, recent_broken):
+    args = argparse.Namespace(target_name=None, recent=None, approximate=False)
+    links.print_health_report(table_stats, recent_broken, args)
+    return [line for line in capsys.readouterr().out.splitlines() if not line.startswith('Report generated')]
+
+def test_batched_report_matches_per_table_report(links, capsys):
+    cursor = FakeCursor(per_table_results())
+    table_stats = [links.get_table_health(cursor, table) for table, *_ in TABLES]
+    per_table = report(links, capsys, table_stats, links.check_recent_broken_records(cursor))
+
+    cursor = FakeCursor(batched_results())
+    batched = report(links, capsys, *links.collect_health_batched(cursor, [table for table, *_ in TABLES]))
+
+    assert batched == per_table
+    assert '  Date Range:    2025-05-01 08:00:00.500000 to 2026-10-17 11:15:00' in batched
+    assert '  Date Range:    None to None' in batched
+
+def test_memory_resolver_counts_fixability_in_the_batched_statement(links):
+    profile_index = {'1001': 'p1', '1003': 'p3'}
+    summary = {'table_name': 'artist_applications', 'is_daily': False, 'record_date': None,
+               'total_records': 10, 'linked_records': 6, 'broken_records': 4, 'linked_pct': Decimal('60.00'),
+               'oldest_record': None, 'newest_record': None, 'fixable_records': None, 'recent_broken': None,
+               'broken_numbers': ['1001', '1002', '1001', '1003']}
+    cursor = FakeCursor([[summary]])
+    table_stats, _ = links.collect_health_batched(cursor, ['artist_applications'], profile_index=profile_index)
+
+    assert len(cursor.queries) == 1
+    assert 'array_agg(artist_number)' in cursor.queries[0][0]
+    assert table_stats[0]['fixability_stats'] == {'broken_records': 4, 'fixable_records': 3,
+                                                  'fixable_pct': Decimal('75.00')}
+
+def test_fixability_stats_are_counted_server_side(links):
+    cursor = FakeCursor([{'broken_records': 8, 'fixable_records': 2}])
+    assert links.get_fixability_stats(cursor, 'artist_invitations', 7) == {
+        'broken_records': 8, 'fixable_records': 2, 'fixable_pct': Decimal('25.00')}
+    assert 'COUNT(*) FILTER (WHERE (EXISTS' in cursor.queries[0][0]
+
+    cursor = FakeCursor([[{'artist_number': '1001', 'broken_records': 3},
+                          {'artist_number': '1002', 'broken_records': 1}]])
+    assert links.get_fixability_stats(cursor, 'artist_invitations', profile_index={'1001': 'p1'}) == {
+        'broken_records': 4, 'fixable_records': 3, 'fixable_pct': Decimal('75.00')}
+    assert 'GROUP BY t.artist_number' in cursor.queries[0][0]
+
+def test_json_timestamp_keeps_naive_columns_naive(links):
+    assert links.json_timestamp('2026-10-17T11:15:00').tzinfo is None
+    assert links.json_timestamp('2026-10-17T11:15:00+02:00').utcoffset().total_seconds() == 7200
+    assert links.json_timestamp(None) is None
+
+def test_incremental_summary_takes_the_week_from_the_server(links):
+    state = {'tables': {'artist_invitations': {
+        'days': {'2026-10-16': [3, 1, 1], '2026-10-10': [2, 0, 0], '2026-10-09': [5, 0, 0], 'None': [1, 1, 0]},
+        'oldest_record': '2026-10-09T08:00:00', 'newest_record': '2026-10-16T09:00:00'}}}
+    cursor = FakeCursor([{'week_start': date(2026, 10, 10)}, [], [], []])
+    table_stats, _ = links.summarize_link_state(cursor, state, ['artist_invitations'])
+
+    assert 'NOW()' in cursor.queries[0][0]
+    assert [day['record_date'] for day in table_stats[0]['daily_breakdown']] == [date(2026, 10, 16), date(2026, 10, 10)]
+    assert table_stats[0]['basic_stats']['total_records'] == 11
+
+def test_incremental_watermarks_keep_naive_columns_naive(links):
+    state = {'tables': {'artist_invitations': {
+        'created_watermark': '2026-10-16T09:00:00', 'updated_watermark': None,
+        'oldest_record': '2026-10-09T08:00:00', 'newest_record': '2026-10-16T09:00:00',
+        'days': {'2026-10-16': [3, 1, 1]}}}}
+    changed = [{'table_name': 'artist_invitations', 'record_date': date(2026, 10, 17),
+                'oldest_record': '2026-10-17T08:00:00', 'newest_record': '2026-10-17T11:15:00.5',
+                'last_updated': None}]
+    recounted = [{'table_name': 'artist_invitations', 'record_date': date(2026, 10, 17), 'total_records': 2,
+                  'broken_records': 1, 'fixable_records': 1, 'broken_numbers': None}]
+    state = links.advance_link_state(FakeCursor([changed, recounted]), state, ['artist_invitations'])
+
+    table_state = state['tables']['artist_invitations']
+    assert table_state['created_watermark'] == '2026-10-17T11:15:00.500000'
+    assert table_state['oldest_record'] == '2026-10-09T08:00:00'
+    assert table_state['days'] == {'2026-10-16': [3, 1, 1], '2026-10-17': [2, 1, 1]}
+
+class CopyConnection:
+    """Streams canned COPY output to copy_expert() in small chunks"""
+    def __init__(self, data, chunk=7):
+        self.data = data
+        self.chunk = chunk
+
+    def cursor(self):
+        return self
+
+    def copy_expert(self, sql, out):
+        for start in range(0, len(self.data), self.chunk):
+            out.write(self.data[start:start + self.chunk])
+
+    def close(self):
+        pass
+
+    def commit(self):
+        pass
+
+def test_csv_export_reports_the_rows_written(links, tmp_path, capsys):
+    data = (b'source_table,id,artist_number\n'
+            b'artist_applications,a1,1001\n'
+            b'artist_applications,a2,"10\n02"\n'
+            b'artist_invitations,i1,"say ""hi""\n,x"\n'
+            b'artist_invitations,i2,\n')
+    output = tmp_path / 'broken.csv.gz'
+    args = argparse.Namespace(columns=None, export='broken', recent=None, gzip=False, output=str(output), format='csv')
+
+    assert links.export_link_records(CopyConnection(data), ['artist_applications'], args) == 4
+    with gzip.open(output, 'rt', newline='') as f:
+        assert len(list(csv.reader(f))) - 1 == 4
+    assert 'Exported 4 broken records' in capsys.readouterr().err
+
+def test_csv_export_of_no_rows(links, tmp_path, capsys):
+    args = argparse.Namespace(columns=None, export='fixable', recent=None, gzip=False,
+                              output=str(tmp_path / 'fixable.csv'), format='csv')
+    assert links.export_link_records(CopyConnection(b'source_table,id\n'), ['artist_applications'], args) == 0
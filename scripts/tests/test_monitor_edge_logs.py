@@ -0,0 +1,122 @@
+import gzip
+import json
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+def true_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+def test_quantiles_within_relative_accuracy(edge_logs):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.5) for _ in range(20000)]
+    sketch = edge_logs.QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    qs = [0.0, 0.5, 0.9, 0.99, 1.0]
+    for q, estimate in zip(qs, sketch.quantiles(qs)):
+        assert estimate == pytest.approx(true_quantile(values, q), rel=0.01)
+
+def test_quantiles_of_empty_sketch(edge_logs):
+    assert edge_logs.QuantileSketch().quantiles([0.5, 0.99]) == [None, None]
+
+def test_non_positive_values_count_as_zero(edge_logs):
+    sketch = edge_logs.QuantileSketch()
+    for value in (0, -3, 0, 10):
+        sketch.add(value)
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [0.0, 0.0, pytest.approx(10, rel=0.01)]
+
+def test_merge_matches_single_sketch(edge_logs):
+    rng = random.Random(11)
+    values = [rng.expovariate(1 / 200) for _ in range(5000)]
+    whole = edge_logs.QuantileSketch()
+    left, right = edge_logs.QuantileSketch(), edge_logs.QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    qs = [0.5, 0.95, 0.99]
+    assert left.count == whole.count == len(values)
+    assert left.buckets == whole.buckets
+    assert left.quantiles(qs) == whole.quantiles(qs)
+
+def test_collapse_bounds_buckets_and_keeps_high_quantiles(edge_logs):
+    sketch = edge_logs.QuantileSketch(max_buckets=32)
+    values = [1.05 ** i for i in range(400)]
+    for value in values:
+        sketch.add(value)
+
+    assert len(sketch.buckets) <= 32
+    assert sketch.count == len(values)
+    assert sketch.quantiles([0.99])[0] == pytest.approx(true_quantile(values, 0.99), rel=0.01)
+
+def test_parse_request_line(edge_logs):
+    line = json.dumps({
+        'timestamp': 1760700000000000,
+        'event_message': 'POST | 200 | https://x.supabase.co/functions/v1/cast-vote',
+        'metadata': [{'execution_time_ms': 42, 'response': [{'status_code': 200}]}],
+    })
+    assert edge_logs.parse_edge_log_line(line) == ('cast-vote', 1760700000.0, 42.0, 200)
+
+def test_parse_flat_line_with_iso_timestamp(edge_logs):
+    line = json.dumps({'function_name': 'stripe-webhook', 'duration_ms': '12.5', 'status': 503,
+                       'timestamp': '2026-10-17T12:00:00Z'})
+    name, timestamp, duration, status = edge_logs.parse_edge_log_line(line)
+    assert (name, duration, status) == ('stripe-webhook', 12.5, 503)
+    assert timestamp == datetime(2026, 10, 17, 12, tzinfo=timezone.utc).timestamp()
+
+def test_parse_line_without_duration_is_skipped(edge_logs):
+    assert edge_logs.parse_edge_log_line(json.dumps({'event_message': 'booted', 'metadata': []})) is None
+
+def test_parse_line_without_function_name(edge_logs):
+    line = json.dumps({'execution_time_ms': 5, 'metadata': {'request': {'url': '/rest/v1/art'}}})
+    assert edge_logs.parse_edge_log_line(line) == ('unknown', None, 5.0, None)
+
+@pytest.mark.parametrize('line', ['', 'not json', '{"execution_time_ms": 5', '[1, 2]', '"text"', 'null'])
+def test_parse_malformed_lines_raise_value_error(edge_logs, line):
+    with pytest.raises(ValueError):
+        edge_logs.parse_edge_log_line(line)
+
+@pytest.mark.parametrize('value', [1792268400123, '1792268400123', 1792268400123000, '1792268400123000',
+                                   1792268400.123, '1792268400.123'])
+def test_parse_timestamp_scales_numeric_strings(edge_logs, value):
+    assert edge_logs.parse_timestamp(value) == pytest.approx(1792268400.123)
+
+def gzip_lines(count):
+    data = b''.join(b'{"function_name": "f", "execution_time_ms": %d}\n' % i for i in range(count))
+    return data, gzip.compress(data)
+
+def test_truncated_gzip_is_retried_once_it_grows(edge_logs, tmp_path):
+    path = tmp_path / 'export.jsonl.gz'
+    data, compressed = gzip_lines(20000)
+    half = len(compressed) // 2
+    path.write_bytes(compressed[:half])
+
+    lines = []
+    tailer = edge_logs.EdgeLogTailer([str(tmp_path / '*.gz')], from_start=True)
+    tailer.poll(lines.append)
+    handled = len(lines)
+    assert 0 < handled < 20000
+
+    # Unchanged size: nothing new, no error
+    tailer.poll(lines.append)
+    assert len(lines) == handled
+
+    with open(path, 'ab') as f:
+        f.write(compressed[half:])
+    tailer.poll(lines.append)
+    assert b''.join(lines) == data
+    assert tailer.positions[str(path)][1] == edge_logs.GZIP_DONE
+
+def test_corrupt_gzip_is_skipped_with_warning(edge_logs, tmp_path, capsys):
+    (tmp_path / 'bad.jsonl.gz').write_bytes(b'not gzip at all\n' * 10)
+    lines = []
+    tailer = edge_logs.EdgeLogTailer([str(tmp_path / '*.gz')], from_start=True)
+    tailer.poll(lines.append)
+    tailer.poll(lines.append)
+    assert lines == []
+    assert capsys.readouterr().err.count('Skipping unreadable edge log export') == 1
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+def statement(queryid, calls, total_time):
+    return {'queryid': queryid, 'calls': calls, 'total_time': total_time}
+
+@pytest.fixture
+def tracker(ux):
+    return ux.StatsDeltaTracker(('queryid',), ('calls', 'total_time'))
+
+def test_first_sample_has_no_deltas(tracker):
+    assert tracker.update([statement(1, 10, 100.0)], 0) is None
+
+def test_deltas_between_samples(tracker):
+    tracker.update([statement(1, 10, 100.0), statement(2, 5, 50.0)], 0)
+    deltas = tracker.update([statement(1, 15, 160.0), statement(2, 5, 50.0)], 30)
+    assert deltas == {
+        (1,): {'calls': 5, 'total_time': 60.0, 'elapsed': 30},
+        (2,): {'calls': 0, 'total_time': 0.0, 'elapsed': 30},
+    }
+
+def test_new_queryid_counts_everything_since_last_sample(tracker):
+    tracker.update([statement(1, 10, 100.0)], 0)
+    deltas = tracker.update([statement(1, 10, 100.0), statement(2, 3, 9.0)], 10)
+    assert deltas[(2,)] == {'calls': 3, 'total_time': 9.0, 'elapsed': 10}
+
+def test_removed_queryid_is_dropped(tracker):
+    tracker.update([statement(1, 10, 100.0), statement(2, 5, 50.0)], 0)
+    assert set(tracker.update([statement(1, 12, 120.0)], 10)) == {(1,)}
+    # Re-added after eviction: compared with nothing, not with the sample before it vanished
+    deltas = tracker.update([statement(1, 12, 120.0), statement(2, 7, 70.0)], 20)
+    assert deltas[(2,)] == {'calls': 7, 'total_time': 70.0, 'elapsed': 10}
+
+def test_counter_going_backwards_is_a_reset(tracker):
+    tracker.update([statement(1, 10, 100.0)], 0)
+    deltas = tracker.update([statement(1, 4, 120.0)], 10)
+    assert deltas[(1,)] == {'calls': 4, 'total_time': 120.0, 'elapsed': 10}
+
+def test_reset_marker_change_resets_every_entry(tracker):
+    tracker.update([statement(1, 10, 100.0), statement(2, 5, 50.0)], 0, reset_marker='a')
+    deltas = tracker.update([statement(1, 12, 120.0), statement(2, 6, 60.0)], 10, reset_marker='b')
+    assert deltas == {
+        (1,): {'calls': 12, 'total_time': 120.0, 'elapsed': 10},
+        (2,): {'calls': 6, 'total_time': 60.0, 'elapsed': 10},
+    }
+
+def test_elapsed_is_never_zero(tracker):
+    tracker.update([statement(1, 1, 1.0)], 5)
+    assert tracker.update([statement(1, 2, 2.0)], 5)[(1,)]['elapsed'] > 0
+
+def make_collectors(ux, *specs):
+    collectors, costs = [], {}
+    for name, interval, priority, avg_wall, database in specs:
+        collectors.append(ux.Collector(name, None, interval, 5, priority, database=database))
+        costs[name] = ux.CollectorCost()
+        if avg_wall is not None:
+            costs[name].add(avg_wall)
+    return collectors, costs
+
+def test_plan_within_budget_stretches_nothing(ux):
+    governor = ux.LoadGovernor(budget=0.1)
+    collectors, costs = make_collectors(ux, ('connections', 1, 0, 0.01, True), ('queries', 10, 2, 0.2, True))
+    governor.plan(collectors, costs, {})
+    assert governor.load == pytest.approx(0.03)
+    assert governor.stretch == {'connections': 1.0, 'queries': 1.0}
+
+def test_plan_stretches_just_enough(ux):
+    governor = ux.LoadGovernor(budget=0.1)
+    collectors, costs = make_collectors(ux, ('connections', 1, 0, 0.05, True), ('queries', 10, 2, 1.0, True))
+    governor.plan(collectors, costs, {})
+    assert governor.stretch['queries'] == pytest.approx(2.0)
+    assert governor.interval(collectors[1]) == pytest.approx(20)
+    assert governor.load == pytest.approx(0.1)
+
+def test_plan_stretches_lowest_priority_first_and_caps(ux):
+    governor = ux.LoadGovernor(budget=0.05, max_stretch=10)
+    collectors, costs = make_collectors(ux, ('connections', 1, 0, 0.05, True), ('tables', 10, 1, 0.2, True),
+                                        ('queries', 10, 2, 0.5, True))
+    governor.plan(collectors, costs, {})
+    assert governor.stretch == {'connections': 1.0, 'tables': 10.0, 'queries': 10.0}
+    # Priority 0 is never stretched, even though the budget is still exceeded
+    assert governor.load == pytest.approx(0.057)
+
+def test_plan_ignores_local_and_unmeasured_collectors(ux):
+    governor = ux.LoadGovernor(budget=0.01)
+    collectors, costs = make_collectors(ux, ('connections', 1, 0, 0.001, True), ('edge', 1, 3, 1.0, False),
+                                        ('queries', 10, 2, None, True))
+    governor.plan(collectors, costs, {})
+    assert governor.load == pytest.approx(0.001)
+    assert set(governor.stretch.values()) == {1.0}
+
+def test_plan_shrinks_budget_under_pressure(ux):
+    governor = ux.LoadGovernor(budget=0.1, max_active=50, max_lock_waits=5)
+    collectors, costs = make_collectors(ux, ('connections', 1, 0, 0.0, True), ('queries', 10, 2, 0.6, True))
+    snapshot = {'connections': {'connections': [('idle', 80), ('active', 100)], 'locks': [('ExclusiveLock', 2)]},
+                'locks': {'waiting': 3}}
+    governor.plan(collectors, costs, snapshot)
+    assert governor.pressure == pytest.approx(2.0)
+    assert governor.allowed == pytest.approx(0.05)
+    assert governor.stretch['queries'] == pytest.approx(1.2)
+
+def test_encode_decode_round_trip(ux):
+    histogram = ux.LatencyHistogram()
+    histogram.counts[2] = 4
+    histogram.sum = 70.0
+    value = {
+        'by_id': {1: 'a', (2, 'b'): [1, 2]},
+        'pair': ('x', 3),
+        'at': datetime(2026, 10, 17, 20, 30),
+        'mean': Decimal('1.5'),
+        'worst': float('inf'),
+        'histogram': histogram,
+        'rows': [{'name': 'n', 'value': None}],
+    }
+
+    decoded = ux.decode_record(json.loads(json.dumps(ux.encode_record(value))))
+    assert decoded['by_id'] == {1: 'a', (2, 'b'): [1, 2]}
+    assert decoded['pair'] == ('x', 3)
+    assert decoded['at'] == datetime(2026, 10, 17, 20, 30)
+    assert decoded['mean'] == 1.5
+    assert decoded['worst'] == float('inf')
+    assert decoded['rows'] == [{'name': 'n', 'value': None}]
+    assert isinstance(decoded['histogram'], ux.LatencyHistogram)
+    assert decoded['histogram'].counts == histogram.counts
+    assert decoded['histogram'].sum == 70.0
+
+def test_recorder_reader_round_trip(ux, tmp_path):
+    path = str(tmp_path / 'night.ux.gz')
+    recorder = ux.SnapshotRecorder(path, flush_seconds=3600, flush_records=2)
+    for t in range(5):
+        recorder.append('database', {'size': t, 'at': datetime(2026, 10, 17, 20, t)}, timestamp=100 + t,
+                        target='production')
+    recorder.append('locks', None, error='timeout', timestamp=105)
+    recorder.close()
+
+    reader = ux.SnapshotReader(path)
+    assert [chunk['records'] for chunk in reader.chunks] == [2, 2, 2]
+    assert reader.first_timestamp() == 100
+
+    records = list(reader.records())
+    assert len(records) == 6
+    assert records[0] == (100, 'production', 'database', {'size': 0, 'at': datetime(2026, 10, 17, 20, 0)}, None)
+    assert records[-1] == (105, None, 'locks', None, 'timeout')
+
+def test_reader_seeks_to_start(ux, tmp_path):
+    path = str(tmp_path / 'night.ux.gz')
+    recorder = ux.SnapshotRecorder(path, flush_seconds=3600, flush_records=2)
+    for t in range(6):
+        recorder.append('database', {'size': t}, timestamp=100 + t)
+    recorder.close()
+
+    reader = ux.SnapshotReader(path)
+    assert [record[0] for record in reader.records(start=103)] == [103, 104, 105]
+    assert [record[0] for record in reader.records(start=50)] == list(range(100, 106))
+    assert list(reader.records(start=200)) == []
+
+def test_ash_top_breakdowns(ux):
+    ash = ux.ActiveSessionHistory(capacity=100)
+    ash.add(10, [('Lock:tuple', 1, 'client backend', 'app'), ('CPU', 2, 'client backend', 'app')])
+    ash.add(11, [('Lock:tuple', 1, 'client backend', 'worker')])
+    assert ash.top('wait', seconds=60, now=12) == [('Lock:tuple', 2, 1.0), ('CPU', 1, 0.5)]
+    assert ash.top('class', seconds=60, now=12)[0] == ('Lock', 2, 1.0)
+    assert ash.top('query', seconds=60, now=12)[0] == (1, 2, 1.0)
+
+def test_ash_releases_labels_of_overwritten_rows(ux):
+    ash = ux.ActiveSessionHistory(capacity=10)
+    for tick in range(100000):
+        ash.add(tick, [('CPU', tick, 'client backend', f'app-{tick}')])
+
+    # Only the labels still in the buffer stay interned, and freed codes are reused
+    assert len(ash.codes) == len(ash.labels) == 12
+    applications = {label for label, _, _ in ash.top('application', seconds=1e9, limit=None, now=1e9)}
+    assert applications == {f'app-{tick}' for tick in range(99990, 100000)}
+
+def test_ash_handles_more_than_65535_distinct_labels(ux):
+    ash = ux.ActiveSessionHistory(capacity=70000)
+    ash.add(1, [('CPU', 0, 'client backend', f'app-{i}') for i in range(70000)])
+    assert len(ash.top('application', seconds=60, limit=None, now=2)) == 70000
+
+def test_ash_top_while_sampling(ux):
+    ash = ux.ActiveSessionHistory(capacity=500)
+    stop = threading.Event()
+
+    def sampler():
+        tick = 0
+        while not stop.is_set():
+            tick += 1
+            ash.add(tick, [('CPU', tick, 'client backend', f'app-{tick % 997}') for _ in range(20)])
+
+    thread = threading.Thread(target=sampler)
+    thread.start()
+    try:
+        for _ in range(200):
+            for label, samples, _ in ash.top('application', seconds=1e9, limit=None, now=1e9):
+                assert label is not None and samples > 0
+    finally:
+        stop.set()
+        thread.join()
+
+def test_priority_slots_hand_out_by_priority(ux):
+    async def scenario():
+        slots = ux.PrioritySlots(1)
+        order = []
+        await slots.acquire(0)
+
+        async def waiter(priority):
+            await slots.acquire(priority)
+            order.append(priority)
+            slots.release()
+
+        tasks = [asyncio.create_task(waiter(priority)) for priority in (3, 1, 2)]
+        await asyncio.sleep(0)
+        slots.release()
+        await asyncio.gather(*tasks)
+        return order, slots.free
+
+    assert asyncio.run(scenario()) == ([1, 2, 3], 1)
+
+def test_priority_slots_survive_cancelled_waiters(ux):
+    async def scenario():
+        slots = ux.PrioritySlots(1)
+        await slots.acquire(0)
+        handed = asyncio.create_task(slots.acquire(1))
+        waiting = asyncio.create_task(slots.acquire(2))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the first waiter, which is cancelled before it resumes
+        slots.release()
+        handed.cancel()
+        # A waiter cancelled while still queued takes nothing
+        await asyncio.sleep(0)
+        await asyncio.wait_for(waiting, 1)
+        slots.release()
+        return handed.cancelled(), slots.free
+
+    assert asyncio.run(scenario()) == (True, 1)
+
+def test_edge_durations_are_exported_as_a_summary(ux, edge_logs):
+    stats = edge_logs.EdgeFunctionStats(window_seconds=60)
+    for duration in (10, 20, 30, 40):
+        stats.add_line(json.dumps({'function_name': 'v2-public-votes', 'execution_time_ms': duration,
+                                   'status_code': 200, 'timestamp': 1000}), 1000)
+    edge = {'lines': 4, 'malformed': 0, 'backlog': 0, 'window': 60, 'functions': stats.summary(1000)}
+
+    lines = ux.build_prometheus_metrics({'edge': edge}, {}, {}).splitlines()
+    family = [line for line in lines if 'ux_edge_duration_ms' in line]
+    assert family[1] == '# TYPE ux_edge_duration_ms summary'
+    assert len([line for line in family if 'quantile=' in line]) == 3
+    assert 'ux_edge_duration_ms_sum{function="v2-public-votes"} 100.0' in family
+    assert 'ux_edge_duration_ms_count{function="v2-public-votes"} 4.0' in family